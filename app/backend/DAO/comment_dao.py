@@ -1,24 +1,153 @@
+from collections import Counter
+from flask import current_app
+from sqlalchemy import func, literal, select
+from sqlalchemy.exc import IntegrityError
 from models.comment import Comment
+from models.post import Post
 from extensions import db
+from services.db_routing import reads
+from services.unit_of_work import flush_or_commit, savepoint
+from DAO.counters import increment, increment_many
+from DAO.pagination import keyset_paginate
 
 def create_comment(post_id, user_id, content, parent_id=None):
+    """Cria o comentário. Retorna None se o post (ou o comentário pai) não existir."""
     comment = Comment(
         post_id=post_id,
         user_id=user_id,
         content=content,
         parent_id=parent_id
     )
-    db.session.add(comment)
-    db.session.commit()
+    try:
+        with savepoint():
+            db.session.add(comment)
+            increment(Post, post_id, comments_count=1, hot_score=current_app.config['HOT_SCORE_COMMENT_WEIGHT'])
+    except IntegrityError:
+        # foreign_keys=ON: post_id ou parent_id inexistente
+        return None
+    flush_or_commit()
     return comment
 
+@reads
 def get_comment_by_id(comment_id):
     return Comment.query.get(comment_id)
 
 def delete_comment(comment_id):
     comment = Comment.query.get(comment_id)
     if comment:
+        # As respostas são removidas em cascata e também saem do contador
+        removed = _count_thread(comment)
         db.session.delete(comment)
-        db.session.commit()
+        increment(
+            Post, comment.post_id,
+            comments_count=-removed,
+            hot_score=-removed * current_app.config['HOT_SCORE_COMMENT_WEIGHT']
+        )
+        flush_or_commit()
         return True
     return False
+
+def _count_thread(comment):
+    """Conta o comentário e todas as suas respostas (diretas e indiretas)."""
+    return 1 + sum(_count_thread(reply) for reply in comment.replies)
+
+def remove_user(user_id):
+    """
+    Remove os comentários do usuário com todas as respostas (de qualquer autor),
+    descontando comments_count/hot_score dos posts. Não faz commit.
+    """
+    tree = (
+        select(Comment.id, Comment.post_id)
+        .where(Comment.user_id == user_id)
+        .cte('user_comments', recursive=True)
+    )
+    # UNION (e não UNION ALL): respostas do usuário aos próprios comentários aparecem uma vez só
+    tree = tree.union(
+        select(Comment.id, Comment.post_id).where(Comment.parent_id == tree.c.id)
+    )
+    rows = db.session.execute(select(tree.c.id, tree.c.post_id)).all()
+    if not rows:
+        return
+
+    weight = current_app.config['HOT_SCORE_COMMENT_WEIGHT']
+    increment_many(Post, {
+        post_id: {'comments_count': -removed, 'hot_score': -removed * weight}
+        for post_id, removed in Counter(post_id for _, post_id in rows).items()
+    })
+    # Uma única instrução: o SQLite verifica parent_id no fim dela, com a árvore inteira removida
+    Comment.query.filter(Comment.id.in_([comment_id for comment_id, _ in rows])).delete(
+        synchronize_session=False
+    )
+
+@reads
+def get_comments_page(post_id, parent_id=None, cursor=None, limit=20):
+    """
+    Página de comentários de um post (parent_id=None) ou de respostas a um comentário,
+    do mais antigo para o mais novo, por cursor (id). Retorna (comentários, next_cursor).
+    """
+    query = Comment.query.filter_by(post_id=post_id, parent_id=parent_id)
+    return keyset_paginate(query, [Comment.id], cursor, limit, descending=False)
+
+@reads
+def get_descendants(root_ids, max_depth):
+    """
+    Carrega com uma CTE recursiva as respostas dos comentários root_ids até max_depth níveis.
+    Retorna [(comentário, profundidade)], com profundidade >= 1, ordenado por id.
+    """
+    if not root_ids or max_depth < 1:
+        return []
+
+    tree = (
+        select(Comment.id, literal(0).label('depth'))
+        .where(Comment.id.in_(root_ids))
+        .cte('comment_tree', recursive=True)
+    )
+    tree = tree.union_all(
+        select(Comment.id, tree.c.depth + 1)
+        .where(Comment.parent_id == tree.c.id, tree.c.depth < max_depth)
+    )
+
+    return (
+        db.session.query(Comment, tree.c.depth)
+        .join(tree, Comment.id == tree.c.id)
+        .filter(tree.c.depth > 0)
+        .order_by(tree.c.id)  # por Comment.id o planner varre a tabela inteira
+        .all()
+    )
+
+@reads
+def count_replies(parent_ids):
+    """Retorna {parent_id: quantidade de respostas diretas}."""
+    if not parent_ids:
+        return {}
+    return dict(
+        db.session.query(Comment.parent_id, func.count(Comment.id))
+        .filter(Comment.parent_id.in_(parent_ids))
+        .group_by(Comment.parent_id)
+        .all()
+    )
+
+@reads
+def get_comments_preview(post_ids, per_post=3):
+    """
+    Retorna os primeiros `per_post` comentários de primeiro nível de cada post,
+    em uma única consulta (ROW_NUMBER por post_id).
+    """
+    if not post_ids:
+        return []
+
+    position = func.row_number().over(
+        partition_by=Comment.post_id, order_by=Comment.id
+    ).label('position')
+    ranked = (
+        select(Comment.id, position)
+        .where(Comment.post_id.in_(post_ids), Comment.parent_id.is_(None))
+        .subquery()
+    )
+
+    return (
+        Comment.query.join(ranked, Comment.id == ranked.c.id)
+        .filter(ranked.c.position <= per_post)
+        .order_by(Comment.post_id, Comment.id)
+        .all()
+    )
@@ -0,0 +1,62 @@
+from sqlalchemy import bindparam, update
+from extensions import db
+
+def unchanged_onupdate(model):
+    """
+    {coluna: coluna} das colunas com onupdate do model (ex.: Post.updated_at), para
+    incluir nos valores de um UPDATE que não é uma edição: mantém o valor gravado em
+    vez de disparar o onupdate. Serve para update(model).values() e Query.update().
+    """
+    return {
+        getattr(model, column.key): getattr(model, column.key)
+        for column in model.__table__.columns if column.onupdate is not None
+    }
+
+def increment(model, row_id, returning=(), **deltas):
+    """
+    Ajusta contadores desnormalizados com um UPDATE atômico (coluna = coluna + delta),
+    na mesma transação da escrita que o chamou. Não faz commit.
+    Ex.: increment(Post, post_id, likes_count=1)
+
+    Com `returning`, devolve os valores das colunas pedidas após o UPDATE
+    (UPDATE ... RETURNING), ou None se a linha não existir.
+    Ex.: increment(Post, post_id, returning=('likes_count',), likes_count=1)
+    """
+    values = {getattr(model, column): getattr(model, column) + delta for column, delta in deltas.items()}
+    # Contadores não são edição: não tocam em updated_at
+    values.update(unchanged_onupdate(model))
+    if not returning:
+        model.query.filter(model.id == row_id).update(values, synchronize_session=False)
+        return None
+
+    stmt = (
+        update(model)
+        .where(model.id == row_id)
+        .values(values)
+        .returning(*[getattr(model, column) for column in returning])
+        .execution_options(synchronize_session=False)
+    )
+    return db.session.execute(stmt).first()
+
+def increment_many(model, deltas_by_id):
+    """
+    Versão em lote de increment: {row_id: {coluna: delta}} vira um único UPDATE
+    executado para todas as linhas (executemany). Não faz commit.
+    Ex.: increment_many(User, {1: {'posts_count': -2}, 7: {'posts_count': -1}})
+    """
+    rows = [(row_id, deltas) for row_id, deltas in deltas_by_id.items() if deltas]
+    if not rows:
+        return
+    columns = sorted({column for _, deltas in rows for column in deltas})
+    table = model.__table__
+    values = {column: table.c[column] + bindparam(f'delta_{column}') for column in columns}
+    values.update({column.key: column for column in table.columns if column.onupdate is not None})
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam('row_id'))
+        .values(values)
+    )
+    db.session.execute(stmt, [
+        {'row_id': row_id, **{f'delta_{column}': deltas.get(column, 0) for column in columns}}
+        for row_id, deltas in rows
+    ])
@@ -1,35 +1,84 @@
+from datetime import datetime
+from sqlalchemy import delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from models.follow import Follow
-from extensions import db
+from models.user import User
+from extensions import db, after_commit
+from services.db_routing import reads
+from services.unit_of_work import Rollback, flush_or_commit, savepoint
+from DAO.counters import increment
+from DAO.pagination import keyset_paginate
+from DAO import timeline_dao
+from services.username_index import username_index
+from services.follow_graph import follow_graph
+
+def _followers_count(user_id):
+    return db.session.query(User.followers_count).filter(User.id == user_id).scalar()
 
 def follow_user(follower_id, followed_id):
     """
-    Cria um follow de follower_id para followed_id.
-    Retorna o objeto Follow criado ou None se inválido ou já existir.
+    Segue followed_id de forma idempotente, em um único INSERT ... ON CONFLICT DO NOTHING
+    apoiado no índice único (follower_id, followed_id). Contadores, timeline e índice
+    de usernames só são ajustados se o follow foi de fato criado.
+    Retorna (criado, followers_count de followed_id) ou None se inválido ou o usuário não existir.
     """
     if follower_id == followed_id:
         return None  # Não pode seguir a si mesmo
 
-    existing = Follow.query.filter_by(follower_id=follower_id, followed_id=followed_id).first()
-    if existing:
-        return None  # Já está seguindo
+    row = None
+    try:
+        with savepoint():
+            created = db.session.execute(
+                sqlite_insert(Follow)
+                .values(follower_id=follower_id, followed_id=followed_id, created_at=datetime.utcnow())
+                .on_conflict_do_nothing(index_elements=['follower_id', 'followed_id'])
+                .returning(Follow.id)
+            ).first() is not None
+            if created:
+                row = increment(User, followed_id, returning=('followers_count',), followers_count=1)
+                if row is None:
+                    raise Rollback
+    except IntegrityError:
+        # foreign_keys=ON: o usuário não existe
+        return None
 
-    follow = Follow(follower_id=follower_id, followed_id=followed_id)
-    db.session.add(follow)
-    db.session.commit()
-    return follow
+    if not created:
+        followers_count = _followers_count(followed_id)
+        return None if followers_count is None else (False, followers_count)
+    if row is None:
+        return None
+    increment(User, follower_id, following_count=1)
+    timeline_dao.backfill(follower_id, followed_id)
+    after_commit(lambda: username_index.add_followers(followed_id, 1))
+    after_commit(lambda: follow_graph.add(follower_id, followed_id))
+    flush_or_commit()
+    return True, row.followers_count
 
 def unfollow_user(follower_id, followed_id):
     """
-    Remove o follow entre follower_id e followed_id.
-    Retorna True se removido, False se não existia.
+    Deixa de seguir de forma idempotente (DELETE ... RETURNING).
+    Retorna (removido, followers_count de followed_id) ou None se o usuário não existir.
     """
-    follow = Follow.query.filter_by(follower_id=follower_id, followed_id=followed_id).first()
-    if follow:
-        db.session.delete(follow)
-        db.session.commit()
-        return True
-    return False
+    removed = db.session.execute(
+        delete(Follow)
+        .where(Follow.follower_id == follower_id, Follow.followed_id == followed_id)
+        .returning(Follow.id)
+    ).first() is not None
+
+    if not removed:
+        followers_count = _followers_count(followed_id)
+        return None if followers_count is None else (False, followers_count)
 
+    row = increment(User, followed_id, returning=('followers_count',), followers_count=-1)
+    increment(User, follower_id, following_count=-1)
+    timeline_dao.trim(follower_id, followed_id)
+    after_commit(lambda: username_index.add_followers(followed_id, -1))
+    after_commit(lambda: follow_graph.remove(follower_id, followed_id))
+    flush_or_commit()
+    return True, row.followers_count
+
+@reads
 def is_following(follower_id, followed_id):
     """
     Verifica se follower_id está seguindo followed_id.
@@ -37,6 +86,7 @@ def is_following(follower_id, followed_id):
     """
     return Follow.query.filter_by(follower_id=follower_id, followed_id=followed_id).first() is not None
 
+@reads
 def get_followers(user_id):
     """
     Retorna lista de usuários que seguem o usuário com user_id.
@@ -45,9 +95,36 @@ def get_followers(user_id):
     return [follow.follower for follow in follows]
 
 
+@reads
 def get_following(user_id):
     """
     Retorna lista de usuários que o usuário está seguindo.
     """
     follows = Follow.query.filter_by(follower_id=user_id).all()
-    return [follow.followed for follow in follows]
\ No newline at end of file
+    return [follow.followed for follow in follows]
+
+def _user_list(user_column, filter_column, user_id, cursor=None, limit=None):
+    """
+    Projeção compacta dos usuários de uma lista de follows, em uma consulta com join,
+    ordenada pelo follow mais recente. Com limit, pagina por cursor sobre Follow.id.
+    """
+    follow_id = Follow.id.label('follow_id')
+    query = (
+        db.session.query(follow_id, User.id, User.username, User.name, User.profile_picture,
+                         User.profile_picture_variants)
+        .join(Follow, user_column == User.id)
+        .filter(filter_column == user_id)
+    )
+    if limit is None:
+        return query.order_by(Follow.id.desc()).all(), None
+    return keyset_paginate(query, [follow_id], cursor, limit)
+
+@reads
+def get_followers_page(user_id, cursor=None, limit=None):
+    """Retorna (linhas id/username/name/profile_picture, next_cursor) dos seguidores do usuário."""
+    return _user_list(Follow.follower_id, Follow.followed_id, user_id, cursor, limit)
+
+@reads
+def get_following_page(user_id, cursor=None, limit=None):
+    """Retorna (linhas id/username/name/profile_picture, next_cursor) de quem o usuário segue."""
+    return _user_list(Follow.followed_id, Follow.follower_id, user_id, cursor, limit)
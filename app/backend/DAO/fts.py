@@ -0,0 +1,20 @@
+import re
+from sqlalchemy import column, table
+
+# Tabelas virtuais FTS5 (criadas na migração c61a3e0f7b58, mantidas por triggers)
+users_fts = table('users_fts', column('rowid'))
+posts_fts = table('posts_fts', column('rowid'))
+
+MAX_TERMS = 8
+
+def match_query(text):
+    """
+    Converte o texto digitado em uma expressão MATCH do FTS5 segura:
+    cada palavra vira um termo entre aspas com busca por prefixo, todos obrigatórios.
+    Retorna None se não houver termos.
+    Ex.: 'joão sil' -> '"joão"* "sil"*'
+    """
+    terms = re.findall(r'\w+', text or '')[:MAX_TERMS]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
@@ -1,45 +1,120 @@
+from flask import current_app
+from sqlalchemy import delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
 from models.like import Like
+from models.post import Post
+from models.user import User
 from extensions import db
+from services.db_routing import reads
+from services.unit_of_work import Rollback, flush_or_commit, savepoint
+from DAO.counters import increment
+from DAO.pagination import keyset_paginate
 
-def create_like(data):
+def _apply(post_id, delta):
+    """Ajusta likes_count/hot_score do post e retorna (likes_count, autor) ou None se o post não existir."""
+    weight = current_app.config['HOT_SCORE_LIKE_WEIGHT']
+    return increment(
+        Post, post_id, returning=('likes_count', 'user_id'),
+        likes_count=delta, hot_score=delta * weight
+    )
+
+def _state(post_id):
+    return db.session.query(Post.likes_count, Post.user_id).filter(Post.id == post_id).first()
+
+def like_post(user_id, post_id):
     """
-    Cria um like para user_id e post_id, se ainda não existir.
-    Retorna o like criado ou None se já existir.
+    Curte o post de forma idempotente, em um único INSERT ... ON CONFLICT DO NOTHING
+    apoiado no índice único (user_id, post_id): requisições repetidas ou concorrentes
+    não geram duplicados nem erro de integridade.
+    Retorna (criado, likes_count, autor_id) ou None se o post não existir.
     """
-    user_id = data['user_id']
-    post_id = data['post_id']
-    existing = Like.query.filter_by(user_id=user_id, post_id=post_id).first()
-    if existing:
+    state = None
+    try:
+        with savepoint():
+            created = db.session.execute(
+                sqlite_insert(Like)
+                .values(user_id=user_id, post_id=post_id)
+                .on_conflict_do_nothing(index_elements=['user_id', 'post_id'])
+                .returning(Like.id)
+            ).first() is not None
+            state = _apply(post_id, 1) if created else _state(post_id)
+            if state is None:
+                raise Rollback
+    except IntegrityError:
+        # foreign_keys=ON: o post não existe
         return None
+    if state is None:
+        return None
+    flush_or_commit()
+    return created, state.likes_count, state.user_id
 
-    like = Like(user_id=user_id, post_id=post_id)
-    db.session.add(like)
-    db.session.commit()
-    return like
-
-def delete_like(like_id):
+def unlike_post(user_id, post_id):
     """
-    Deleta like pelo ID.
-    Retorna True se deletado, False se não encontrado.
+    Remove o like de forma idempotente (DELETE ... RETURNING): só ajusta os
+    contadores se uma linha foi de fato removida.
+    Retorna (removido, likes_count, autor_id) ou None se o post não existir.
     """
-    like = Like.query.get(like_id)
-    if not like:
-        return False
-    db.session.delete(like)
-    db.session.commit()
-    return True
+    removed = db.session.execute(
+        delete(Like)
+        .where(Like.user_id == user_id, Like.post_id == post_id)
+        .returning(Like.id)
+    ).first() is not None
+
+    state = _apply(post_id, -1) if removed else _state(post_id)
+    flush_or_commit()
+    if state is None:
+        return None
+    return removed, state.likes_count, state.user_id
 
+def remove_user(user_id):
+    """Remove os likes do usuário, descontando likes_count/hot_score dos posts curtidos. Não faz commit."""
+    weight = current_app.config['HOT_SCORE_LIKE_WEIGHT']
+    liked = db.session.query(Like.post_id).filter(Like.user_id == user_id)
+    Post.query.filter(Post.id.in_(liked.scalar_subquery())).update(
+        {Post.likes_count: Post.likes_count - 1, Post.hot_score: Post.hot_score - weight},
+        synchronize_session=False
+    )
+    Like.query.filter(Like.user_id == user_id).delete(synchronize_session=False)
+
+@reads
 def get_like_by_user_and_post(user_id, post_id):
     """Retorna o like existente para user_id e post_id ou None."""
     return Like.query.filter_by(user_id=user_id, post_id=post_id).first()
 
+@reads
 def get_like_by_id(like_id):
     """Retorna like pelo ID ou None."""
     return Like.query.get(like_id)
 
+@reads
 def get_likes_by_user(user_id):
     """Retorna todos os likes feitos pelo usuário."""
     return Like.query.filter_by(user_id=user_id).all()
 
+@reads
 def get_likes_by_post(post_id):
     return Like.query.filter_by(post_id=post_id).all()
+
+@reads
+def get_likers_page(post_id, cursor=None, limit=None):
+    """
+    Projeção compacta (id, username, name, profile_picture) de quem curtiu o post,
+    em uma consulta com join, do like mais recente ao mais antigo.
+    Com limit, pagina por cursor sobre Like.id. Retorna (linhas, next_cursor).
+    """
+    like_id = Like.id.label('like_id')
+    query = (
+        db.session.query(like_id, User.id, User.username, User.name, User.profile_picture,
+                         User.profile_picture_variants)
+        .join(Like, Like.user_id == User.id)
+        .filter(Like.post_id == post_id)
+    )
+    if limit is None:
+        return query.order_by(Like.id.desc()).all(), None
+    return keyset_paginate(query, [like_id], cursor, limit)
+
+@reads
+def count_likes_by_post(post_id):
+    """Retorna a quantidade de likes do post pelo contador desnormalizado."""
+    return db.session.query(Post.likes_count).filter(Post.id == post_id).scalar() or 0
@@ -1,45 +1,399 @@
-from models.notification import Notification
-from extensions import db
-
-def create_notification(user_id, type, message, actor_id=None):
-    notification = Notification(
-        user_id=user_id,
-        type=type,
-        message=message,
-        actor_id=actor_id
-    )
-    db.session.add(notification)
-    db.session.commit()
-    return notification
+from collections import Counter
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import DateTime, delete, false, func, insert, literal, select, true, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from models.notification import (Notification, NotificationActor, NotificationArchive,
+                                 NotificationStreamTicket, group_key)
+from models.user import User
+from extensions import db, after_commit
+from services.db_routing import reads
+from services.unit_of_work import flush_or_commit, savepoint
+from DAO.counters import increment, increment_many
+from services.notification_broker import notification_broker, event_id
+
+# Linhas por INSERT em notification_actors (2 parâmetros cada, abaixo do limite do SQLite)
+ACTOR_ROWS_PER_INSERT = 400
+
+def create_notification(user_id, type, message, actor_id=None, target_id=None):
+    """Registra um evento de notificação (agregado) e retorna a linha resultante (None se o usuário não existe)."""
+    affected = create_notifications([{
+        'user_id': user_id,
+        'actor_id': actor_id,
+        'type': type,
+        'target_id': target_id,
+        'message': message,
+        'created_at': datetime.utcnow(),
+    }])
+    return affected[0] if affected else None
+
+def _aggregate(rows):
+    """Agrupa os eventos por (destinatário, grupo), com os atores mais recentes primeiro."""
+    groups = {}
+    for row in rows:
+        key = (row['user_id'], group_key(row['type'], row.get('target_id')))
+        group = groups.setdefault(key, {'actors': []})
+        group['last'] = row
+        actor_id = row.get('actor_id')
+        if actor_id is not None:
+            if actor_id in group['actors']:
+                group['actors'].remove(actor_id)
+            group['actors'].insert(0, actor_id)
+    return groups
+
+def create_notifications(rows, retry=True):
+    """
+    Grava um lote de eventos de notificação em uma transação, agregando por
+    (destinatário, tipo, alvo): se já existe uma notificação não lida do grupo,
+    ela recebe os novos atores (actor_count, actor_ids, updated_at); senão uma
+    linha nova é inserida (e o contador de não lidas do destinatário sobe).
+    Retorna as notificações afetadas, uma por grupo.
+    rows: dicts com user_id, actor_id, type, target_id, message e created_at.
+    """
+    if not rows:
+        return []
+
+    recent = current_app.config.get('NOTIFICATION_RECENT_ACTORS', 3)
+    groups = _aggregate(rows)
+    user_ids = {user_id for user_id, _ in groups}
+    keys = {key for _, key in groups}
+    existing = {
+        (n.user_id, n.group_key): n for n in
+        Notification.query.filter(
+            Notification.user_id.in_(user_ids),
+            Notification.group_key.in_(keys),
+            Notification.read == false()
+        )
+    }
+
+    try:
+        with savepoint():
+            affected, created = _write_groups(groups, existing, recent)
+            increment_many(User, {user_id: {'unread_notifications_count': count}
+                                  for user_id, count in created.items()})
+            _publish_notifications(affected)
+    except IntegrityError:
+        # Outro processo criou o mesmo grupo entre a leitura e o insert, ou (foreign_keys=ON)
+        # o destinatário/ator foi removido depois do evento: refaz o lote sem esses usuários
+        if not retry:
+            raise
+        return create_notifications(_rows_of_existing_users(rows), retry=False)
+    flush_or_commit()
+    return affected
+
+def _write_groups(groups, existing, recent):
+    """Insere ou atualiza a notificação de cada grupo. Retorna (afetadas, Counter de criadas por usuário)."""
+    affected = []
+    fresh = []
+    created = Counter()
+    for (user_id, key), group in groups.items():
+        last = group['last']
+        actors = group['actors']
+        notification = existing.get((user_id, key))
+        if notification is None:
+            notification = Notification(
+                user_id=user_id,
+                type=last['type'],
+                target_id=last.get('target_id'),
+                group_key=key,
+                message=last['message'],
+                read=False,
+                actor_id=actors[0] if actors else None,
+                actor_count=max(1, len(actors)),
+                actor_ids=','.join(map(str, actors[:recent])) or None,
+                created_at=last['created_at'],
+                updated_at=last['created_at'],
+            )
+            db.session.add(notification)
+            fresh.append(notification)
+            created[user_id] += 1
+        else:
+            known = notification.recent_actor_ids
+            merged = actors + [a for a in known if a not in actors]
+            notification.actor_ids = ','.join(map(str, merged[:recent])) or None
+            notification.actor_id = merged[0] if merged else notification.actor_id
+            notification.message = last['message']
+            notification.updated_at = last['created_at']
+        affected.append(notification)
+    db.session.flush()
+
+    # actor_count conta os atores distintos do grupo (não só os recentes de actor_ids):
+    # só os que ainda não estavam em notification_actors somam
+    added = _add_actors([(notification, group['actors'])
+                         for notification, group in zip(affected, groups.values())])
+    new_ids = {notification.id for notification in fresh}
+    for notification in affected:
+        if added[notification.id] and notification.id not in new_ids:
+            notification.actor_count = (notification.actor_count or 1) + added[notification.id]
+    db.session.flush()
+    return affected, created
 
+def _add_actors(pairs):
+    """Registra os atores de cada notificação, ignorando os já conhecidos. Retorna {id: quantos eram novos}."""
+    rows = [{'notification_id': notification.id, 'actor_id': actor_id}
+            for notification, actors in pairs for actor_id in actors]
+    added = Counter()
+    for start in range(0, len(rows), ACTOR_ROWS_PER_INSERT):
+        inserted = db.session.execute(
+            sqlite_insert(NotificationActor)
+            .values(rows[start:start + ACTOR_ROWS_PER_INSERT])
+            .on_conflict_do_nothing()
+            .returning(NotificationActor.notification_id)
+        ).scalars()
+        added.update(inserted)
+    return added
+
+def _delete_actors(*conditions):
+    """Remove as linhas de notification_actors (também com foreign_keys=OFF, em que o cascade não roda)."""
+    db.session.execute(delete(NotificationActor).where(*conditions))
+
+def _rows_of_existing_users(rows):
+    user_ids = {row['user_id'] for row in rows} | {row['actor_id'] for row in rows if row.get('actor_id')}
+    existing = {user_id for (user_id,) in db.session.query(User.id).filter(User.id.in_(user_ids))}
+    return [row for row in rows
+            if row['user_id'] in existing and (not row.get('actor_id') or row['actor_id'] in existing)]
+
+def _publish_notifications(notifications):
+    """
+    Agenda, para depois do commit, o envio ao vivo das notificações aos destinatários
+    conectados ao stream, junto com a contagem de não lidas. Sem conexões, não consulta nada.
+    """
+    listening = [n for n in notifications if notification_broker.is_listening(n.user_id)]
+    if not listening:
+        return
+    from services.notification_serializer import serialize_notifications
+
+    counts = get_unread_counts({n.user_id for n in listening})
+    events = [
+        (n.user_id, event_id(n), {'notification': payload, 'unread_count': counts.get(n.user_id, 0)})
+        for n, payload in zip(listening, serialize_notifications(listening))
+    ]
+
+    def publish():
+        for user_id, id, data in events:
+            notification_broker.publish(user_id, 'notification', data, event_id=id)
+    after_commit(publish)
+
+def _publish_unread(user_id, count=None):
+    """Agenda o envio da contagem de não lidas atualizada, se o usuário estiver conectado."""
+    if not notification_broker.is_listening(user_id):
+        return
+    if count is None:
+        count = get_unread_count(user_id)
+    after_commit(lambda: notification_broker.publish(user_id, 'unread', {'unread_count': count}))
+
+@reads
 def get_notifications_by_user(user_id, limit=50):
     return Notification.query.filter_by(user_id=user_id)\
-        .order_by(Notification.created_at.desc())\
+        .order_by(Notification.updated_at.desc(), Notification.id.desc())\
         .limit(limit).all()
 
+@reads
 def get_notification_by_id(notification_id):
     return Notification.query.get(notification_id)
 
 
+@reads
+def get_notifications_since(user_id, since, limit=50, after_id=None):
+    """
+    Notificações criadas ou atualizadas a partir de `since`, da mais antiga para a mais nova.
+    Com `after_id`, só as estritamente posteriores à posição (since, after_id).
+    """
+    if after_id is None:
+        position = Notification.updated_at >= since
+    else:
+        position = tuple_(Notification.updated_at, Notification.id) > tuple_(since, after_id)
+    return Notification.query.filter(Notification.user_id == user_id, position)\
+        .order_by(Notification.updated_at, Notification.id)\
+        .limit(limit).all()
+
+@reads
 def get_unread_count(user_id):
-    return Notification.query.filter_by(user_id=user_id, read=False).count()
+    """Contagem de não lidas, lida do contador desnormalizado do usuário."""
+    count = db.session.query(User.unread_notifications_count).filter(User.id == user_id).scalar()
+    return count or 0
 
-def mark_notification_as_read(notification_id):
-    notification = Notification.query.get(notification_id)
-    if notification:
-        notification.read = True
-        db.session.commit()
-        return True
-    return False
+@reads
+def get_unread_counts(user_ids):
+    """Contagem de não lidas de vários usuários em uma consulta: {user_id: count}."""
+    if not user_ids:
+        return {}
+    rows = db.session.query(User.id, User.unread_notifications_count).filter(User.id.in_(user_ids))
+    return dict(rows.all())
+
+def mark_notification_as_read(notification_id, user_id=None):
+    """
+    Marca uma notificação como lida (só se for de `user_id`, quando informado).
+    O UPDATE condicional em read = 0 garante que o contador desça uma única vez.
+    """
+    conditions = [Notification.id == notification_id]
+    if user_id is not None:
+        conditions.append(Notification.user_id == user_id)
+    marked = db.session.execute(
+        update(Notification)
+        .where(*conditions, Notification.read == false())
+        .values(read=True)
+        .returning(Notification.user_id)
+    ).first()
+    if marked is None:
+        flush_or_commit()
+        return Notification.query.filter(*conditions).first() is not None
+
+    row = increment(User, marked.user_id, returning=('unread_notifications_count',),
+                    unread_notifications_count=-1)
+    _publish_unread(marked.user_id, row.unread_notifications_count if row else 0)
+    flush_or_commit()
+    return True
+
+def mark_all_as_read(user_id, up_to_id=None):
+    """
+    Marca como lidas, em um único UPDATE, as notificações do usuário até o id `up_to_id`
+    (todas, se omitido). Retorna (quantidade marcada, não lidas restantes).
+    """
+    conditions = [Notification.user_id == user_id, Notification.read == false()]
+    if up_to_id is not None:
+        conditions.append(Notification.id <= up_to_id)
+    result = db.session.execute(
+        update(Notification)
+        .where(*conditions)
+        .values(read=True)
+    )
+    marked = result.rowcount or 0
+    if not marked:
+        flush_or_commit()
+        return 0, get_unread_count(user_id)
+
+    row = increment(User, user_id, returning=('unread_notifications_count',),
+                    unread_notifications_count=-marked)
+    unread = row.unread_notifications_count if row else 0
+    _publish_unread(user_id, unread)
+    flush_or_commit()
+    return marked, unread
 
 def delete_notification(notification_id):
-    notification = Notification.query.get(notification_id)
-    if notification:
-        db.session.delete(notification)
-        db.session.commit()
-        return True
-    return False
+    _delete_actors(NotificationActor.notification_id == notification_id)
+    deleted = db.session.execute(
+        delete(Notification)
+        .where(Notification.id == notification_id)
+        .returning(Notification.user_id, Notification.read)
+    ).first()
+    if deleted is None:
+        flush_or_commit()
+        return False
+    if not deleted.read:
+        increment(User, deleted.user_id, unread_notifications_count=-1)
+    _publish_unread(deleted.user_id)
+    flush_or_commit()
+    return True
 
 def delete_all_notifications_by_user(user_id):
+    _delete_actors(NotificationActor.notification_id.in_(
+        select(Notification.id).where(Notification.user_id == user_id)
+    ))
     Notification.query.filter_by(user_id=user_id).delete()
-    db.session.commit()
\ No newline at end of file
+    User.query.filter(User.id == user_id).update(
+        {User.unread_notifications_count: 0}, synchronize_session=False
+    )
+    _publish_unread(user_id, 0)
+    flush_or_commit()
+
+def remove_user(user_id):
+    """
+    Remove as notificações recebidas pelo usuário e o desvincula das que causou
+    (actor_id nulo; o id em actor_ids é ignorado na serialização). Não faz commit.
+    """
+    _delete_actors(NotificationActor.notification_id.in_(
+        select(Notification.id).where(Notification.user_id == user_id)
+    ))
+    _delete_actors(NotificationActor.actor_id == user_id)
+    db.session.execute(delete(NotificationStreamTicket).where(NotificationStreamTicket.user_id == user_id))
+    Notification.query.filter(Notification.user_id == user_id).delete(synchronize_session=False)
+    Notification.query.filter(Notification.actor_id == user_id).update(
+        {Notification.actor_id: None}, synchronize_session=False
+    )
+
+def create_stream_ticket(user_id, ticket_hash, expires_at):
+    """Grava um ticket do stream SSE, apagando antes os que já expiraram."""
+    db.session.execute(
+        delete(NotificationStreamTicket).where(NotificationStreamTicket.expires_at < datetime.utcnow())
+    )
+    db.session.add(NotificationStreamTicket(ticket_hash=ticket_hash, user_id=user_id, expires_at=expires_at))
+    flush_or_commit()
+
+def redeem_stream_ticket(ticket_hash):
+    """
+    Consome o ticket (um DELETE ... RETURNING: só um uso passa) e retorna o id do
+    usuário, ou None se o ticket não existir ou tiver expirado.
+    """
+    redeemed = db.session.execute(
+        delete(NotificationStreamTicket)
+        .where(NotificationStreamTicket.ticket_hash == ticket_hash)
+        .returning(NotificationStreamTicket.user_id, NotificationStreamTicket.expires_at)
+    ).first()
+    flush_or_commit()
+    if redeemed is None or redeemed.expires_at < datetime.utcnow():
+        return None
+    return redeemed.user_id
+
+@reads
+def get_expired_notification_ids(cutoff, limit):
+    """Ids das notificações lidas sem atividade desde `cutoff`, das mais antigas (retenção)."""
+    rows = db.session.query(Notification.id)\
+        .filter(Notification.read == true(), Notification.updated_at < cutoff)\
+        .order_by(Notification.updated_at)\
+        .limit(limit)
+    return [notification_id for (notification_id,) in rows]
+
+@reads
+def get_users_over_cap(max_per_user):
+    """Destinatários com mais de `max_per_user` notificações."""
+    rows = db.session.query(Notification.user_id)\
+        .group_by(Notification.user_id)\
+        .having(func.count(Notification.id) > max_per_user)
+    return [user_id for (user_id,) in rows]
+
+@reads
+def get_notification_ids_over_cap(user_id, max_per_user, limit):
+    """Ids das notificações do usuário além das `max_per_user` mais recentes."""
+    rows = db.session.query(Notification.id)\
+        .filter(Notification.user_id == user_id)\
+        .order_by(Notification.updated_at.desc(), Notification.id.desc())\
+        .offset(max_per_user)\
+        .limit(limit)
+    return [notification_id for (notification_id,) in rows]
+
+def purge_notifications(ids, archive=False):
+    """
+    Remove as notificações dadas em uma transação curta (copiando-as antes para
+    notification_archive, com `archive`) e desconta as não lidas do contador dos
+    destinatários. Retorna quantas foram removidas.
+    """
+    if not ids:
+        return 0
+
+    unread = db.session.query(Notification.user_id, func.count(Notification.id))\
+        .filter(Notification.id.in_(ids), Notification.read == false())\
+        .group_by(Notification.user_id).all()
+
+    if archive:
+        copied = ['user_id', 'actor_id', 'type', 'message', 'read', 'created_at',
+                  'target_id', 'group_key', 'actor_count', 'actor_ids', 'updated_at']
+        db.session.execute(
+            insert(NotificationArchive).from_select(
+                ['notification_id', *copied, 'archived_at'],
+                select(
+                    Notification.id,
+                    *[getattr(Notification, column) for column in copied],
+                    literal(datetime.utcnow(), DateTime)
+                ).where(Notification.id.in_(ids))
+            )
+        )
+
+    _delete_actors(NotificationActor.notification_id.in_(ids))
+    deleted = db.session.execute(delete(Notification).where(Notification.id.in_(ids))).rowcount
+    increment_many(User, {user_id: {'unread_notifications_count': -count} for user_id, count in unread})
+    for user_id, _ in unread:
+        _publish_unread(user_id)
+    flush_or_commit()
+    return deleted
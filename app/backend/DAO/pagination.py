@@ -0,0 +1,77 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import DateTime, literal, tuple_
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    """Converte o parâmetro `limit` da query string, limitado a [1, maximum]."""
+    if value in (None, ''):
+        return default
+    limit = int(value)
+    return max(1, min(limit, maximum))
+
+def wants_cursor(args):
+    """Modo cursor é usado quando `cursor` ou `limit` são enviados; senão, o formato antigo."""
+    return 'cursor' in args or 'limit' in args
+
+def encode_cursor(values):
+    """
+    Gera um cursor opaco (base64 url-safe) a partir dos valores da chave de ordenação.
+    Datas são serializadas em ISO 8601.
+    """
+    raw = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    data = json.dumps(raw, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, columns):
+    """
+    Decodifica um cursor gerado por encode_cursor para os tipos das colunas dadas.
+    Levanta ValueError se o cursor for inválido.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+    if not isinstance(raw, list) or len(raw) != len(columns):
+        raise ValueError('Invalid cursor')
+
+    values = []
+    for value, column in zip(raw, columns):
+        if isinstance(column.type, DateTime) and value is not None:
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise ValueError('Invalid cursor')
+        values.append(value)
+    return values
+
+def keyset_paginate(query, columns, cursor=None, limit=DEFAULT_LIMIT, descending=True):
+    """
+    Paginação por cursor (keyset) pelas colunas dadas, em ordem decrescente
+    (ou crescente com descending=False).
+    A última coluna deve ser única (normalmente o id) para desempatar.
+    Cada página é uma varredura de intervalo no índice correspondente,
+    sem OFFSET nem COUNT. Retorna (itens, next_cursor).
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        bounds = [literal(v, type_=c.type) for v, c in zip(values, columns)]
+        if descending:
+            query = query.filter(tuple_(*columns) < tuple_(*bounds))
+        else:
+            query = query.filter(tuple_(*columns) > tuple_(*bounds))
+
+    order = [c.desc() if descending else c.asc() for c in columns]
+    items = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return items, next_cursor
@@ -1,8 +1,21 @@
+from flask import current_app
 from models.post import Post
+from models.user import User
 from extensions import db
+from services.db_routing import reads
+from services.unit_of_work import flush_or_commit, savepoint
+from DAO.counters import increment, increment_many
+from DAO import timeline_dao, upload_dao
+from DAO.pagination import keyset_paginate
+from DAO.fts import posts_fts, match_query
+import json
+from collections import Counter
+from sqlalchemy import text, update
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timezone
 
 # 🔍 Recupera todos os posts (paginados), ordenados por data mais recente
+@reads
 def get_all_posts_paginated(page=1, per_page=20):
     return (
         Post.query.order_by(Post.created_at.desc())
@@ -10,7 +23,13 @@ def get_all_posts_paginated(page=1, per_page=20):
         .items
     )
 
+# 🔍 Recupera posts por cursor (created_at, id), custo constante em qualquer profundidade
+@reads
+def get_all_posts_by_cursor(cursor=None, limit=20):
+    return keyset_paginate(Post.query, [Post.created_at, Post.id], cursor, limit)
+
 # 🔍 Recupera um post específico pelo ID
+@reads
 def get_post_by_id(post_id):
     return Post.query.get(post_id)
 
@@ -23,11 +42,21 @@ def create_post(data):
         content=data.get('content'),
         description=data.get('description'),
         image_url=data.get('image_url'),
+        hot_score=current_app.config['HOT_SCORE_RECENCY_WEIGHT'],
         created_at=now,
         updated_at=None
     )
-    db.session.add(post)
-    db.session.commit()
+    try:
+        with savepoint():
+            db.session.add(post)
+            increment(User, data['user_id'], posts_count=1)
+            upload_dao.acquire(post.image_url)
+            db.session.flush()
+    except IntegrityError:
+        # foreign_keys=ON: reply_id (ou o autor) não existe
+        return None
+    timeline_dao.fan_out_post(post)
+    flush_or_commit()
     return post
 
 # ✏️ Atualiza um post existente
@@ -36,12 +65,17 @@ def update_post(post_id, data):
     if not post:
         return None
 
-    post.reply_id = data.get('reply_id', post.reply_id)
-    post.content = data.get('content', post.content)
-    post.description = data.get('description', post.description)
-    post.updated_at = datetime.now(timezone.utc)
-
-    db.session.commit()
+    try:
+        with savepoint():
+            post.reply_id = data.get('reply_id', post.reply_id)
+            post.content = data.get('content', post.content)
+            post.description = data.get('description', post.description)
+            post.updated_at = datetime.now(timezone.utc)
+            db.session.flush()
+    except IntegrityError:
+        # foreign_keys=ON: reply_id inexistente
+        return None
+    flush_or_commit()
     return post
 
 # ❌ Deleta um post
@@ -50,11 +84,62 @@ def delete_post(post_id):
     if not post:
         return False
 
-    db.session.delete(post)
-    db.session.commit()
+    _delete_tree(post)
+    flush_or_commit()
     return True
 
+def _delete_tree(post):
+    """
+    Remove o post e as respostas (diretas e indiretas), que saem em cascata pelo ORM
+    junto com likes e comentários: tira todos das timelines, solta os uploads e ajusta
+    posts_count dos autores. Retorna os ids removidos. Não faz commit.
+    """
+    tree = [post]
+    for current in tree:
+        tree.extend(current.replies)
+    timeline_dao.remove_posts([removed.id for removed in tree])
+    upload_dao.release_many([removed.image_url for removed in tree])
+    authors = Counter(removed.user_id for removed in tree)
+    increment_many(User, {user_id: {'posts_count': -count} for user_id, count in authors.items()})
+    db.session.delete(post)
+    return {removed.id for removed in tree}
+
+def remove_user(user_id):
+    """Remove os posts do usuário, com as respostas de qualquer autor. Não faz commit."""
+    removed = set()
+    # Por id: um post vem antes das respostas a ele, que já saem na árvore do post
+    for post in Post.query.filter(Post.user_id == user_id).order_by(Post.id).all():
+        if post.id not in removed:
+            removed |= _delete_tree(post)
+
+# 🖼️ Grava as variantes geradas pelo pipeline de imagens
+def set_image_variants(post_id, image_url, width, height, variants):
+    """
+    Grava dimensões e variantes da imagem do post, se ela ainda for `image_url`.
+    Não altera updated_at (não é uma edição). Retorna True se o post foi atualizado.
+    """
+    result = db.session.execute(
+        update(Post)
+        .where(Post.id == post_id, Post.image_url == image_url)
+        .values(image_width=width, image_height=height, image_variants=json.dumps(variants),
+                updated_at=Post.updated_at)
+    )
+    flush_or_commit()
+    return result.rowcount > 0
+
+@reads
+def get_posts_without_variants(after_id=0, limit=100):
+    """Posts com imagem ainda sem variantes, em ordem de id a partir de after_id (backfill)."""
+    return (
+        Post.query
+        .filter(Post.id > after_id, Post.image_url.isnot(None), Post.image_variants.is_(None))
+        .order_by(Post.id)
+        .limit(limit)
+        .all()
+    )
+
 # 🔍 Recupera posts de um usuário específico, com paginação
+@reads
 def get_posts_by_user_id_paginated(user_id, page=1, per_page=20):
     return (
         Post.query.filter_by(user_id=user_id)
@@ -62,3 +147,43 @@ def get_posts_by_user_id_paginated(user_id, page=1, per_page=20):
         .paginate(page=page, per_page=per_page, error_out=False)
         .items
     )
+
+# 🔍 Recupera posts de um usuário por cursor (created_at, id)
+@reads
+def get_posts_by_user_id_by_cursor(user_id, cursor=None, limit=20):
+    return keyset_paginate(
+        Post.query.filter_by(user_id=user_id),
+        [Post.created_at, Post.id],
+        cursor,
+        limit
+    )
+
+# 🔥 Ranking do Explorar: top-K por hot_score, com paginação por cursor (hot_score, id)
+@reads
+def get_explore_posts_by_cursor(cursor=None, limit=30):
+    return keyset_paginate(Post.query, [Post.hot_score, Post.id], cursor, limit)
+
+# 🔥 Ranking do Explorar no modo page/per_page
+@reads
+def get_explore_posts_paginated(page=1, per_page=30):
+    return (
+        Post.query.order_by(Post.hot_score.desc(), Post.id.desc())
+        .paginate(page=page, per_page=per_page, error_out=False)
+        .items
+    )
+
+# 🔍 Busca textual em conteúdo e descrição (FTS5), ordenada por relevância (bm25)
+@reads
+def search_posts(query, limit=20, offset=0):
+    match = match_query(query)
+    if not match:
+        return []
+    return (
+        Post.query.join(posts_fts, posts_fts.c.rowid == Post.id)
+        .filter(text('posts_fts MATCH :match'))
+        .params(match=match)
+        .order_by(text('bm25(posts_fts, 2.0, 1.0)'))
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
@@ -0,0 +1,129 @@
+"""
+Timeline materializada (fan-out on write).
+
+Cada post novo é copiado para a timeline do autor e de cada seguidor, em um único
+INSERT ... SELECT na mesma transação do post. Autores com muitos seguidores
+(TIMELINE_FANOUT_MAX_FOLLOWERS) não fazem fan-out: seus posts são mesclados
+na leitura (merge-on-read). As funções daqui não fazem commit.
+"""
+from flask import current_app
+from sqlalchemy import insert, literal, select
+from models.timeline import TimelineEntry
+from models.follow import Follow
+from models.post import Post
+from models.user import User
+from extensions import db
+from services.db_routing import reads
+from DAO.pagination import keyset_paginate, encode_cursor
+
+def _fanout_limit():
+    return current_app.config.get('TIMELINE_FANOUT_MAX_FOLLOWERS', 5000)
+
+def _is_high_fanout(user_id):
+    followers = db.session.query(User.followers_count).filter(User.id == user_id).scalar() or 0
+    return followers > _fanout_limit()
+
+def fan_out_post(post):
+    """Insere o post na timeline do autor e, se ele não for de alto alcance, na dos seguidores."""
+    db.session.add(TimelineEntry(
+        user_id=post.user_id,
+        post_id=post.id,
+        author_id=post.user_id,
+        created_at=post.created_at
+    ))
+
+    if _is_high_fanout(post.user_id):
+        return
+
+    followers = select(
+        Follow.follower_id,
+        literal(post.id),
+        literal(post.user_id),
+        literal(post.created_at, type_=Post.created_at.type)
+    ).where(Follow.followed_id == post.user_id)
+
+    db.session.execute(
+        insert(TimelineEntry)
+        .prefix_with('OR IGNORE')
+        .from_select(['user_id', 'post_id', 'author_id', 'created_at'], followers)
+    )
+
+def backfill(follower_id, followed_id):
+    """Copia os posts recentes de followed_id para a timeline de follower_id (ao seguir)."""
+    if _is_high_fanout(followed_id):
+        return
+
+    recent = (
+        select(literal(follower_id), Post.id, Post.user_id, Post.created_at)
+        .where(Post.user_id == followed_id)
+        .order_by(Post.created_at.desc(), Post.id.desc())
+        .limit(current_app.config.get('TIMELINE_BACKFILL_POSTS', 50))
+    )
+
+    db.session.execute(
+        insert(TimelineEntry)
+        .prefix_with('OR IGNORE')
+        .from_select(['user_id', 'post_id', 'author_id', 'created_at'], recent)
+    )
+
+def trim(follower_id, followed_id):
+    """Remove da timeline de follower_id os posts de followed_id (ao deixar de seguir)."""
+    TimelineEntry.query.filter_by(user_id=follower_id, author_id=followed_id)\
+        .delete(synchronize_session=False)
+
+def remove_posts(post_ids):
+    """Remove vários posts de todas as timelines, em um DELETE."""
+    if not post_ids:
+        return
+    TimelineEntry.query.filter(TimelineEntry.post_id.in_(post_ids)).delete(synchronize_session=False)
+
+def remove_user(user_id):
+    """Remove a timeline do usuário e as entradas dos posts dele nas timelines alheias."""
+    TimelineEntry.query.filter(
+        (TimelineEntry.user_id == user_id) | (TimelineEntry.author_id == user_id)
+    ).delete(synchronize_session=False)
+
+@reads
+def get_home_timeline(user_id, cursor=None, limit=20):
+    """
+    Retorna (posts, next_cursor) da home do usuário, ordenados por (created_at, id).
+    A timeline materializada é lida por range scan; os posts dos autores seguidos
+    de alto alcance são buscados pelo índice (user_id, created_at, id) e mesclados.
+    """
+    entries, entries_cursor = keyset_paginate(
+        TimelineEntry.query.filter_by(user_id=user_id),
+        [TimelineEntry.created_at, TimelineEntry.post_id],
+        cursor,
+        limit
+    )
+    keys = [(e.created_at, e.post_id) for e in entries]
+    has_more = entries_cursor is not None
+
+    high_fanout_ids = [
+        followed_id for (followed_id,) in
+        db.session.query(Follow.followed_id)
+        .join(User, User.id == Follow.followed_id)
+        .filter(Follow.follower_id == user_id, User.followers_count > _fanout_limit())
+    ]
+    if high_fanout_ids:
+        merged, merged_cursor = keyset_paginate(
+            Post.query.filter(Post.user_id.in_(high_fanout_ids)),
+            [Post.created_at, Post.id],
+            cursor,
+            limit
+        )
+        keys = list({post_id: (created_at, post_id) for created_at, post_id in
+                     keys + [(p.created_at, p.id) for p in merged]}.values())
+        keys.sort(reverse=True)
+        has_more = has_more or merged_cursor is not None or len(keys) > limit
+        keys = keys[:limit]
+
+    if not keys:
+        return [], None
+
+    post_ids = [post_id for _, post_id in keys]
+    posts_by_id = {p.id: p for p in Post.query.filter(Post.id.in_(post_ids)).all()}
+    posts = [posts_by_id[pid] for pid in post_ids if pid in posts_by_id]
+
+    next_cursor = encode_cursor(list(keys[-1])) if has_more else None
+    return posts, next_cursor
@@ -0,0 +1,94 @@
+from datetime import datetime
+from sqlalchemy import bindparam, case, delete, func, update
+from sqlalchemy.dialects.sqlite import insert
+from models.upload import UploadBlob
+from extensions import db
+from services.db_routing import reads
+from services.unit_of_work import after_rollback, flush_or_commit, in_unit_of_work, savepoint
+
+def register_blob(path, sha256, size, content_type):
+    """
+    Registra um arquivo recém-gravado (ou reaproveitado) ainda sem referências.
+    Se o blob já existe sem referências, renova o prazo antes da coleta de lixo.
+
+    Numa unidade de trabalho o registro vai junto com o commit da requisição; até lá a
+    transação segura o lock de escrita e a coleta não remove o blob. Se a unidade for
+    desfeita, o arquivo já pode estar no disco: o blob é registrado de novo, sem
+    referências, para a coleta apagá-lo depois do prazo.
+    """
+    now = datetime.utcnow()
+    stmt = insert(UploadBlob).values(
+        path=path, sha256=sha256, size=size, content_type=content_type,
+        refcount=0, created_at=now, released_at=now
+    )
+    with savepoint():
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[UploadBlob.path],
+            set_={'released_at': case((UploadBlob.refcount <= 0, now), else_=UploadBlob.released_at)}
+        ))
+    if in_unit_of_work():
+        after_rollback(lambda: register_blob(path, sha256, size, content_type))
+    flush_or_commit()
+
+def acquire(path):
+    """Soma uma referência ao blob do caminho (no-op para caminhos não registrados). Não faz commit."""
+    if not path:
+        return
+    db.session.execute(
+        update(UploadBlob)
+        .where(UploadBlob.path == path)
+        .values(refcount=UploadBlob.refcount + 1, released_at=None)
+        .execution_options(synchronize_session=False)
+    )
+
+def release(path):
+    """Remove uma referência do blob; ao zerar, ele passa a contar o prazo da coleta. Não faz commit."""
+    release_many([path])
+
+def release_many(paths):
+    """
+    Versão em lote de release: uma referência a menos por ocorrência do caminho
+    (executemany do mesmo UPDATE). Não faz commit.
+    """
+    paths = [path for path in paths if path]
+    if not paths:
+        return
+    table = UploadBlob.__table__
+    db.session.execute(
+        update(table)
+        .where(table.c.path == bindparam('blob_path'), table.c.refcount > 0)
+        .values(
+            refcount=table.c.refcount - 1,
+            released_at=case((table.c.refcount <= 1, datetime.utcnow()), else_=table.c.released_at)
+        ),
+        [{'blob_path': path} for path in paths]
+    )
+
+def _unreferenced_since(released_before):
+    # released_at nulo com refcount zerado só ocorre após um reparo do contador
+    return (UploadBlob.refcount <= 0,
+            func.coalesce(UploadBlob.released_at, UploadBlob.created_at) < released_before)
+
+@reads
+def get_garbage_blobs(released_before, limit=500):
+    """Blobs sem referências desde antes de released_before (candidatos da coleta de lixo)."""
+    return (
+        UploadBlob.query
+        .filter(*_unreferenced_since(released_before))
+        .limit(limit)
+        .all()
+    )
+
+def delete_blob(blob_id, released_before):
+    """
+    Remove o registro do blob se ele continua sem referências desde antes de released_before.
+    Retorna o caminho removido, ou None se o blob voltou a ser usado. O arquivo só deve
+    ser apagado depois do commit (after_commit), quando a remoção já está gravada.
+    """
+    path = db.session.execute(
+        delete(UploadBlob)
+        .where(UploadBlob.id == blob_id, *_unreferenced_since(released_before))
+        .returning(UploadBlob.path)
+    ).scalar()
+    flush_or_commit()
+    return path
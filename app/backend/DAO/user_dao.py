@@ -1,20 +1,32 @@
 from models.user import User
 from models.follow import Follow
-from extensions import db
-from sqlalchemy import or_
-
+from extensions import db, after_commit
+from services.db_routing import reads
+from services.unit_of_work import flush_or_commit
+from services.username_index import username_index, entry_of
+from services.follow_graph import follow_graph
+from services.token_cache import token_cache
+from DAO import comment_dao, follow_dao, like_dao, notification_dao, post_dao, timeline_dao, upload_dao
+from DAO.fts import users_fts, match_query
+import json
+from sqlalchemy import func, text, update
+
+@reads
 def get_all_users():
     """Retorna todos os usuários."""
     return User.query.all()
 
+@reads
 def get_user_by_email(email):
     """Retorna o usuário pelo email."""
     return User.query.filter_by(email=email).first()
 
+@reads
 def get_user_by_id(user_id):
     """Retorna usuário pelo ID."""
     return User.query.get(user_id)
 
+@reads
 def get_user_by_username(username):
     """Retorna usuário pelo username (único)."""
     return User.query.filter_by(username=username).first()
@@ -31,7 +43,11 @@ def create_user(data):
         profile_picture=data.get('profile_picture')
     )
     db.session.add(user)
-    db.session.commit()
+    upload_dao.acquire(user.profile_picture)
+    db.session.flush()
+    indexed = entry_of(user)
+    after_commit(lambda: username_index.upsert(indexed))
+    flush_or_commit()
     return user
 
 def update_user(user_id, data):
@@ -42,71 +58,138 @@ def update_user(user_id, data):
     user = get_user_by_id(user_id)
     if not user:
         return None
+    if 'profile_picture' in data and data['profile_picture'] != user.profile_picture:
+        # A foto anterior fica para a coleta de lixo dos uploads se não for usada em outro lugar;
+        # as variantes da nova são gravadas pelo pipeline de imagens
+        upload_dao.release(user.profile_picture)
+        upload_dao.acquire(data['profile_picture'])
+        user.profile_picture_variants = None
     for key in ['bio', 'profile_picture', 'name', 'username', 'email', 'password', 'admin']:
         if key in data:
             setattr(user, key, data[key])
-    db.session.commit()
+    indexed = entry_of(user)
+    after_commit(lambda: username_index.upsert(indexed))
+    after_commit(lambda: token_cache.invalidate_user(user_id))
+    flush_or_commit()
     return user
 
+def set_profile_picture_variants(user_id, profile_picture, variants):
+    """
+    Grava as variantes da foto de perfil, se ela ainda for `profile_picture`.
+    Retorna True se o usuário foi atualizado.
+    """
+    result = db.session.execute(
+        update(User)
+        .where(User.id == user_id, User.profile_picture == profile_picture)
+        .values(profile_picture_variants=json.dumps(variants))
+    )
+    flush_or_commit()
+    return result.rowcount > 0
+
+@reads
+def get_users_without_variants(after_id=0, limit=100):
+    """Usuários com foto de perfil ainda sem variantes, em ordem de id a partir de after_id (backfill)."""
+    return (
+        User.query
+        .filter(User.id > after_id, User.profile_picture.isnot(None),
+                User.profile_picture != '', User.profile_picture_variants.is_(None))
+        .order_by(User.id)
+        .limit(limit)
+        .all()
+    )
+
 def delete_user(user_id):
     """Deleta usuário pelo ID."""
     user = get_user_by_id(user_id)
     if not user:
         return False
+
+    # Os follows do usuário são removidos em cascata; ajusta os contadores do outro lado
+    followed_ids = db.session.query(Follow.followed_id).filter(Follow.follower_id == user_id)
+    follower_ids = db.session.query(Follow.follower_id).filter(Follow.followed_id == user_id)
+    User.query.filter(User.id.in_(followed_ids.scalar_subquery())).update(
+        {User.followers_count: User.followers_count - 1}, synchronize_session=False
+    )
+    User.query.filter(User.id.in_(follower_ids.scalar_subquery())).update(
+        {User.following_count: User.following_count - 1}, synchronize_session=False
+    )
+    # Com foreign_keys=ON nada pode continuar apontando para o usuário
+    comment_dao.remove_user(user_id)
+    like_dao.remove_user(user_id)
+    post_dao.remove_user(user_id)
+    timeline_dao.remove_user(user_id)
+    notification_dao.remove_user(user_id)
+    upload_dao.release(user.profile_picture)
+
     db.session.delete(user)
-    db.session.commit()
+    after_commit(lambda: username_index.remove(user_id))
+    after_commit(lambda: follow_graph.remove_user(user_id))
+    after_commit(lambda: token_cache.invalidate_user(user_id))
+    flush_or_commit()
     return True
 
+@reads
 def count_followers(user_id):
     """Retorna a quantidade de seguidores do usuário."""
-    return Follow.query.filter_by(followed_id=user_id).count()
+    return db.session.query(User.followers_count).filter(User.id == user_id).scalar() or 0
 
 def follow_user(follower_id, followed_id):
     """
-    Cria uma relação de follow.
-    Retorna o objeto Follow ou None se inválido.
+    Cria uma relação de follow (idempotente).
+    Retorna (criado, followers_count) ou None se inválido.
     """
-    if follower_id == followed_id:
-        return None  # Não pode seguir a si mesmo
-
-    existing = Follow.query.filter_by(follower_id=follower_id, followed_id=followed_id).first()
-    if existing:
-        return None  # Já segue
-
-    follow = Follow(follower_id=follower_id, followed_id=followed_id)
-    db.session.add(follow)
-    db.session.commit()
-    return follow
+    return follow_dao.follow_user(follower_id, followed_id)
 
 def unfollow_user(follower_id, followed_id):
-    """Remove a relação de follow. Retorna True se sucesso."""
-    follow = Follow.query.filter_by(follower_id=follower_id, followed_id=followed_id).first()
-    if follow:
-        db.session.delete(follow)
-        db.session.commit()
-        return True
-    return False
+    """Remove a relação de follow (idempotente). Retorna (removido, followers_count) ou None."""
+    return follow_dao.unfollow_user(follower_id, followed_id)
 
+@reads
 def get_followers(user_id):
     """Retorna lista de usuários que seguem o usuário especificado."""
     follows = Follow.query.filter_by(followed_id=user_id).all()
     return [follow.follower for follow in follows]
 
+@reads
 def get_following(user_id):
     """Retorna lista de usuários que o usuário especificado está seguindo."""
     follows = Follow.query.filter_by(follower_id=user_id).all()
     return [follow.followed for follow in follows]
 
-def search_users_by_name_or_username(query):
-    return User.query.filter(
-        or_(
-            User.name.ilike(f"%{query}%"),
-            User.username.ilike(f"%{query}%")
-        )
-    ).all()
+@reads
+def search_users(query, limit=20, offset=0):
+    """
+    Busca usuários por nome, username e bio no índice FTS5, ordenados por relevância (bm25).
+    Retorna apenas as colunas da projeção de busca (id, username, name, profile_picture, bio).
+    """
+    match = match_query(query)
+    if not match:
+        return []
+    return (
+        db.session.query(User.id, User.username, User.name, User.profile_picture,
+                         User.profile_picture_variants, User.bio)
+        .join(users_fts, users_fts.c.rowid == User.id)
+        .filter(text('users_fts MATCH :match'))
+        .params(match=match)
+        .order_by(text('bm25(users_fts, 5.0, 10.0, 1.0)'))
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
 
+@reads
 def get_user_by_username(username):
     return User.query.filter_by(username=username).first()
 
+@reads
+def get_users_by_ids(user_ids):
+    """Retorna os usuários com os ids dados, em uma consulta."""
+    if not user_ids:
+        return []
+    return User.query.filter(User.id.in_(user_ids)).all()
+
+@reads
 def get_users_by_usernames(usernames):
-    return User.query.filter(User.username.in_(usernames)).all()
+    """Busca por usernames sem diferenciar maiúsculas (usa o índice em lower(username))."""
+    normalized = [u.lower() for u in usernames]
+    return User.query.filter(func.lower(User.username).in_(normalized)).all()
@@ -1,5 +1,5 @@
 import os
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
 from config import Config
 from extensions import db
@@ -7,16 +7,32 @@ from flask_migrate import Migrate
 
 migrate = Migrate()
 
-def create_app():
+def create_app(config_overrides=None):
     app = Flask(__name__)
     app.config.from_object(Config)
+    if config_overrides:
+        app.config.update(config_overrides)
 
     # Garante que a pasta do banco exista
-    os.makedirs(os.path.dirname(Config.DB_PATH), exist_ok=True)
+    os.makedirs(os.path.dirname(app.config['DB_PATH']), exist_ok=True)
+
+    # Perfil do SQLite: pool e PRAGMAs (WAL, busy_timeout, foreign_keys...) por conexão
+    from services.sqlite_profile import sqlite_profile
+    sqlite_profile.init_app(app)
 
     # Inicializa o db com o app
     db.init_app(app)
     migrate.init_app(app, db)
+    with app.app_context():
+        sqlite_profile.attach(db.engine)
+
+        # Leituras em um engine somente leitura, escritas no principal (services/db_routing)
+        from services.db_routing import db_router
+        db_router.init_app(app, db.engine)
+
+    # Uma transação (um commit) por requisição: os DAOs só fazem flush (services/unit_of_work)
+    from services.unit_of_work import request_transactions
+    request_transactions.init_app(app)
 
     # Configura CORS
     CORS(app, supports_credentials=True)
@@ -29,6 +45,8 @@ def create_app():
     from router.follow_router import follow_bp 
     from router.comment_router import comment_bp
     from router.notification_router import notification_bp
+    from router.feed_router import feed_bp
+    from router.metrics_router import metrics_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api')
     app.register_blueprint(user_bp, url_prefix='/api')
@@ -37,16 +55,55 @@ def create_app():
     app.register_blueprint(follow_bp, url_prefix='/api')
     app.register_blueprint(comment_bp, url_prefix='/api')
     app.register_blueprint(notification_bp, url_prefix='/api')
+    app.register_blueprint(feed_bp, url_prefix='/api')
+    app.register_blueprint(metrics_bp, url_prefix='/api')
+
+    # Rota para servir arquivos enviados na pasta uploads (cache imutável, ETag, Range,
+    # X-Accel-Redirect/X-Sendfile conforme UPLOADS_SERVE_MODE)
+    from services.upload_serving import upload_server
+    upload_server.init_app(app)
 
-    # Rota para servir arquivos enviados na pasta uploads
     @app.route('/uploads/<path:filename>')
     def uploaded_file(filename):
-        uploads_dir = os.path.join(app.root_path, 'uploads')
-        return send_from_directory(uploads_dir, filename)
+        return upload_server.send(filename)
+
+    # Índices em memória
+    from services import username_index, follow_graph
+    username_index.warm_up(app)
+    follow_graph.warm_up(app)
+
+    # Cache de tokens verificados e pool de hash de senhas
+    from services.token_cache import token_cache
+    from services.password_service import password_hasher
+    token_cache.init_app(app)
+    password_hasher.init_app(app)
+
+    # Entrega de notificações em lote, fora da requisição
+    from services.notification_dispatcher import notification_dispatcher
+    notification_dispatcher.init_app(app)
+    from services.notification_broker import notification_broker
+    notification_broker.init_app(app)
+
+    # Uploads endereçados pelo conteúdo e variantes redimensionadas, geradas em segundo plano
+    from services.upload_storage import upload_storage
+    upload_storage.init_app(app)
+    from services.image_pipeline import image_pipeline
+    image_pipeline.init_app(app)
+
+    # Tarefas periódicas em processo (opcional)
+    if app.config.get('SCHEDULER_ENABLED'):
+        from services.ranking_service import start_scheduler as start_ranking_scheduler
+        start_ranking_scheduler(app)
+        from services.notification_retention import start_scheduler as start_retention_scheduler
+        start_retention_scheduler(app)
+        from services.upload_storage import start_scheduler as start_upload_gc_scheduler
+        start_upload_gc_scheduler(app)
 
     # Importa os modelos para garantir que o SQLAlchemy reconheça todas as tabelas
     with app.app_context():
-        from models import User, Notification, Post, Like, Comment, Follow
+        from models import (User, Notification, NotificationActor, NotificationArchive,
+                            NotificationStreamTicket, Post, Like, Comment, Follow, TimelineEntry,
+                            UploadBlob)
 
     return app
 
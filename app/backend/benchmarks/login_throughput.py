@@ -0,0 +1,142 @@
+"""
+Benchmark de throughput de login com o pool de hash de senhas.
+
+Para cada quantidade de processos do pool (PASSWORD_POOL_WORKERS; 0 = bcrypt na
+thread da requisição), dispara logins concorrentes por alguns segundos em um banco
+temporário e, em paralelo, uma rota barata (GET /api/users/<id>) para medir quanto
+a rajada de logins atrasa o resto da API.
+
+Uso (a partir de app/backend):
+    python benchmarks/login_throughput.py --workers 0 1 2 4 --clients 8 --seconds 5 --rounds 10
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_migrate import upgrade
+from app import create_app
+from services.password_service import password_hasher
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def _make_app(db_path, workers, rounds, queue_max):
+    return create_app({
+        'DB_PATH': db_path,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'PASSWORD_POOL_WORKERS': workers,
+        'PASSWORD_BCRYPT_ROUNDS': rounds,
+        'PASSWORD_POOL_QUEUE_MAX': queue_max,
+        'AUTH_CACHE_MAX_SIZE': 0,
+    })
+
+def _seed(app, users):
+    client = app.test_client()
+    for i in range(users):
+        response = client.post('/api/users', json={
+            'name': f'Bench {i}', 'username': f'bench{i}',
+            'email': f'bench{i}@example.com', 'password': 'senha-bench',
+        })
+        assert response.status_code == 201, response.get_json()
+
+def run(app, clients, seconds, users):
+    """Roda a rajada e retorna o resumo de logins e da rota de controle."""
+    stop = threading.Event()
+    ok, rejected, failed = [0], [0], [0]
+    login_ms, probe_ms = [], []
+    lock = threading.Lock()
+
+    def login_loop(n):
+        client = app.test_client()
+        i = n
+        while not stop.is_set():
+            started = time.perf_counter()
+            response = client.post('/api/login', json={
+                'email': f'bench{i % users}@example.com', 'password': 'senha-bench'
+            })
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                if response.status_code == 200:
+                    ok[0] += 1
+                    login_ms.append(elapsed)
+                elif response.status_code == 503:
+                    rejected[0] += 1
+                else:
+                    failed[0] += 1
+            i += clients
+
+    def probe_loop():
+        client = app.test_client()
+        while not stop.is_set():
+            started = time.perf_counter()
+            client.get('/api/users/1')
+            probe_ms.append((time.perf_counter() - started) * 1000)
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=login_loop, args=(n,)) for n in range(clients)]
+    threads.append(threading.Thread(target=probe_loop))
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'logins_per_s': ok[0] / elapsed,
+        'rejected': rejected[0],
+        'failed': failed[0],
+        'login_p50_ms': statistics.median(login_ms) if login_ms else 0.0,
+        'login_p95_ms': _percentile(login_ms, 95),
+        'probe_p50_ms': statistics.median(probe_ms) if probe_ms else 0.0,
+        'probe_p95_ms': _percentile(probe_ms, 95),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4],
+                        help='Processos do pool a comparar (0 = na thread da requisição).')
+    parser.add_argument('--clients', type=int, default=8, help='Logins concorrentes.')
+    parser.add_argument('--seconds', type=float, default=5, help='Duração de cada rodada.')
+    parser.add_argument('--rounds', type=int, default=12, help='Custo do bcrypt.')
+    parser.add_argument('--queue-max', type=int, default=32, help='PASSWORD_POOL_QUEUE_MAX.')
+    parser.add_argument('--users', type=int, default=20, help='Usuários criados para o login.')
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    try:
+        db_path = os.path.join(tmp, 'bench.sqlite')
+        app = _make_app(db_path, 0, args.rounds, args.queue_max)
+        with app.app_context():
+            upgrade(directory=os.path.join(app.root_path, 'migrations'))
+        _seed(app, args.users)
+
+        print(f'bcrypt rounds={args.rounds} clientes={args.clients} duração={args.seconds}s '
+              f'CPUs={os.cpu_count()}')
+        print(f"{'workers':>7} {'logins/s':>9} {'503':>5} {'login p50':>10} {'login p95':>10} "
+              f"{'rota p50':>9} {'rota p95':>9}")
+        for workers in args.workers:
+            password_hasher.shutdown()
+            app = _make_app(db_path, workers, args.rounds, args.queue_max)
+            result = run(app, args.clients, args.seconds, args.users)
+            print(f"{workers:>7} {result['logins_per_s']:>9.1f} {result['rejected']:>5} "
+                  f"{result['login_p50_ms']:>8.1f}ms {result['login_p95_ms']:>8.1f}ms "
+                  f"{result['probe_p50_ms']:>7.1f}ms {result['probe_p95_ms']:>7.1f}ms")
+        password_hasher.shutdown()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
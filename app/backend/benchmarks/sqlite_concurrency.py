@@ -0,0 +1,169 @@
+"""
+Benchmark de concorrência de leitura/escrita no SQLite, antes e depois do perfil do engine
+e do roteamento leitura/escrita.
+
+Para cada perfil, em um banco temporário novo, leitores (GET de posts e perfis) e
+escritores (like/unlike e comentários) rodam em paralelo por alguns segundos:
+
+  - padrão: SQLITE_PROFILE_ENABLED=False (rollback journal, PRAGMAs padrão);
+  - wal:    services/sqlite_profile (WAL, synchronous=NORMAL, busy_timeout, pool...),
+            com leituras e escritas no mesmo pool;
+  - rotas:  o perfil mais services/db_routing (leituras no engine somente leitura,
+            escritas em fila na conexão única do escritor).
+
+Mostra requisições por segundo, latências e erros (respostas 5xx, em geral
+`database is locked`) de cada lado.
+
+Uso (a partir de app/backend):
+    python benchmarks/sqlite_concurrency.py --readers 8 --writers 4 --seconds 5
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_migrate import upgrade
+from app import create_app
+from services.password_service import password_hasher
+
+PROFILES = {
+    'padrão': {'SQLITE_PROFILE_ENABLED': False},
+    'wal': {'SQLITE_PROFILE_ENABLED': True, 'DB_ROUTING_ENABLED': False},
+    'rotas': {'SQLITE_PROFILE_ENABLED': True, 'DB_ROUTING_ENABLED': True},
+}
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+def _make_app(db_path, overrides):
+    return create_app({
+        'DB_PATH': db_path,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'PASSWORD_POOL_WORKERS': 0,
+        'PASSWORD_BCRYPT_ROUNDS': 4,
+        'SCHEDULER_ENABLED': False,
+        **overrides,
+    })
+
+def _seed(app, users, posts):
+    """Cria os usuários e posts e retorna os tokens dos usuários."""
+    client = app.test_client()
+    tokens = []
+    for i in range(users):
+        response = client.post('/api/users', json={
+            'name': f'Bench {i}', 'username': f'bench{i}',
+            'email': f'bench{i}@example.com', 'password': 'senha-bench',
+        })
+        assert response.status_code == 201, response.get_json()
+        response = client.post('/api/login', json={'email': f'bench{i}@example.com', 'password': 'senha-bench'})
+        tokens.append(response.get_json()['token'])
+    for i in range(posts):
+        response = client.post('/api/posts', data={'content': f'post {i}'},
+                               headers={'Authorization': f'Bearer {tokens[i % users]}'},
+                               content_type='multipart/form-data')
+        assert response.status_code == 201, response.get_json()
+    return tokens
+
+def run(app, tokens, readers, writers, seconds, posts):
+    """Roda leitores e escritores em paralelo e retorna o resumo de cada lado."""
+    stop = threading.Event()
+    lock = threading.Lock()
+    results = {side: {'ok': 0, 'errors': 0, 'ms': []} for side in ('read', 'write')}
+
+    def record(side, response, elapsed):
+        with lock:
+            if response.status_code >= 500:
+                results[side]['errors'] += 1
+            else:
+                results[side]['ok'] += 1
+                results[side]['ms'].append(elapsed)
+
+    def read_loop(n):
+        client = app.test_client()
+        i = n
+        while not stop.is_set():
+            url = f'/api/posts/{i % posts + 1}' if i % 2 else f'/api/users/{i % len(tokens) + 1}'
+            started = time.perf_counter()
+            response = client.get(url)
+            record('read', response, (time.perf_counter() - started) * 1000)
+            i += readers
+
+    def write_loop(n):
+        client = app.test_client()
+        headers = {'Authorization': f'Bearer {tokens[n % len(tokens)]}'}
+        i = n
+        while not stop.is_set():
+            post_id = i % posts + 1
+            started = time.perf_counter()
+            if i % 3 == 0:
+                response = client.post(f'/api/comments/{post_id}', json={'content': 'bench'}, headers=headers)
+            elif i % 3 == 1:
+                response = client.post(f'/api/posts/{post_id}/like', headers=headers)
+            else:
+                response = client.delete(f'/api/posts/{post_id}/like', headers=headers)
+            record('write', response, (time.perf_counter() - started) * 1000)
+            i += 1
+
+    threads = [threading.Thread(target=read_loop, args=(n,)) for n in range(readers)]
+    threads += [threading.Thread(target=write_loop, args=(n,)) for n in range(writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    summary = {}
+    for side, result in results.items():
+        summary[side] = {
+            'per_s': result['ok'] / elapsed,
+            'errors': result['errors'],
+            'p50_ms': statistics.median(result['ms']) if result['ms'] else 0.0,
+            'p95_ms': _percentile(result['ms'], 95),
+        }
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=list(PROFILES),
+                        help='Perfis a comparar.')
+    parser.add_argument('--readers', type=int, default=8, help='Threads de leitura.')
+    parser.add_argument('--writers', type=int, default=4, help='Threads de escrita.')
+    parser.add_argument('--seconds', type=float, default=5, help='Duração de cada rodada.')
+    parser.add_argument('--users', type=int, default=20, help='Usuários criados.')
+    parser.add_argument('--posts', type=int, default=200, help='Posts criados.')
+    args = parser.parse_args()
+
+    print(f'leitores={args.readers} escritores={args.writers} duração={args.seconds}s CPUs={os.cpu_count()}')
+    print(f"{'perfil':>7} {'leituras/s':>11} {'erros':>6} {'p50':>8} {'p95':>8} "
+          f"{'escritas/s':>11} {'erros':>6} {'p50':>8} {'p95':>8}")
+    for name in args.profiles:
+        tmp = tempfile.mkdtemp()
+        try:
+            db_path = os.path.join(tmp, 'bench.sqlite')
+            app = _make_app(db_path, PROFILES[name])
+            with app.app_context():
+                upgrade(directory=os.path.join(app.root_path, 'migrations'))
+            tokens = _seed(app, args.users, args.posts)
+            result = run(app, tokens, args.readers, args.writers, args.seconds, args.posts)
+            read, write = result['read'], result['write']
+            print(f"{name:>7} {read['per_s']:>11.1f} {read['errors']:>6} {read['p50_ms']:>6.1f}ms "
+                  f"{read['p95_ms']:>6.1f}ms {write['per_s']:>11.1f} {write['errors']:>6} "
+                  f"{write['p50_ms']:>6.1f}ms {write['p95_ms']:>6.1f}ms")
+        finally:
+            password_hasher.shutdown()
+            shutil.rmtree(tmp, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
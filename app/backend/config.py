@@ -7,4 +7,119 @@ class Config:
     SQLALCHEMY_DATABASE_URI = f'sqlite:///{DB_PATH}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Perfil do SQLite (services/sqlite_profile): PRAGMAs aplicados a cada conexão nova
+    # e pool de POOL_SIZE conexões (+ MAX_OVERFLOW sob pico) compartilhado entre threads.
+    # Escritores concorrentes esperam até BUSY_TIMEOUT_MS pelo lock de escrita.
+    SQLITE_PROFILE_ENABLED = True
+    SQLITE_JOURNAL_MODE = 'WAL'
+    SQLITE_SYNCHRONOUS = 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS = 5000
+    SQLITE_CACHE_SIZE_KB = 64 * 1024
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+    SQLITE_TEMP_STORE = 'MEMORY'
+    SQLITE_FOREIGN_KEYS = True
+    SQLITE_JOURNAL_SIZE_LIMIT = 64 * 1024 * 1024
+    SQLITE_POOL_SIZE = 10
+    SQLITE_POOL_MAX_OVERFLOW = 10
+    SQLITE_POOL_TIMEOUT = 10
+
+    # Roteamento leitura/escrita (services/db_routing): com o perfil ativo, as consultas vão
+    # para um engine somente leitura com o pool acima, e as escritas para o engine principal,
+    # com WRITER_POOL_SIZE conexão; outros escritores esperam até WRITER_TIMEOUT segundos.
+    DB_ROUTING_ENABLED = True
+    SQLITE_WRITER_POOL_SIZE = 1
+    SQLITE_WRITER_TIMEOUT = 30
+
+    # Unidade de trabalho por requisição (services/unit_of_work): as escritas dos DAOs só
+    # fazem flush e a requisição confirma tudo em um commit (respostas 4xx/5xx desfazem)
+    UNIT_OF_WORK_PER_REQUEST = True
+
     SECRET_KEY = token_hex(32)
+
+    # Cache de tokens verificados (LRU por processo): evita decodificar o JWT e
+    # buscar o usuário a cada requisição autenticada
+    AUTH_CACHE_TTL_SECONDS = 60
+    AUTH_CACHE_MAX_SIZE = 10000
+
+    # bcrypt: custo (log2 das rodadas) dos hashes novos; hashes com outro custo são
+    # refeitos no login. O hash/verificação roda em um pool de WORKERS processos com
+    # até QUEUE_MAX tarefas esperando; saturado, responde 503 na hora.
+    PASSWORD_BCRYPT_ROUNDS = 12
+    PASSWORD_POOL_WORKERS = 2
+    PASSWORD_POOL_QUEUE_MAX = 32
+    PASSWORD_POOL_TIMEOUT_SECONDS = 5
+
+    # Timeline (home feed): autores com mais seguidores que o limite não fazem
+    # fan-out na escrita; seus posts são mesclados na leitura.
+    TIMELINE_FANOUT_MAX_FOLLOWERS = 5000
+    # Quantidade de posts recentes copiados para a timeline ao seguir alguém
+    TIMELINE_BACKFILL_POSTS = 50
+
+    # Ranking do Explorar: score = likes * LIKE + comentários * COMMENT + recência,
+    # onde a recência vale RECENCY no momento da publicação e decai linearmente
+    # até zero em HOT_SCORE_RECENCY_HOURS.
+    HOT_SCORE_LIKE_WEIGHT = 2
+    HOT_SCORE_COMMENT_WEIGHT = 1
+    HOT_SCORE_RECENCY_WEIGHT = 3
+    HOT_SCORE_RECENCY_HOURS = 48
+
+    # Agendador em processo (tarefas periódicas como o decaimento do ranking)
+    SCHEDULER_ENABLED = False
+    HOT_SCORE_REFRESH_SECONDS = 300
+
+    # Notificações gravadas em lote por uma thread de fundo: a cada FLUSH_MS ou
+    # BATCH_SIZE eventos. Com a fila cheia (QUEUE_MAX) a gravação volta a ser síncrona.
+    NOTIFICATIONS_ASYNC = True
+    NOTIFICATION_BATCH_SIZE = 200
+    NOTIFICATION_FLUSH_MS = 5
+    NOTIFICATION_QUEUE_MAX = 10000
+    # Notificações do mesmo tipo e alvo são agregadas enquanto não lidas;
+    # guarda os ids dos N atores mais recentes de cada uma
+    NOTIFICATION_RECENT_ACTORS = 3
+    # Stream SSE (/api/notifications/stream): heartbeat das conexões ociosas e eventos
+    # pendentes por conexão antes de descartar e pedir `resync` ao cliente. O stream é
+    # aberto com um ticket de uso único (POST /api/notifications/stream/ticket) válido
+    # por TICKET_SECONDS
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS = 15
+    NOTIFICATION_STREAM_MAX_PENDING = 100
+    NOTIFICATION_STREAM_TICKET_SECONDS = 30
+    # Retenção (manage.py prune-notifications ou agendador): remove as lidas sem atividade
+    # há mais de RETENTION_DAYS e mantém no máximo MAX_PER_USER por usuário, em lotes de
+    # RETENTION_BATCH_SIZE com uma pausa entre eles. Com ARCHIVE, as removidas são
+    # copiadas para notification_archive. VACUUM_PAGES limita o incremental_vacuum.
+    NOTIFICATION_RETENTION_DAYS = 90
+    NOTIFICATION_MAX_PER_USER = 1000
+    NOTIFICATION_RETENTION_BATCH_SIZE = 500
+    NOTIFICATION_RETENTION_PAUSE_MS = 20
+    NOTIFICATION_ARCHIVE = False
+    NOTIFICATION_RETENTION_INTERVAL_SECONDS = 3600
+    NOTIFICATION_VACUUM_PAGES = 2000
+
+    # Uploads: tamanho máximo por arquivo (a leitura é interrompida com 413 ao passar).
+    # Arquivos sem referências há mais de GC_GRACE_SECONDS são apagados pela coleta de
+    # lixo (manage.py gc-uploads ou agendador, a cada GC_INTERVAL_SECONDS).
+    UPLOAD_MAX_BYTES = 10 * 1024 * 1024
+    UPLOAD_GC_GRACE_SECONDS = 3600
+    UPLOAD_GC_INTERVAL_SECONDS = 600
+    UPLOAD_GC_BATCH_SIZE = 500
+
+    # Entrega de /uploads: com CACHE_IMMUTABLE, Cache-Control immutable por CACHE_MAX_AGE
+    # e ETag pelo nome (os nomes nunca mudam de conteúdo). SERVE_MODE: "app" (Flask,
+    # sendfile via wsgi.file_wrapper), "x-accel" (nginx, location interna ACCEL_PREFIX)
+    # ou "x-sendfile" (Apache/lighttpd).
+    UPLOADS_SERVE_MODE = 'app'
+    UPLOADS_CACHE_IMMUTABLE = True
+    UPLOADS_CACHE_MAX_AGE = 31536000
+    UPLOADS_ACCEL_PREFIX = '/protected-uploads/'
+
+    # Imagens enviadas: variantes (post: feed 640/full 1280; avatar: 64/128) em
+    # IMAGE_VARIANT_FORMAT (WEBP, ou JPEG sem suporte a WebP no Pillow), geradas por uma
+    # thread de fundo com até QUEUE_MAX imagens na fila. Com ASYNC desligado, na requisição.
+    IMAGE_VARIANTS_ENABLED = True
+    IMAGE_VARIANTS_ASYNC = True
+    IMAGE_VARIANTS_QUEUE_MAX = 1000
+    IMAGE_VARIANT_FORMAT = 'WEBP'
+    IMAGE_VARIANT_QUALITY = 80
+
+    # Quantidade de comentários de primeiro nível enviados junto com cada post do feed
+    COMMENTS_PREVIEW_SIZE = 3
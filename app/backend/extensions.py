@@ -1,3 +1,32 @@
+import logging
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from services.db_routing import RoutingSession
 
-db = SQLAlchemy()
\ No newline at end of file
+logger = logging.getLogger(__name__)
+
+# Sessão que manda as consultas de leitura ao engine somente leitura (services/db_routing)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+def after_commit(callback):
+    """
+    Agenda `callback` para rodar depois que a transação atual da sessão for confirmada.
+    Se a transação for desfeita, o callback é descartado. Usado para manter estruturas
+    em memória (índices, caches) em sincronia apenas com o que foi de fato gravado.
+    """
+    db.session.info.setdefault('after_commit', []).append(callback)
+
+@event.listens_for(Session, 'after_commit')
+def _run_after_commit(session):
+    callbacks = session.info.pop('after_commit', [])
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception:
+            logger.exception('Falha em callback after_commit')
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_commit(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop('after_commit', None)
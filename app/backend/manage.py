@@ -1,9 +1,131 @@
-from flask.cli import FlaskGroup
-from app import create_app 
+import click
+from flask.cli import FlaskGroup, with_appcontext
+from app import create_app
 from extensions import db
 
-app = create_app()
-cli = FlaskGroup(app)
+# O app só é criado quando um comando precisa dele (check-query-plans usa um banco
+# temporário e não deve abrir database/app.sqlite)
+cli = FlaskGroup(create_app=create_app)
+
+@cli.command('check-counters')
+@click.option('--fix', is_flag=True, help='Corrige os contadores divergentes.')
+@with_appcontext
+def check_counters(fix):
+    """Compara os contadores desnormalizados com a contagem real."""
+    from services.counter_service import find_counter_drift, repair_counters
+
+    drift = find_counter_drift()
+    for item in drift:
+        click.echo(
+            f"{item['table']}#{item['id']} {item['column']}: "
+            f"armazenado={item['stored']} real={item['actual']}"
+        )
+
+    if not drift:
+        click.echo('Nenhuma divergência encontrada.')
+        return
+
+    if fix:
+        fixed = repair_counters()
+        click.echo(f'{fixed} linha(s) corrigida(s).')
+    else:
+        click.echo(f'{len(drift)} divergência(s). Use --fix para corrigir.')
+        raise SystemExit(1)
+
+@cli.command('refresh-hot-scores')
+@click.option('--full', is_flag=True, help='Recalcula todos os posts, não só os recentes.')
+@with_appcontext
+def refresh_hot_scores(full):
+    """Recalcula o hot score do Explorar (decaimento por recência)."""
+    from services.ranking_service import refresh_hot_scores as refresh
+
+    updated = refresh(full=full)
+    click.echo(f'{updated} post(s) atualizado(s).')
+
+@cli.command('prune-notifications')
+@click.option('--days', type=int, default=None, help='Idade máxima das notificações lidas (padrão: NOTIFICATION_RETENTION_DAYS).')
+@click.option('--max-per-user', type=int, default=None, help='Máximo de notificações por usuário (padrão: NOTIFICATION_MAX_PER_USER).')
+@click.option('--archive/--no-archive', default=None, help='Copia as removidas para notification_archive.')
+@click.option('--enable-incremental-vacuum', is_flag=True,
+              help='Ativa auto_vacuum=INCREMENTAL (roda um VACUUM completo uma vez).')
+@with_appcontext
+def prune_notifications(days, max_per_user, archive, enable_incremental_vacuum):
+    """Retenção das notificações: remove antigas lidas, aplica o limite por usuário e faz vacuum."""
+    from services import notification_retention
+
+    if enable_incremental_vacuum:
+        notification_retention.enable_incremental_vacuum()
+        click.echo('auto_vacuum incremental ativado.')
+
+    report = notification_retention.prune_notifications(days, max_per_user, archive)
+    click.echo(f"{report['expired']} notificação(ões) lida(s) antiga(s) removida(s).")
+    click.echo(f"{report['over_cap']} removida(s) pelo limite por usuário.")
+    if report['archived']:
+        click.echo(f"{report['archived']} arquivada(s) em notification_archive.")
+    if report['vacuumed_pages'] is None:
+        click.echo('Vacuum incremental desativado (use --enable-incremental-vacuum).')
+    else:
+        click.echo(f"{report['vacuumed_pages']} página(s) liberada(s) pelo vacuum.")
+    click.echo(f"{report['batches']} lote(s) em {report['elapsed_ms']} ms.")
+
+@cli.command('gc-uploads')
+@click.option('--grace-seconds', type=int, default=None,
+              help='Tempo mínimo sem referências (padrão: UPLOAD_GC_GRACE_SECONDS).')
+@with_appcontext
+def gc_uploads(grace_seconds):
+    """Apaga os uploads (e variantes) que não são mais usados por nenhum post ou usuário."""
+    from services.upload_storage import upload_storage
+
+    report = upload_storage.collect_garbage(grace_seconds)
+    click.echo(f"{report['collected']} upload(s) sem referências removido(s) "
+               f"({report['files_removed']} arquivo(s), {report['tmp_removed']} temporário(s)) "
+               f"em {report['elapsed_ms']} ms.")
+
+@cli.command('generate-image-variants')
+@click.option('--batch-size', type=int, default=100, help='Linhas lidas por consulta.')
+@with_appcontext
+def generate_image_variants(batch_size):
+    """Gera as variantes das imagens de posts e fotos de perfil que ainda não as têm."""
+    from DAO import post_dao, user_dao
+    from services.image_pipeline import image_pipeline
+
+    if not image_pipeline.enabled:
+        click.echo('Pipeline de imagens desativado (Pillow ausente ou IMAGE_VARIANTS_ENABLED = False).')
+        raise SystemExit(1)
+
+    sources = [
+        ('post', post_dao.get_posts_without_variants, lambda post: post.image_url),
+        ('avatar', user_dao.get_users_without_variants, lambda user: user.profile_picture),
+    ]
+    for kind, fetch, path_of in sources:
+        done = failed = after_id = 0
+        while True:
+            rows = [(row.id, path_of(row)) for row in fetch(after_id, batch_size)]
+            db.session.remove()
+            if not rows:
+                break
+            for row_id, path in rows:
+                if image_pipeline.process(kind, row_id, path):
+                    done += 1
+                else:
+                    failed += 1
+            after_id = rows[-1][0]
+        click.echo(f'{kind}: {done} imagem(ns) processada(s), {failed} com falha.')
+
+@cli.command('check-query-plans', with_appcontext=False)
+@click.option('--verbose', is_flag=True, help='Mostra o plano de cada comando SQL.')
+def check_query_plans(verbose):
+    """Verifica por EXPLAIN QUERY PLAN que nenhuma consulta dos DAOs faz full scan."""
+    from services.query_plan_check import check
+
+    problems = check(create_app, verbose=verbose, echo=click.echo)
+    for problem in problems:
+        click.echo(problem)
+
+    if problems:
+        click.echo(f'{len(problems)} problema(s) nos planos de consulta.')
+        raise SystemExit(1)
+    click.echo('Planos de consulta ok.')
 
 if __name__ == "__main__":
-    cli()
\ No newline at end of file
+    cli()
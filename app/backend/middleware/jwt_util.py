@@ -2,6 +2,7 @@ import jwt
 from functools import wraps
 from flask import request, jsonify, current_app
 from DAO import user_dao
+from services.token_cache import token_cache, snapshot_of
 
 def generate_token(user):
     """
@@ -32,6 +33,46 @@ def decode_token(token):
         # Token inválido
         return None
 
+def bearer_token():
+    """
+    Token do cabeçalho `Authorization: Bearer <token>`, ou None se ausente. Nunca da
+    query string, que fica nos logs de acesso (o stream SSE usa tickets de uso único).
+    """
+    auth_header = request.headers.get('Authorization', None)
+    if auth_header and auth_header.startswith('Bearer '):
+        return auth_header.split(' ')[1]
+    return None
+
+def authenticate(token):
+    """
+    Verifica o token e resolve o usuário, passando pelo cache de tokens verificados.
+    Retorna (payload, usuário): (None, None) se o token for inválido e (payload, None)
+    se o usuário não existir mais. O usuário é um resumo (AuthUser), não o objeto ORM.
+    """
+    if not token:
+        return None, None
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
+    payload = decode_token(token)
+    if not payload:
+        return None, None
+    user = user_dao.get_user_by_id(payload['user_id'])
+    if not user:
+        return payload, None
+    snapshot = snapshot_of(user)
+    token_cache.put(token, payload, snapshot)
+    return payload, snapshot
+
+def optional_user_id():
+    """
+    Retorna o user_id do token Bearer da requisição, se houver um válido, ou None.
+    Para rotas públicas que só personalizam a resposta quando há usuário logado.
+    """
+    _, user = authenticate(bearer_token())
+    return user.id if user else None
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -39,16 +80,13 @@ def token_required(f):
             # Não retorna nada — deixa o flask-cors responder
             return '', 200
 
-        auth_header = request.headers.get('Authorization', None)
-        if not auth_header or not auth_header.startswith('Bearer '):
+        token = bearer_token()
+        if not token:
             return jsonify({'error': 'Token is missing'}), 401
 
-        token = auth_header.split(' ')[1]
-        payload = decode_token(token)
+        payload, user = authenticate(token)
         if not payload:
             return jsonify({'error': 'Token is invalid or expired'}), 401
-
-        user = user_dao.get_user_by_id(payload['user_id'])
         if not user:
             return jsonify({'error': 'User not found'}), 401
 
@@ -57,4 +95,3 @@ def token_required(f):
 
         return f(*args, **kwargs)
     return decorated
-
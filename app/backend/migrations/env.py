@@ -51,6 +51,16 @@ def get_metadata():
     return target_db.metadata
 
 
+def include_name(name, type_, parent_names):
+    # As tabelas virtuais FTS5 (users_fts, posts_fts) e as tabelas-sombra que o
+    # SQLite cria para elas (*_fts_data, *_fts_idx, *_fts_config, *_fts_docsize)
+    # vêm da migração c61a3e0f7b58 e não estão nos models: sem este filtro o
+    # autogenerate gera drop_table para elas e apaga a busca.
+    if type_ == 'table':
+        return not (name.endswith('_fts') or '_fts_' in name)
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +75,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_name=include_name
     )
 
     with context.begin_transaction():
@@ -93,18 +104,34 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_name", include_name)
 
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # batch_alter_table recria as tabelas (DROP + rename): com foreign_keys=ON
+        # o DROP de uma tabela referenciada apagaria/violaria as linhas filhas.
+        # O PRAGMA não tem efeito dentro de uma transação, por isso vem antes dela.
+        sqlite = connection.dialect.name == 'sqlite'
+        if sqlite:
+            foreign_keys = connection.exec_driver_sql('PRAGMA foreign_keys').scalar()
+            connection.exec_driver_sql('PRAGMA foreign_keys=OFF')
+            connection.commit()
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
             **conf_args
         )
 
-        with context.begin_transaction():
-            context.run_migrations()
+        try:
+            with context.begin_transaction():
+                context.run_migrations()
+        finally:
+            if sqlite:
+                connection.rollback()
+                connection.exec_driver_sql(f'PRAGMA foreign_keys={"ON" if foreign_keys else "OFF"}')
+                connection.commit()
 
 
 if context.is_offline_mode():
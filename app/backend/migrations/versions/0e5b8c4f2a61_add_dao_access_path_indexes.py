@@ -0,0 +1,33 @@
+"""add indexes for the remaining DAO access paths
+
+Revision ID: 0e5b8c4f2a61
+Revises: d72c5a8e3b19
+Create Date: 2026-10-18 20:34:26.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0e5b8c4f2a61'
+down_revision = 'd72c5a8e3b19'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_notification_user_created_id', 'notification', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_notification_user_read', 'notification', ['user_id', 'read'], unique=False)
+    op.create_index('ix_posts_reply_id', 'posts', ['reply_id'], unique=False,
+                    sqlite_where=sa.text('reply_id IS NOT NULL'))
+    op.create_index('ix_comments_user_id', 'comments', ['user_id'], unique=False)
+    op.create_index('ix_timeline_author', 'timeline_entries', ['author_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_timeline_author', table_name='timeline_entries')
+    op.drop_index('ix_comments_user_id', table_name='comments')
+    op.drop_index('ix_posts_reply_id', table_name='posts')
+    op.drop_index('ix_notification_user_read', table_name='notification')
+    op.drop_index('ix_notification_user_created_id', table_name='notification')
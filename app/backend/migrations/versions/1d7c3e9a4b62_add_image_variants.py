@@ -0,0 +1,36 @@
+"""add image dimensions and variants to posts and users
+
+Revision ID: 1d7c3e9a4b62
+Revises: 6e1a4f9c3b57
+Create Date: 2026-10-18 23:41:07.552310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1d7c3e9a4b62'
+down_revision = '6e1a4f9c3b57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_width', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('image_height', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('image_variants', sa.Text(), nullable=True))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('profile_picture_variants', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('profile_picture_variants')
+
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('image_variants')
+        batch_op.drop_column('image_height')
+        batch_op.drop_column('image_width')
@@ -0,0 +1,37 @@
+"""add hot_score to posts
+
+Revision ID: 2f6b0d83c9a5
+Revises: e7a2c94d0f16
+Create Date: 2026-10-18 14:31:09.264810
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2f6b0d83c9a5'
+down_revision = 'e7a2c94d0f16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('hot_score', sa.Float(), server_default='0', nullable=False))
+
+    # Score inicial: likes * 2 + comentários + recência (3 pontos decaindo em 48h)
+    op.execute("""
+        UPDATE posts SET hot_score =
+            likes_count * 2 + comments_count
+            + MAX(0.0, 48.0 - (julianday('now') - julianday(created_at)) * 24.0) / 48.0 * 3
+    """)
+
+    op.create_index('ix_posts_hot_score_id', 'posts', ['hot_score', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_posts_hot_score_id', table_name='posts')
+
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('hot_score')
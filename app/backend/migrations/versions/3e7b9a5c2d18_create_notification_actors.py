@@ -0,0 +1,51 @@
+"""track the distinct actors of each aggregated notification
+
+Revision ID: 3e7b9a5c2d18
+Revises: 4c8a2e6d9b15
+Create Date: 2026-10-20 10:14:38.602917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e7b9a5c2d18'
+down_revision = '4c8a2e6d9b15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_actors',
+    sa.Column('notification_id', sa.Integer(), nullable=False),
+    sa.Column('actor_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['actor_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['notification_id'], ['notification.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('notification_id', 'actor_id')
+    )
+    op.create_index('ix_notification_actors_actor_id', 'notification_actors', ['actor_id'], unique=False)
+
+    # Notificações não lidas (as únicas que ainda agregam): os atores conhecidos são os
+    # de actor_ids; os que já saíram da lista de recentes não têm como ser recuperados
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(
+        "SELECT n.id, n.actor_id, n.actor_ids FROM notification n WHERE n.read = 0"
+    )).all()
+    actors = set()
+    for notification_id, actor_id, actor_ids in rows:
+        ids = [int(i) for i in (actor_ids or '').split(',') if i]
+        if actor_id is not None:
+            ids.append(actor_id)
+        actors.update((notification_id, i) for i in ids)
+    if actors:
+        connection.execute(
+            sa.text("INSERT OR IGNORE INTO notification_actors (notification_id, actor_id) "
+                    "SELECT :n, :a WHERE EXISTS (SELECT 1 FROM users WHERE id = :a)"),
+            [{'n': n, 'a': a} for n, a in sorted(actors)]
+        )
+
+
+def downgrade():
+    op.drop_index('ix_notification_actors_actor_id', table_name='notification_actors')
+    op.drop_table('notification_actors')
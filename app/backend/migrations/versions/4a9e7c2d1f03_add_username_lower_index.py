@@ -0,0 +1,24 @@
+"""add lower(username) index
+
+Revision ID: 4a9e7c2d1f03
+Revises: c61a3e0f7b58
+Create Date: 2026-10-18 18:12:57.338105
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a9e7c2d1f03'
+down_revision = 'c61a3e0f7b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_users_username_lower', 'users', [sa.text('lower(username)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_username_lower', table_name='users')
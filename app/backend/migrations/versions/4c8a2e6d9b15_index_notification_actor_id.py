@@ -0,0 +1,26 @@
+"""index notification.actor_id for foreign key checks
+
+Revision ID: 4c8a2e6d9b15
+Revises: 7f2e5b8d1c43
+Create Date: 2026-10-19 09:41:12.553201
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8a2e6d9b15'
+down_revision = '7f2e5b8d1c43'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Única chave estrangeira sem índice: com foreign_keys=ON, apagar um usuário
+    # varreria a tabela de notificações procurando actor_id
+    op.create_index('ix_notification_actor_id', 'notification', ['actor_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_notification_actor_id', table_name='notification')
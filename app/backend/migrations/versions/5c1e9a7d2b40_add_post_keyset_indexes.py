@@ -0,0 +1,27 @@
+"""add post keyset indexes
+
+Revision ID: 5c1e9a7d2b40
+Revises: 97ae7fb9b7d5
+Create Date: 2026-10-18 10:02:11.418235
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e9a7d2b40'
+down_revision = '97ae7fb9b7d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Índices compostos para paginação por cursor (created_at, id)
+    op.create_index('ix_posts_created_at_id', 'posts', ['created_at', 'id'], unique=False)
+    op.create_index('ix_posts_user_id_created_at_id', 'posts', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_posts_user_id_created_at_id', table_name='posts')
+    op.drop_index('ix_posts_created_at_id', table_name='posts')
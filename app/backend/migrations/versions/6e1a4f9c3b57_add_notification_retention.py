@@ -0,0 +1,47 @@
+"""add notification archive table and retention index
+
+Revision ID: 6e1a4f9c3b57
+Revises: f3b9d6a2c814
+Create Date: 2026-10-18 20:47:26.093184
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e1a4f9c3b57'
+down_revision = 'f3b9d6a2c814'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('notification_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('actor_id', sa.Integer(), nullable=True),
+    sa.Column('type', sa.String(length=20), nullable=False),
+    sa.Column('message', sa.String(length=255), nullable=False),
+    sa.Column('read', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('target_id', sa.Integer(), nullable=True),
+    sa.Column('group_key', sa.String(length=50), nullable=True),
+    sa.Column('actor_count', sa.Integer(), nullable=True),
+    sa.Column('actor_ids', sa.String(length=100), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_notification_archive_user_id', 'notification_archive', ['user_id'], unique=False)
+
+    # Notificações lidas, da mais antiga para a mais nova (varredura da retenção)
+    op.create_index('ix_notification_read_updated', 'notification', ['updated_at'],
+                    sqlite_where=sa.text('read = 1'))
+
+
+def downgrade():
+    op.drop_index('ix_notification_read_updated', table_name='notification')
+    op.drop_index('ix_notification_archive_user_id', table_name='notification_archive')
+    op.drop_table('notification_archive')
@@ -0,0 +1,54 @@
+"""create content-addressed upload blobs with reference counts
+
+Revision ID: 7f2e5b8d1c43
+Revises: 1d7c3e9a4b62
+Create Date: 2026-10-19 01:12:45.903118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f2e5b8d1c43'
+down_revision = '1d7c3e9a4b62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('upload_blobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('path', sa.String(length=255), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('size', sa.Integer(), nullable=True),
+    sa.Column('content_type', sa.String(length=50), nullable=True),
+    sa.Column('refcount', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('released_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('path')
+    )
+    op.create_index('ix_upload_blobs_released_at', 'upload_blobs', ['released_at'], unique=False,
+                    sqlite_where=sa.text('refcount <= 0'))
+    op.create_index('ix_posts_image_url', 'posts', ['image_url'], unique=False,
+                    sqlite_where=sa.text('image_url IS NOT NULL'))
+    op.create_index('ix_users_profile_picture', 'users', ['profile_picture'], unique=False,
+                    sqlite_where=sa.text('profile_picture IS NOT NULL'))
+
+    # Registra os arquivos já referenciados (nomes uuid, sem hash) com a contagem atual
+    op.execute("""
+        INSERT INTO upload_blobs (path, refcount, created_at)
+        SELECT path, COUNT(*), CURRENT_TIMESTAMP FROM (
+            SELECT image_url AS path FROM posts WHERE image_url IS NOT NULL AND image_url != ''
+            UNION ALL
+            SELECT profile_picture FROM users WHERE profile_picture IS NOT NULL AND profile_picture != ''
+        ) GROUP BY path
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_users_profile_picture', table_name='users')
+    op.drop_index('ix_posts_image_url', table_name='posts')
+    op.drop_index('ix_upload_blobs_released_at', table_name='upload_blobs')
+    op.drop_table('upload_blobs')
@@ -0,0 +1,34 @@
+"""single-use tickets for the notification stream
+
+Revision ID: 8b2d6f4a1e70
+Revises: 3e7b9a5c2d18
+Create Date: 2026-10-21 09:32:17.448120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2d6f4a1e70'
+down_revision = '3e7b9a5c2d18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_stream_tickets',
+    sa.Column('ticket_hash', sa.String(length=64), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ticket_hash')
+    )
+    op.create_index('ix_notification_stream_tickets_expires_at', 'notification_stream_tickets', ['expires_at'], unique=False)
+    op.create_index('ix_notification_stream_tickets_user_id', 'notification_stream_tickets', ['user_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_notification_stream_tickets_user_id', table_name='notification_stream_tickets')
+    op.drop_index('ix_notification_stream_tickets_expires_at', table_name='notification_stream_tickets')
+    op.drop_table('notification_stream_tickets')
@@ -0,0 +1,26 @@
+"""add comment tree indexes
+
+Revision ID: 8d4f15b2e9c3
+Revises: 2f6b0d83c9a5
+Create Date: 2026-10-18 15:47:22.031977
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4f15b2e9c3'
+down_revision = '2f6b0d83c9a5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_comments_post_parent_id', 'comments', ['post_id', 'parent_id', 'id'], unique=False)
+    op.create_index('ix_comments_parent_id_id', 'comments', ['parent_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_comments_parent_id_id', table_name='comments')
+    op.drop_index('ix_comments_post_parent_id', table_name='comments')
@@ -0,0 +1,51 @@
+"""add unique (user_id, post_id) on likes and (follower_id, followed_id) on follows
+
+Revision ID: 9b3f6e1c7a24
+Revises: 4a9e7c2d1f03
+Create Date: 2026-10-18 19:05:41.720334
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b3f6e1c7a24'
+down_revision = '4a9e7c2d1f03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Remove duplicados criados pela corrida do check-then-insert, mantendo o mais antigo
+    op.execute("""
+        DELETE FROM likes WHERE id NOT IN (
+            SELECT MIN(id) FROM likes GROUP BY user_id, post_id
+        )
+    """)
+    op.execute("""
+        DELETE FROM follows WHERE id NOT IN (
+            SELECT MIN(id) FROM follows GROUP BY follower_id, followed_id
+        )
+    """)
+
+    # Recalcula os contadores afetados (hot_score perde o peso dos likes removidos)
+    op.execute("""
+        UPDATE posts SET
+            hot_score = hot_score
+                - (likes_count - (SELECT COUNT(*) FROM likes WHERE likes.post_id = posts.id)) * 2,
+            likes_count = (SELECT COUNT(*) FROM likes WHERE likes.post_id = posts.id)
+    """)
+    op.execute("""
+        UPDATE users SET
+            followers_count = (SELECT COUNT(*) FROM follows WHERE follows.followed_id = users.id),
+            following_count = (SELECT COUNT(*) FROM follows WHERE follows.follower_id = users.id)
+    """)
+
+    op.create_index('uq_likes_user_post', 'likes', ['user_id', 'post_id'], unique=True)
+    op.create_index('uq_follows_follower_followed', 'follows', ['follower_id', 'followed_id'], unique=True)
+
+
+def downgrade():
+    op.drop_index('uq_follows_follower_followed', table_name='follows')
+    op.drop_index('uq_likes_user_post', table_name='likes')
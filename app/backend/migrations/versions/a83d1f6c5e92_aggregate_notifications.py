@@ -0,0 +1,52 @@
+"""aggregate notifications by (recipient, type, target)
+
+Revision ID: a83d1f6c5e92
+Revises: 0e5b8c4f2a61
+Create Date: 2026-10-18 21:02:47.905316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a83d1f6c5e92'
+down_revision = '0e5b8c4f2a61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('target_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('group_key', sa.String(length=50), nullable=True))
+        batch_op.add_column(sa.Column('actor_count', sa.Integer(), server_default='1', nullable=False))
+        batch_op.add_column(sa.Column('actor_ids', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # Linhas antigas não têm alvo conhecido: cada uma fica em um grupo próprio
+    op.execute("""
+        UPDATE notification SET
+            read = COALESCE(read, 0),
+            updated_at = created_at,
+            actor_ids = CAST(actor_id AS TEXT),
+            group_key = type || ':#' || id
+    """)
+
+    op.drop_index('ix_notification_user_created_id', table_name='notification')
+    op.create_index('ix_notification_user_updated_id', 'notification', ['user_id', 'updated_at', 'id'], unique=False)
+    op.create_index('uq_notification_unread_group', 'notification', ['user_id', 'group_key'], unique=True,
+                    sqlite_where=sa.text('read = 0'))
+
+
+def downgrade():
+    op.drop_index('uq_notification_unread_group', table_name='notification')
+    op.drop_index('ix_notification_user_updated_id', table_name='notification')
+    op.create_index('ix_notification_user_created_id', 'notification', ['user_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('actor_ids')
+        batch_op.drop_column('actor_count')
+        batch_op.drop_column('group_key')
+        batch_op.drop_column('target_id')
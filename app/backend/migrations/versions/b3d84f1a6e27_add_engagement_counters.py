@@ -0,0 +1,51 @@
+"""add engagement counters to posts and users
+
+Revision ID: b3d84f1a6e27
+Revises: 5c1e9a7d2b40
+Create Date: 2026-10-18 11:24:37.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3d84f1a6e27'
+down_revision = '5c1e9a7d2b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('likes_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('comments_count', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('followers_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('following_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('posts_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Preenche os contadores com os valores atuais
+    op.execute("""
+        UPDATE posts SET
+            likes_count = (SELECT COUNT(*) FROM likes WHERE likes.post_id = posts.id),
+            comments_count = (SELECT COUNT(*) FROM comments WHERE comments.post_id = posts.id)
+    """)
+    op.execute("""
+        UPDATE users SET
+            followers_count = (SELECT COUNT(*) FROM follows WHERE follows.followed_id = users.id),
+            following_count = (SELECT COUNT(*) FROM follows WHERE follows.follower_id = users.id),
+            posts_count = (SELECT COUNT(*) FROM posts WHERE posts.user_id = users.id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('posts_count')
+        batch_op.drop_column('following_count')
+        batch_op.drop_column('followers_count')
+
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_column('comments_count')
+        batch_op.drop_column('likes_count')
@@ -0,0 +1,94 @@
+"""create fts5 search indexes for users and posts
+
+Revision ID: c61a3e0f7b58
+Revises: 8d4f15b2e9c3
+Create Date: 2026-10-18 16:58:40.771203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c61a3e0f7b58'
+down_revision = '8d4f15b2e9c3'
+branch_labels = None
+depends_on = None
+
+
+# Índices FTS5 de conteúdo externo: o texto fica só em users/posts, o índice guarda
+# os tokens. Os triggers mantêm o índice em sincronia com qualquer escrita.
+TOKENIZE = "unicode61 remove_diacritics 2"
+
+STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE users_fts USING fts5(
+        name, username, bio,
+        content='users', content_rowid='id',
+        tokenize='{TOKENIZE}', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER users_fts_ai AFTER INSERT ON users BEGIN
+        INSERT INTO users_fts(rowid, name, username, bio)
+        VALUES (new.id, new.name, new.username, new.bio);
+    END
+    """,
+    """
+    CREATE TRIGGER users_fts_ad AFTER DELETE ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, username, bio)
+        VALUES ('delete', old.id, old.name, old.username, old.bio);
+    END
+    """,
+    """
+    CREATE TRIGGER users_fts_au AFTER UPDATE OF name, username, bio ON users BEGIN
+        INSERT INTO users_fts(users_fts, rowid, name, username, bio)
+        VALUES ('delete', old.id, old.name, old.username, old.bio);
+        INSERT INTO users_fts(rowid, name, username, bio)
+        VALUES (new.id, new.name, new.username, new.bio);
+    END
+    """,
+    f"""
+    CREATE VIRTUAL TABLE posts_fts USING fts5(
+        content, description,
+        content='posts', content_rowid='id',
+        tokenize='{TOKENIZE}', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER posts_fts_ai AFTER INSERT ON posts BEGIN
+        INSERT INTO posts_fts(rowid, content, description)
+        VALUES (new.id, new.content, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_ad AFTER DELETE ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, content, description)
+        VALUES ('delete', old.id, old.content, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER posts_fts_au AFTER UPDATE OF content, description ON posts BEGIN
+        INSERT INTO posts_fts(posts_fts, rowid, content, description)
+        VALUES ('delete', old.id, old.content, old.description);
+        INSERT INTO posts_fts(rowid, content, description)
+        VALUES (new.id, new.content, new.description);
+    END
+    """,
+    # Indexa as linhas já existentes
+    "INSERT INTO users_fts(users_fts) VALUES ('rebuild')",
+    "INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade():
+    for statement in STATEMENTS:
+        op.execute(statement)
+
+
+def downgrade():
+    for trigger in ['posts_fts_au', 'posts_fts_ad', 'posts_fts_ai',
+                    'users_fts_au', 'users_fts_ad', 'users_fts_ai']:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS posts_fts")
+    op.execute("DROP TABLE IF EXISTS users_fts")
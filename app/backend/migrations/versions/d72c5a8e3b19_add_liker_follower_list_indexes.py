@@ -0,0 +1,28 @@
+"""add indexes for paginated liker and follower lists
+
+Revision ID: d72c5a8e3b19
+Revises: 9b3f6e1c7a24
+Create Date: 2026-10-18 19:48:12.503917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd72c5a8e3b19'
+down_revision = '9b3f6e1c7a24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_likes_post_id_id', 'likes', ['post_id', 'id'], unique=False)
+    op.create_index('ix_follows_followed_id_id', 'follows', ['followed_id', 'id'], unique=False)
+    op.create_index('ix_follows_follower_id_id', 'follows', ['follower_id', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_follows_follower_id_id', table_name='follows')
+    op.drop_index('ix_follows_followed_id_id', table_name='follows')
+    op.drop_index('ix_likes_post_id_id', table_name='likes')
@@ -0,0 +1,50 @@
+"""create timeline_entries
+
+Revision ID: e7a2c94d0f16
+Revises: b3d84f1a6e27
+Create Date: 2026-10-18 13:05:48.550371
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a2c94d0f16'
+down_revision = 'b3d84f1a6e27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('timeline_entries',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['author_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'post_id')
+    )
+    op.create_index('ix_timeline_user_created_post', 'timeline_entries', ['user_id', 'created_at', 'post_id'], unique=False)
+    op.create_index('ix_timeline_user_author', 'timeline_entries', ['user_id', 'author_id'], unique=False)
+    op.create_index('ix_timeline_post', 'timeline_entries', ['post_id'], unique=False)
+
+    # Preenche as timelines com os posts já existentes (próprios e de quem cada usuário segue)
+    op.execute("""
+        INSERT OR IGNORE INTO timeline_entries (user_id, post_id, author_id, created_at)
+        SELECT posts.user_id, posts.id, posts.user_id, posts.created_at FROM posts
+    """)
+    op.execute("""
+        INSERT OR IGNORE INTO timeline_entries (user_id, post_id, author_id, created_at)
+        SELECT follows.follower_id, posts.id, posts.user_id, posts.created_at
+        FROM follows JOIN posts ON posts.user_id = follows.followed_id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_timeline_post', table_name='timeline_entries')
+    op.drop_index('ix_timeline_user_author', table_name='timeline_entries')
+    op.drop_index('ix_timeline_user_created_post', table_name='timeline_entries')
+    op.drop_table('timeline_entries')
@@ -0,0 +1,34 @@
+"""add unread notifications counter to users
+
+Revision ID: f3b9d6a2c814
+Revises: a83d1f6c5e92
+Create Date: 2026-10-18 20:02:13.418527
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b9d6a2c814'
+down_revision = 'a83d1f6c5e92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('unread_notifications_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Preenche o contador com as notificações não lidas atuais
+    op.execute("""
+        UPDATE users SET unread_notifications_count = (
+            SELECT COUNT(*) FROM notification
+            WHERE notification.user_id = users.id AND notification.read = 0
+        )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('unread_notifications_count')
@@ -2,5 +2,7 @@ from .comment import Comment
 from .post import Post
 from .user import User
 from .like import Like
-from .notification import Notification
-from .follow import Follow
\ No newline at end of file
+from .notification import Notification, NotificationActor, NotificationArchive, NotificationStreamTicket
+from .follow import Follow
+from .timeline import TimelineEntry
+from .upload import UploadBlob
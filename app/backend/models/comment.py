@@ -1,10 +1,18 @@
 from extensions import db
-from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship, backref
+from models.user import load_variants
 from datetime import datetime
 
 class Comment(db.Model):
     __tablename__ = 'comments'
+    __table_args__ = (
+        # Páginas de comentários por post e de respostas por comentário (ordem por id)
+        Index('ix_comments_post_parent_id', 'post_id', 'parent_id', 'id'),
+        Index('ix_comments_parent_id_id', 'parent_id', 'id'),
+        # Comentários de um usuário (remoção da conta)
+        Index('ix_comments_user_id', 'user_id'),
+    )
 
     id = Column(Integer, primary_key=True)
     post_id = Column(Integer, ForeignKey('posts.id'), nullable=False)
@@ -21,6 +29,13 @@ class Comment(db.Model):
     )
 
     def to_dict(self):
+        return self.build_dict(
+            author=self.author,
+            replies=[reply.to_dict() for reply in self.replies]
+        )
+
+    def build_dict(self, author, replies):
+        """Monta o dict do comentário com autor e respostas já resolvidos."""
         return {
             "id": self.id,
             "post_id": self.post_id,
@@ -29,10 +44,11 @@ class Comment(db.Model):
             "content": self.content,
             "created_at": self.created_at.isoformat(),
             "author": {
-                "id": self.author.id,
-                "username": self.author.username,
-                "name": self.author.name,
-                "profile_picture": self.author.profile_picture
-            } if self.author else None,
-            "replies": [reply.to_dict() for reply in self.replies]
+                "id": author.id,
+                "username": author.username,
+                "name": author.name,
+                "profile_picture": author.profile_picture,
+                "profile_picture_variants": load_variants(author.profile_picture_variants)
+            } if author else None,
+            "replies": replies
         }
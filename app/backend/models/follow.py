@@ -1,9 +1,16 @@
 from datetime import datetime
 from extensions import db
-from sqlalchemy import Column, Integer, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
 
 class Follow(db.Model):
     __tablename__ = 'follows'
+    __table_args__ = (
+        # Um follow por par; garante a idempotência de follow_dao.follow_user
+        Index('uq_follows_follower_followed', 'follower_id', 'followed_id', unique=True),
+        # Listas paginadas de seguidores e de seguidos (mais recentes primeiro)
+        Index('ix_follows_followed_id_id', 'followed_id', 'id'),
+        Index('ix_follows_follower_id_id', 'follower_id', 'id'),
+    )
 
     id = Column(Integer, primary_key=True)
     follower_id = Column(Integer, ForeignKey('users.id'), nullable=False)
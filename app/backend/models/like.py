@@ -1,9 +1,15 @@
 from extensions import db
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 class Like(db.Model):
     __tablename__ = 'likes'
+    __table_args__ = (
+        # Um like por usuário e post; garante a idempotência de like_dao.like_post
+        Index('uq_likes_user_post', 'user_id', 'post_id', unique=True),
+        # Lista paginada de quem curtiu o post (mais recentes primeiro)
+        Index('ix_likes_post_id_id', 'post_id', 'id'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -1,28 +1,154 @@
 from extensions import db
+from sqlalchemy import Index, text
 from datetime import datetime
+from models.user import user_summary
+
+# Mensagens por tipo: (um ator, um ator + outra pessoa, um ator + outras N pessoas)
+MESSAGES = {
+    'like': (
+        "{actor} curtiu seu post.",
+        "{actor} e outra pessoa curtiram seu post.",
+        "{actor} e outras {others} pessoas curtiram seu post.",
+    ),
+    'comment': (
+        "{actor} comentou no seu post.",
+        "{actor} e outra pessoa comentaram no seu post.",
+        "{actor} e outras {others} pessoas comentaram no seu post.",
+    ),
+    'follow': (
+        "{actor} começou a te seguir.",
+        "{actor} e outra pessoa começaram a te seguir.",
+        "{actor} e outras {others} pessoas começaram a te seguir.",
+    ),
+}
+
+def group_key(type, target_id=None):
+    """Chave de agregação de uma notificação: tipo e alvo (ex.: 'like:42', 'follow')."""
+    return f"{type}:{target_id}" if target_id is not None else type
 
 class Notification(db.Model):
+    """
+    Notificação agregada: eventos do mesmo tipo e alvo para o mesmo destinatário
+    (ex.: likes no mesmo post) acumulam em uma única linha enquanto ela não for lida,
+    com a contagem de atores distintos (NotificationActor) e os ids dos mais recentes.
+    """
+    __table_args__ = (
+        # Lista de notificações do usuário (atividade mais recente primeiro) e contagem de não lidas
+        Index('ix_notification_user_updated_id', 'user_id', 'updated_at', 'id'),
+        Index('ix_notification_user_read', 'user_id', 'read'),
+        # Uma linha não lida por grupo; eventos novos do grupo atualizam essa linha
+        Index('uq_notification_unread_group', 'user_id', 'group_key',
+              unique=True, sqlite_where=text('read = 0')),
+        # Retenção: lidas mais antigas primeiro
+        Index('ix_notification_read_updated', 'updated_at', sqlite_where=text('read = 1')),
+        # Chave estrangeira actor_id: com foreign_keys=ON, remover um usuário procura as
+        # notificações que ele causou
+        Index('ix_notification_actor_id', 'actor_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)  # quem recebe
-    actor_id = db.Column(db.Integer, db.ForeignKey("users.id"))  # quem causou
+    actor_id = db.Column(db.Integer, db.ForeignKey("users.id"))  # quem causou (o mais recente)
     type = db.Column(db.String(20), nullable=False)
     message = db.Column(db.String(255), nullable=False)
     read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    target_id = db.Column(db.Integer)  # post do like/comentário; nulo para follow
+    group_key = db.Column(db.String(50))
+    actor_count = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    actor_ids = db.Column(db.String(100))  # ids dos atores mais recentes, "5,3,2"
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
     actor_user = db.relationship("User", foreign_keys=[actor_id])
 
+    @property
+    def recent_actor_ids(self):
+        """Ids dos atores mais recentes, do mais novo para o mais antigo."""
+        if self.actor_ids:
+            return [int(i) for i in self.actor_ids.split(',') if i]
+        return [self.actor_id] if self.actor_id else []
+
+    def render_message(self, actor):
+        """Texto agregado ("X e outras N pessoas curtiram seu post.")."""
+        templates = MESSAGES.get(self.type)
+        if not templates or actor is None:
+            return self.message
+        others = max(0, (self.actor_count or 1) - 1)
+        template = templates[min(others, 2)]
+        return template.format(actor=actor.username, others=others)
+
     def to_dict(self):
+        return self.build_dict([self.actor_user] if self.actor_user else [])
+
+    def build_dict(self, actors):
+        """Serializa com os atores já carregados (mais recentes primeiro)."""
+        summaries = [user_summary(actor) for actor in actors]
         return {
             "id": self.id,
             "type": self.type,
-            "message": self.message,
+            "message": self.render_message(actors[0] if actors else None),
             "read": self.read,
             "created_at": self.created_at.isoformat(),
-            "actor": {
-                "id": self.actor_user.id,
-                "username": self.actor_user.username,
-                "name": self.actor_user.name,
-                "profile_picture": self.actor_user.profile_picture
-            } if self.actor_user else None
+            "updated_at": (self.updated_at or self.created_at).isoformat(),
+            "target_id": self.target_id,
+            "actor_count": self.actor_count or 1,
+            "actor": summaries[0] if summaries else None,
+            "actors": summaries
         }
+
+class NotificationActor(db.Model):
+    """
+    Atores distintos de cada notificação agregada: actor_count é o número de linhas
+    daqui, e não de actor_ids, que só guarda os mais recentes para exibição.
+    """
+    __tablename__ = 'notification_actors'
+    __table_args__ = (
+        # Chave estrangeira actor_id: remover um usuário procura as linhas dele
+        Index('ix_notification_actors_actor_id', 'actor_id'),
+    )
+
+    notification_id = db.Column(db.Integer, db.ForeignKey('notification.id', ondelete='CASCADE'),
+                                primary_key=True)
+    actor_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+
+class NotificationStreamTicket(db.Model):
+    """
+    Ticket de uso único e vida curta para abrir o stream SSE: o EventSource não envia
+    cabeçalhos, e o JWT na query string ficaria nos logs de acesso e no histórico do
+    navegador. Só o hash SHA-256 do ticket é gravado.
+    """
+    __tablename__ = 'notification_stream_tickets'
+    __table_args__ = (
+        # Limpeza dos expirados a cada emissão
+        Index('ix_notification_stream_tickets_expires_at', 'expires_at'),
+        # Chave estrangeira user_id: remover um usuário procura os tickets dele
+        Index('ix_notification_stream_tickets_user_id', 'user_id'),
+    )
+
+    ticket_hash = db.Column(db.String(64), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+class NotificationArchive(db.Model):
+    """
+    Notificações removidas pela retenção (NOTIFICATION_ARCHIVE ligado), com o conteúdo
+    da linha original. Não é lida pela aplicação; sem chaves estrangeiras para
+    sobreviver à remoção de usuários.
+    """
+    __tablename__ = 'notification_archive'
+
+    id = db.Column(db.Integer, primary_key=True)
+    notification_id = db.Column(db.Integer, nullable=False)  # id original (o SQLite pode reutilizá-lo)
+    user_id = db.Column(db.Integer, nullable=False, index=True)
+    actor_id = db.Column(db.Integer)
+    type = db.Column(db.String(20), nullable=False)
+    message = db.Column(db.String(255), nullable=False)
+    read = db.Column(db.Boolean)
+    created_at = db.Column(db.DateTime)
+    target_id = db.Column(db.Integer)
+    group_key = db.Column(db.String(50))
+    actor_count = db.Column(db.Integer)
+    actor_ids = db.Column(db.String(100))
+    updated_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
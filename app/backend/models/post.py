@@ -1,9 +1,22 @@
 from extensions import db
-from sqlalchemy import Column, Integer, Text, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, Float, Text, ForeignKey, DateTime, Index, func, text
 from sqlalchemy.orm import relationship
+from models.user import load_variants
 
 class Post(db.Model):
     __tablename__ = 'posts'
+    __table_args__ = (
+        # Índices para a paginação por cursor (created_at, id)
+        Index('ix_posts_created_at_id', 'created_at', 'id'),
+        Index('ix_posts_user_id_created_at_id', 'user_id', 'created_at', 'id'),
+        # Respostas de um post (cascata ao deletar). Parcial: quase todos os posts têm
+        # reply_id nulo e, com o índice completo, o planner prefere o full scan.
+        Index('ix_posts_reply_id', 'reply_id', sqlite_where=text('reply_id IS NOT NULL')),
+        # Índice para o ranking do Explorar (top-K por hot_score)
+        Index('ix_posts_hot_score_id', 'hot_score', 'id'),
+        # Contagem de referências dos uploads (check-counters)
+        Index('ix_posts_image_url', 'image_url', sqlite_where=text('image_url IS NOT NULL')),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id  = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -11,6 +24,18 @@ class Post(db.Model):
     content  = Column(Text, nullable=True)
     description  = Column(Text, nullable=True)
     image_url = Column(Text, nullable=True)
+    # Dimensões do original e versões redimensionadas ({"feed": caminho, "full": caminho},
+    # JSON), gravadas pelo pipeline de imagens (services/image_pipeline)
+    image_width = Column(Integer, nullable=True)
+    image_height = Column(Integer, nullable=True)
+    image_variants = Column(Text, nullable=True)
+
+    # Contadores desnormalizados, mantidos pelos DAOs de like e comentário
+    likes_count = Column(Integer, nullable=False, default=0, server_default='0')
+    comments_count = Column(Integer, nullable=False, default=0, server_default='0')
+
+    # Score do Explorar (ver services/ranking_service)
+    hot_score = Column(Float, nullable=False, default=0, server_default='0')
 
     created_at = Column(DateTime, nullable=False, default=func.now())
     updated_at = Column(DateTime, nullable=True, onupdate=func.now())
@@ -24,12 +49,35 @@ class Post(db.Model):
     def to_dict(self, current_user=None, include_comments=True):
         is_following = False
         if current_user and self.user:
-            is_following = self.user.followers.filter_by(follower_id=current_user.id).count() > 0
+            from services import follow_graph
+            is_following = follow_graph.ensure_loaded().is_following(current_user.id, self.user_id)
 
         liked_by_user = False
         if current_user:
             liked_by_user = any(like.user_id == current_user.id for like in self.likes)
 
+        comments = None
+        if include_comments:
+            comments = [
+                comment.to_dict()
+                for comment in self.comments
+                if comment.parent_id is None
+            ]
+
+        return self.build_dict(
+            author=self.user,
+            is_following=is_following,
+            likes_count=self.likes_count,
+            liked_by_user=liked_by_user,
+            comments=comments
+        )
+
+    def build_dict(self, author, is_following, likes_count, liked_by_user,
+                   comments=None, comments_preview=None):
+        """
+        Monta o dict do post a partir de valores já calculados.
+        Usado por to_dict e pelo serializer em lote do feed (services/feed_serializer).
+        """
         data = {
             'id': self.id,
             'user_id': self.user_id,
@@ -37,26 +85,28 @@ class Post(db.Model):
             'content': self.content,
             'description': self.description,
             'image_url': self.image_url,
+            'image_width': self.image_width,
+            'image_height': self.image_height,
+            'image_variants': load_variants(self.image_variants),
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'likes_count': len(self.likes),
+            'likes_count': likes_count,
+            'comments_count': self.comments_count,
             'liked_by_user': liked_by_user,
             'author': {
-                'id': self.user.id,
-                'name': self.user.name,
-                'username': self.user.username,
-                'profile_picture': self.user.profile_picture or None,
+                'id': author.id,
+                'name': author.name,
+                'username': author.username,
+                'profile_picture': author.profile_picture or None,
+                'profile_picture_variants': load_variants(author.profile_picture_variants),
                 'is_following': is_following
-            } if self.user else None,
+            } if author else None,
         }
 
-        if include_comments:
-            data['comments'] = [
-                comment.to_dict()
-                for comment in self.comments
-                if comment.parent_id is None
-            ]
-
+        if comments is not None:
+            data['comments'] = comments
+        if comments_preview is not None:
+            data['comments_preview'] = comments_preview
 
         return data
 
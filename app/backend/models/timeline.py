@@ -0,0 +1,24 @@
+from extensions import db
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+
+class TimelineEntry(db.Model):
+    """
+    Linha da timeline materializada (home feed) de um usuário.
+    Preenchida no momento da criação do post para cada seguidor do autor (fan-out on write).
+    created_at é uma cópia de posts.created_at para a leitura ser um único range scan.
+    """
+    __tablename__ = 'timeline_entries'
+    __table_args__ = (
+        Index('ix_timeline_user_created_post', 'user_id', 'created_at', 'post_id'),
+        Index('ix_timeline_user_author', 'user_id', 'author_id'),
+        Index('ix_timeline_post', 'post_id'),
+        Index('ix_timeline_author', 'author_id'),
+    )
+
+    user_id = Column(Integer, ForeignKey('users.id'), primary_key=True)  # dono da timeline
+    post_id = Column(Integer, ForeignKey('posts.id'), primary_key=True)
+    author_id = Column(Integer, ForeignKey('users.id'), nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<TimelineEntry user_id={self.user_id} post_id={self.post_id}>"
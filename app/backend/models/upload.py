@@ -0,0 +1,28 @@
+from extensions import db
+from sqlalchemy import Column, Integer, String, DateTime, Index, text
+from datetime import datetime
+
+class UploadBlob(db.Model):
+    """
+    Arquivo enviado, endereçado pelo conteúdo (uploads/<ab>/<sha256>.<ext>), com a
+    contagem de referências de posts (image_url) e usuários (profile_picture).
+    Com refcount zerado há mais de UPLOAD_GC_GRACE_SECONDS, o arquivo e suas
+    variantes são apagados pela coleta de lixo (services/upload_storage).
+    Arquivos anteriores a este esquema têm sha256/size nulos.
+    """
+    __tablename__ = 'upload_blobs'
+    __table_args__ = (
+        # Candidatos da coleta de lixo
+        Index('ix_upload_blobs_released_at', 'released_at', sqlite_where=text('refcount <= 0')),
+    )
+
+    id = Column(Integer, primary_key=True)
+    path = Column(String(255), unique=True, nullable=False)
+    sha256 = Column(String(64), nullable=True)
+    size = Column(Integer, nullable=True)
+    content_type = Column(String(50), nullable=True)
+    # Mantido pelos DAOs de post e usuário na mesma transação das escritas
+    refcount = Column(Integer, nullable=False, default=0, server_default='0')
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # Quando o refcount chegou a zero (ou o upload foi gravado e ainda não referenciado)
+    released_at = Column(DateTime, nullable=True)
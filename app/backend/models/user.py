@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, Text
+import json
+from sqlalchemy import Column, Integer, String, Boolean, Text, Index, func, text
 from sqlalchemy.orm import relationship
 from extensions import db
 from models.follow import Follow
@@ -15,6 +16,16 @@ class User(db.Model):
 
     bio = Column(Text, default="")
     profile_picture = Column(String(255), nullable=True)
+    # Versões quadradas da foto ({"64": caminho, "128": caminho}, JSON), gravadas
+    # pelo pipeline de imagens (services/image_pipeline); nulo enquanto não processada
+    profile_picture_variants = Column(Text, nullable=True)
+
+    # Contadores desnormalizados, mantidos pelos DAOs de follow e post
+    followers_count = Column(Integer, nullable=False, default=0, server_default='0')
+    following_count = Column(Integer, nullable=False, default=0, server_default='0')
+    posts_count = Column(Integer, nullable=False, default=0, server_default='0')
+    # Notificações não lidas (badge), mantido pelo DAO de notificações
+    unread_notifications_count = Column(Integer, nullable=False, default=0, server_default='0')
 
     posts = relationship("Post", back_populates="user", lazy="dynamic")
     followers = relationship(
@@ -42,9 +53,10 @@ class User(db.Model):
             "admin": self.admin,
             "bio": self.bio,
             "profile_picture": self.profile_picture,
-            "followers_count": self.followers.count() if self.followers else 0,
-            "following_count": self.following.count() if self.following else 0,
-            "posts_count": self.posts.count() if self.posts else 0
+            "profile_picture_variants": load_variants(self.profile_picture_variants),
+            "followers_count": self.followers_count or 0,
+            "following_count": self.following_count or 0,
+            "posts_count": self.posts_count or 0
         }
 
     def update_from_dict(self, data):
@@ -54,3 +66,26 @@ class User(db.Model):
 
     def __repr__(self):
         return f"<User {self.id} - {self.name} (@{self.username})>"
+
+# Busca de usernames sem diferenciar maiúsculas
+Index('ix_users_username_lower', func.lower(User.username))
+# Contagem de referências dos uploads (check-counters)
+Index('ix_users_profile_picture', User.profile_picture, sqlite_where=text('profile_picture IS NOT NULL'))
+
+
+def load_variants(value):
+    """Dict {nome: caminho} das variantes de uma imagem (coluna JSON), ou None."""
+    return json.loads(value) if value else None
+
+def user_summary(user):
+    """
+    Projeção compacta de um usuário (id, username, name, profile_picture e variantes).
+    Aceita tanto um User quanto uma linha de consulta com essas colunas.
+    """
+    return {
+        "id": user.id,
+        "username": user.username,
+        "name": user.name,
+        "profile_picture": user.profile_picture,
+        "profile_picture_variants": load_variants(user.profile_picture_variants)
+    }
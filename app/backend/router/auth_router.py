@@ -1,18 +1,24 @@
 from flask import Blueprint, request, jsonify
 from DAO import user_dao
-from bcrypt import checkpw
 from middleware.jwt_util import generate_token
+from services.password_service import password_hasher
+from services.db_routing import db_route
 
 auth_bp = Blueprint('auth_bp', __name__)
 
 @auth_bp.route('/login', methods=['POST'])
+@db_route('read')  # POST, mas só lê (a não ser no rehash ocasional)
 def login():
     data = request.get_json()
     if not data or not data.get('email') or not data.get('password'):
         return jsonify({'error': 'Email e senha são obrigatórios'}), 400
 
     user = user_dao.get_user_by_email(data['email'])
-    if user and checkpw(data['password'].encode('utf-8'), user.password.encode('utf-8')):
+    if user and password_hasher.verify(data['password'], user.password):
+        # Hash gravado com outro custo: refaz com o custo configurado
+        if password_hasher.needs_rehash(user.password):
+            user = user_dao.update_user(user.id, {'password': password_hasher.hash_password(data['password'])})
+            password_hasher.note_rehash()
         token = generate_token(user)
         user_dict = user.to_dict()
         user_dict.pop('password', None)  # nunca enviar senha ao cliente
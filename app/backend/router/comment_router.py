@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from middleware.jwt_util import token_required
-from DAO import comment_dao, post_dao, notification_dao
+from DAO import comment_dao, post_dao
+from services.notification_dispatcher import notification_dispatcher
 
 comment_bp = Blueprint('comment_bp', __name__)
 
@@ -25,14 +26,18 @@ def add_comment(post_id):
         content=content,
         parent_id=parent_id
     )
+    if comment is None:
+        return jsonify({'error': 'Post ou comentário não encontrado'}), 404
 
     # Notifica o autor do post, se não for o próprio usuário
     post = post_dao.get_post_by_id(post_id)
     if post and post.user_id != current_user.id:
-        notification_dao.create_notification(
+        notification_dispatcher.enqueue(
             user_id=post.user_id,
             type="comment",
-            message=f"{current_user.username} comentou no seu post."
+            message=f"{current_user.username} comentou no seu post.",
+            actor_id=current_user.id,
+            target_id=post_id
         )
 
     return jsonify(comment.to_dict()), 201
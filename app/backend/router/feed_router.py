@@ -0,0 +1,28 @@
+from flask import Blueprint, request, jsonify
+from DAO import timeline_dao
+from DAO.pagination import parse_limit
+from middleware.jwt_util import token_required
+from services.feed_serializer import serialize_posts
+
+feed_bp = Blueprint('feed_bp', __name__)
+
+@feed_bp.route('/feed', methods=['GET'])
+@token_required
+def get_home_feed():
+    """
+    Home feed: posts do próprio usuário e de quem ele segue, paginados por cursor.
+    Query params: cursor (opcional), limit (default 20, máx. 100)
+    """
+    current_user = request.user
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        posts, next_cursor = timeline_dao.get_home_timeline(
+            current_user.id, request.args.get('cursor'), limit
+        )
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor or limit'}), 400
+
+    return jsonify({
+        'posts': serialize_posts(posts, current_user),
+        'next_cursor': next_cursor
+    }), 200
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
-from DAO import like_dao, post_dao, notification_dao
+from DAO import like_dao, post_dao
 from middleware.jwt_util import token_required
+from services.user_lists import user_list_response
+from services.notification_dispatcher import notification_dispatcher
 
 like_bp = Blueprint('like_bp', __name__)
 
@@ -17,37 +19,35 @@ def get_all_likes():
 @like_bp.route('/posts/<int:post_id>/like', methods=['POST'])
 @token_required
 def like_post(post_id):
+    """Usuário curte o post. Idempotente: curtir de novo não é erro."""
     user = request.user
-    existing_like = like_dao.get_like_by_user_and_post(user.id, post_id)
-    if existing_like:
-        return jsonify({'error': 'Like already exists'}), 400
-
-    like = like_dao.create_like({'user_id': user.id, 'post_id': post_id})
+    result = like_dao.like_post(user.id, post_id)
+    if result is None:
+        return jsonify({'error': 'Post not found'}), 404
+    created, likes_count, author_id = result
 
-    # Cria notificação para o autor do post
-    post = post_dao.get_post_by_id(post_id)
-    if post and post.user_id != user.id:
-        notification_dao.create_notification(
-            user_id=post.user_id,
+    # Cria notificação para o autor do post, só para likes novos
+    if created and author_id != user.id:
+        notification_dispatcher.enqueue(
+            user_id=author_id,
             type="like",
-            message=f"{user.username} curtiu seu post."
+            message=f"{user.username} curtiu seu post.",
+            actor_id=user.id,
+            target_id=post_id
         )
 
-    return jsonify(like.to_dict()), 201
+    return jsonify({'liked': True, 'likes_count': likes_count}), 201 if created else 200
 
 @like_bp.route('/posts/<int:post_id>/like', methods=['DELETE'])
 @token_required
 def unlike_post(post_id):
-    """Usuário remove like do post."""
+    """Usuário remove like do post. Idempotente: remover um like inexistente não é erro."""
     user = request.user
-    like = like_dao.get_like_by_user_and_post(user.id, post_id)
-    if not like:
-        return jsonify({'error': 'Like not found'}), 404
-
-    success = like_dao.delete_like(like.id)
-    if success:
-        return jsonify({'message': 'Like deleted'}), 200
-    return jsonify({'error': 'Delete failed'}), 500
+    result = like_dao.unlike_post(user.id, post_id)
+    if result is None:
+        return jsonify({'error': 'Post not found'}), 404
+    _, likes_count, _ = result
+    return jsonify({'liked': False, 'likes_count': likes_count}), 200
 
 @like_bp.route('/likes/<int:like_id>', methods=['GET'])
 @token_required
@@ -76,17 +76,19 @@ def get_likes_by_user_id(user_id):
 
 @like_bp.route('/likes/post/<int:post_id>', methods=['GET'])
 def get_likes_by_post_id(post_id):
-    """Retorna likes de um post — público."""
+    """
+    Retorna quem curtiu o post — público.
+    Com `cursor`/`limit` responde {users, next_cursor}; sem eles, a lista completa.
+    """
     post = post_dao.get_post_by_id(post_id)
     if not post:
         return jsonify({'error': 'Post not found'}), 404
 
-    likes = like_dao.get_likes_by_post(post_id)
-    return jsonify([like.user.to_dict() for like in likes]), 200
+    return user_list_response(like_dao.get_likers_page, post_id)
 
 
 @like_bp.route('/likes/count/post/<int:post_id>', methods=['GET'])
 def get_like_count_by_post_id(post_id):
     """Contagem pública de likes por post."""
-    count = len(like_dao.get_likes_by_post(post_id))
+    count = like_dao.count_likes_by_post(post_id)
     return jsonify({'like_count': count}), 200
@@ -0,0 +1,34 @@
+from flask import Blueprint, request, jsonify
+from middleware.jwt_util import token_required
+from services.notification_dispatcher import notification_dispatcher
+from services.notification_broker import notification_broker
+from services.token_cache import token_cache
+from services.password_service import password_hasher
+from services.image_pipeline import image_pipeline
+from services.upload_storage import upload_storage
+from services.upload_serving import upload_server
+from services.sqlite_profile import sqlite_profile
+from services.db_routing import db_router
+from services.unit_of_work import request_transactions
+
+metrics_bp = Blueprint('metrics_bp', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+@token_required
+def get_metrics():
+    """Métricas internas do processo (fila de notificações, stream SSE, cache de tokens, pool de senhas, uploads, imagens, banco, roteamento, transações) - somente admins."""
+    user = request.user
+    if not user.admin:
+        return jsonify({'error': 'Unauthorized access'}), 403
+    return jsonify({
+        'notifications': notification_dispatcher.metrics(),
+        'notification_stream': notification_broker.metrics(),
+        'auth_cache': token_cache.metrics(),
+        'password_pool': password_hasher.metrics(),
+        'uploads': upload_storage.metrics(),
+        'uploads_serving': upload_server.metrics(),
+        'image_pipeline': image_pipeline.metrics(),
+        'database': sqlite_profile.metrics(),
+        'db_routing': db_router.metrics(),
+        'transactions': request_transactions.metrics()
+    }), 200
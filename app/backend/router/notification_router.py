@@ -1,21 +1,184 @@
-from flask import Blueprint, request, jsonify
-from middleware.jwt_util import token_required
+import hashlib
+import json
+import secrets
+from datetime import datetime, timedelta
+from flask import Blueprint, Response, current_app, request, jsonify
+from middleware.jwt_util import token_required, bearer_token, authenticate
+from models.notification import Notification
 from DAO import notification_dao
+from DAO.pagination import decode_cursor, parse_limit
+from services.notification_serializer import serialize_notifications
+from services.notification_broker import notification_broker, event_id
+from services.unit_of_work import release_session
 
 notification_bp = Blueprint("notification_bp", __name__)
 
+# Intervalo de reconexão sugerido ao EventSource
+STREAM_RETRY_MS = 5000
+# Quantas notificações reenviar na retomada; acima disso o cliente recebe `resync`
+STREAM_REPLAY_LIMIT = 50
+# updated_at é o horário do evento, gravado alguns milissegundos depois pelo dispatcher:
+# a retomada volta um pouco antes do Last-Event-ID (o cliente ignora repetidas pelo id)
+STREAM_RESUME_SLACK = timedelta(seconds=2)
+
+def _ticket_hash(ticket):
+    return hashlib.sha256(ticket.encode('utf-8')).hexdigest()
+
+def _sse(type, id, data):
+    """Formata um evento Server-Sent Events."""
+    lines = [f"event: {type}"]
+    if id:
+        lines.append(f"id: {id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+def _replay(user_id, last_event_id, unread_count):
+    """
+    Eventos perdidos desde last_event_id (notificações criadas ou atualizadas depois).
+    Retorna (eventos, resync); resync indica que o cliente deve recarregar a lista.
+    """
+    if not last_event_id:
+        return [], False
+    try:
+        updated_at, _ = decode_cursor(last_event_id, [Notification.updated_at, Notification.id])
+    except ValueError:
+        return [], True
+    if updated_at is None:
+        return [], True
+
+    notifications = notification_dao.get_notifications_since(
+        user_id, updated_at - STREAM_RESUME_SLACK, STREAM_REPLAY_LIMIT + 1
+    )
+    if len(notifications) > STREAM_REPLAY_LIMIT:
+        return [], True
+    events = [
+        ('notification', event_id(n), {'notification': payload, 'unread_count': unread_count})
+        for n, payload in zip(notifications, serialize_notifications(notifications))
+    ]
+    return events, False
+
 @notification_bp.route("/notifications", methods=["GET"])
 @token_required
 def get_notifications():
+    """
+    Sem parâmetros: as 50 notificações mais recentes (formato antigo, lista).
+    Com `since` (cursor devolvido em `next_since`): só as criadas ou atualizadas depois
+    dele, da mais antiga para a mais nova, com a contagem de não lidas.
+    """
     user = request.user
-    notifications = notification_dao.get_notifications_by_user(user.id)
-    return jsonify([n.to_dict() for n in notifications]), 200
+    since = request.args.get('since')
+    if since is None:
+        notifications = notification_dao.get_notifications_by_user(user.id)
+        return jsonify(serialize_notifications(notifications)), 200
+
+    try:
+        limit = parse_limit(request.args.get('limit'), default=50)
+        updated_at, after_id = decode_cursor(since, [Notification.updated_at, Notification.id])
+        if updated_at is None or after_id is None:
+            raise ValueError('Invalid cursor')
+    except ValueError:
+        return jsonify({'error': 'Invalid cursor or limit'}), 400
+
+    notifications = notification_dao.get_notifications_since(user.id, updated_at, limit, after_id=after_id)
+    return jsonify({
+        'notifications': serialize_notifications(notifications),
+        'next_since': event_id(notifications[-1]) if notifications else since,
+        'unread_count': notification_dao.get_unread_count(user.id)
+    }), 200
+
+@notification_bp.route("/notifications/unread_count", methods=["GET"])
+@token_required
+def get_unread_count():
+    """Contagem de não lidas (badge), lida do contador do usuário."""
+    return jsonify({'unread_count': notification_dao.get_unread_count(request.user.id)}), 200
+
+@notification_bp.route("/notifications/read", methods=["PUT"])
+@token_required
+def mark_all_as_read():
+    """
+    Marca como lidas, em um único UPDATE, todas as notificações até `up_to_id`
+    (a mais recente que o cliente viu); sem `up_to_id`, todas.
+    """
+    user = request.user
+    data = request.get_json(silent=True) or {}
+    up_to_id = data.get('up_to_id')
+    if up_to_id is not None and (not isinstance(up_to_id, int) or isinstance(up_to_id, bool)):
+        return jsonify({'error': 'up_to_id must be an integer'}), 400
+
+    marked, unread_count = notification_dao.mark_all_as_read(user.id, up_to_id)
+    return jsonify({'marked': marked, 'unread_count': unread_count}), 200
+
+@notification_bp.route("/notifications/stream/ticket", methods=["POST"])
+@token_required
+def create_stream_ticket():
+    """
+    Ticket para abrir o stream SSE (?ticket=): o EventSource do navegador não envia
+    cabeçalhos, e o JWT na URL ficaria em logs de acesso e no histórico. Vale uma vez,
+    por NOTIFICATION_STREAM_TICKET_SECONDS.
+    """
+    ttl = current_app.config.get('NOTIFICATION_STREAM_TICKET_SECONDS', 30)
+    ticket = secrets.token_urlsafe(32)
+    notification_dao.create_stream_ticket(
+        request.user.id, _ticket_hash(ticket), datetime.utcnow() + timedelta(seconds=ttl)
+    )
+    return jsonify({'ticket': ticket, 'expires_in': ttl}), 201
+
+@notification_bp.route("/notifications/stream", methods=["GET"])
+def notification_stream():
+    """
+    Stream SSE das notificações do usuário: eventos `notification` (nova ou atualizada,
+    com a contagem de não lidas), `unread` (contagem após leitura/remoção) e `resync`
+    (o cliente deve recarregar a lista). Suporta retomada pelo cabeçalho Last-Event-ID
+    ou, ao reconectar com um ticket novo, por ?last_event_id=.
+    Autenticação: ?ticket= (POST /notifications/stream/ticket) ou o cabeçalho Authorization.
+    """
+    ticket = request.args.get('ticket')
+    if ticket:
+        user_id = notification_dao.redeem_stream_ticket(_ticket_hash(ticket))
+    else:
+        _, user = authenticate(bearer_token())
+        user_id = user.id if user else None
+    if user_id is None:
+        return jsonify({'error': 'Stream ticket or token is missing, invalid or expired'}), 401
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+
+    # Assina antes de consultar o banco para não perder eventos entre a consulta e o stream
+    subscription = notification_broker.subscribe(user_id)
+    try:
+        unread_count = notification_dao.get_unread_count(user_id)
+        replay, resync = _replay(user_id, last_event_id, unread_count)
+    except Exception:
+        notification_broker.unsubscribe(subscription)
+        raise
+    # A conexão pode ficar aberta por horas: confirma o consumo do ticket e devolve a
+    # conexão do banco ao pool
+    release_session()
+    heartbeat = current_app.config.get('NOTIFICATION_STREAM_HEARTBEAT_SECONDS', 15)
+
+    def generate():
+        yield f"retry: {STREAM_RETRY_MS}\n\n"
+        for event in replay:
+            yield _sse(*event)
+        if resync:
+            yield _sse('resync', None, {})
+        yield _sse('unread', None, {'unread_count': unread_count})
+        while True:
+            event = subscription.get(heartbeat)
+            # Comentário periódico mantém a conexão viva e detecta clientes desconectados
+            yield ": ping\n\n" if event is None else _sse(*event)
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # sem buffer no nginx
+    })
+    response.call_on_close(lambda: notification_broker.unsubscribe(subscription))
+    return response
 
 @notification_bp.route("/notifications/<int:notification_id>/read", methods=["PUT"])
 @token_required
 def mark_as_read(notification_id):
     user = request.user
-    success = notification_dao.mark_notification_as_read(notification_id)
+    success = notification_dao.mark_notification_as_read(notification_id, user.id)
     if not success:
         return jsonify({"error": "Not found"}), 404
     return jsonify({"message": "Marked as read"}), 200
@@ -1,22 +1,36 @@
 from flask import Blueprint, request, jsonify
-from DAO import post_dao
-from middleware.jwt_util import token_required
-import os
-import uuid
-from datetime import datetime, timezone, timedelta
-from flask import current_app
+from DAO import post_dao, user_dao
+from DAO.pagination import parse_limit, wants_cursor
+from middleware.jwt_util import token_required, bearer_token, authenticate
+from services.feed_serializer import serialize_posts, serialize_post
+from services.comment_tree import build_comment_page
+from services.image_pipeline import image_pipeline
+from services.upload_storage import upload_storage, UploadRejected
+from models.user import user_summary, load_variants
 
 post_bp = Blueprint('post_bp', __name__)
 
 @post_bp.route('/posts', methods=['GET'])
 @token_required
 def get_all_posts():
+    current_user = request.user
+
+    if wants_cursor(request.args):
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            posts, next_cursor = post_dao.get_all_posts_by_cursor(request.args.get('cursor'), limit)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor or limit'}), 400
+        return jsonify({
+            'posts': serialize_posts(posts, current_user),
+            'next_cursor': next_cursor
+        }), 200
+
     page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 20))
-    current_user = request.user
 
     posts = post_dao.get_all_posts_paginated(page, per_page)
-    posts_dict = [post.to_dict(current_user) for post in posts]
+    posts_dict = serialize_posts(posts, current_user)
 
     return jsonify(posts_dict), 200
 
@@ -46,24 +60,15 @@ def create_post():
 
     image_url = None
 
-    # Se houver imagem, salvar
+    # Se houver imagem, salvar (por conteúdo; o tipo vem dos bytes do arquivo)
     if image_file:
-        ext = image_file.filename.rsplit('.', 1)[-1].lower()
-        if ext not in {'jpg', 'jpeg', 'png', 'gif'}:
-            return jsonify({'error': 'Unsupported image type'}), 400
-
-        filename = f"{uuid.uuid4().hex}.{ext}"
-        upload_folder = os.path.join(current_app.root_path, 'uploads')
-        os.makedirs(upload_folder, exist_ok=True)
-        filepath = os.path.join(upload_folder, filename)
-
         try:
-            image_file.save(filepath)
-        except Exception:
+            image_url = upload_storage.save(image_file).path
+        except UploadRejected as e:
+            return jsonify({'error': str(e)}), 400
+        except OSError:
             return jsonify({'error': 'Failed to save image'}), 500
 
-        image_url = f"uploads/{filename}"  # ✅ salva no campo separado
-
     # Processar reply_id
     if reply_id:
         try:
@@ -82,15 +87,85 @@ def create_post():
     }
 
     post = post_dao.create_post(post_data)
-    return jsonify(post.to_dict(current_user=user)), 201
+    if post is None:
+        return jsonify({'error': 'Reply target not found'}), 400
+    image_pipeline.enqueue('post', post.id, image_url)
+    return jsonify(serialize_post(post, current_user=user)), 201
 
 
+@post_bp.route('/posts/search', methods=['GET'])
+def search_posts():
+    """
+    Busca posts por conteúdo e descrição (FTS5, ordenado por relevância).
+    Query params: q, page (default 1), limit (default 20, máx. 100)
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Missing search query'}), 400
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        limit = parse_limit(request.args.get('limit'))
+    except ValueError:
+        return jsonify({'error': 'Invalid page or limit'}), 400
+
+    posts = post_dao.search_posts(query, limit=limit, offset=(page - 1) * limit)
+    authors = {u.id: u for u in user_dao.get_users_by_ids({p.user_id for p in posts})}
+
+    return jsonify([{
+        'id': post.id,
+        'content': post.content,
+        'description': post.description,
+        'image_url': post.image_url,
+        'image_variants': load_variants(post.image_variants),
+        'created_at': post.created_at.isoformat() if post.created_at else None,
+        'likes_count': post.likes_count,
+        'comments_count': post.comments_count,
+        'author': user_summary(authors[post.user_id]) if post.user_id in authors else None
+    } for post in posts]), 200
+
 @post_bp.route('/posts/<int:post_id>', methods=['GET'])
 def get_post(post_id):
+    """
+    Post com `comments_preview` (serializer em lote, consultas fixas); a árvore
+    completa é paginada em /api/posts/<id>/comments.
+    """
     post = post_dao.get_post_by_id(post_id)
     if not post:
         return jsonify({'error': 'Post not found'}), 404
-    return jsonify(post.to_dict()), 200
+    _, user = authenticate(bearer_token())
+    return jsonify(serialize_post(post, current_user=user)), 200
+
+@post_bp.route('/posts/<int:post_id>/comments', methods=['GET'])
+def get_post_comments(post_id):
+    """
+    Árvore de comentários de um post, paginada por cursor.
+    Query params:
+      - parent_id: opcional, lista as respostas deste comentário em vez dos comentários raiz
+      - cursor, limit (default 20, máx. 100): paginação dos comentários raiz
+      - depth (default 3, máx. 10): níveis de respostas carregados
+      - replies_limit (default 3, máx. 50): respostas mostradas por comentário;
+        as demais viram o stub `more_replies` com o cursor para continuar
+    """
+    if not post_dao.get_post_by_id(post_id):
+        return jsonify({'error': 'Post not found'}), 404
+
+    try:
+        parent_id = request.args.get('parent_id', type=int)
+        limit = parse_limit(request.args.get('limit'))
+        depth = min(max(int(request.args.get('depth', 3)), 0), 10)
+        replies_limit = min(max(int(request.args.get('replies_limit', 3)), 0), 50)
+        comments, next_cursor = build_comment_page(
+            post_id,
+            parent_id=parent_id,
+            cursor=request.args.get('cursor'),
+            limit=limit,
+            depth=depth,
+            replies_limit=replies_limit
+        )
+    except ValueError:
+        return jsonify({'error': 'Invalid query parameters'}), 400
+
+    return jsonify({'comments': comments, 'next_cursor': next_cursor}), 200
 
 @post_bp.route('/posts/<int:post_id>', methods=['PUT'])
 @token_required
@@ -109,7 +184,9 @@ def update_post(post_id):
     update_data = {k: v for k, v in data.items() if k in allowed_fields}
 
     post = post_dao.update_post(post_id, update_data)
-    return jsonify(post.to_dict()), 200
+    if post is None:
+        return jsonify({'error': 'Reply target not found'}), 400
+    return jsonify(serialize_post(post, current_user=user)), 200
 
 @post_bp.route('/posts/<int:post_id>', methods=['DELETE'])
 @token_required
@@ -130,69 +207,53 @@ def delete_post(post_id):
 
 @post_bp.route('/posts/user/<int:user_id>', methods=['GET'])
 def get_posts_by_user_id(user_id):
-    """Retorna posts do usuário, paginados."""
+    """Retorna posts do usuário, paginados (page/per_page ou cursor/limit)."""
+    if wants_cursor(request.args):
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            posts, next_cursor = post_dao.get_posts_by_user_id_by_cursor(
+                user_id, request.args.get('cursor'), limit
+            )
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor or limit'}), 400
+        return jsonify({
+            'posts': serialize_posts(posts),
+            'next_cursor': next_cursor
+        }), 200
+
     page = int(request.args.get('page', 1))
     per_page = int(request.args.get('per_page', 20))
     posts = post_dao.get_posts_by_user_id_paginated(user_id, page, per_page)
-    return jsonify([post.to_dict() for post in posts]), 200
+    return jsonify(serialize_posts(posts)), 200
 
 @post_bp.route('/posts/reply/<int:reply_id>', methods=['GET'])
 def get_posts_by_reply_id(reply_id):
     """Retorna posts que são respostas a outro post."""
     posts = post_dao.get_posts_by_reply_id(reply_id)
-    return jsonify([post.to_dict() for post in posts]), 200
+    return jsonify(serialize_posts(posts)), 200
 
 @post_bp.route('/posts/explore', methods=['GET'])
 def explore_posts():
     """
     Rota pública que retorna posts recomendados para a aba 'Explorar'.
-    Heurística simples (MVP):
+    Heurística (MVP), mantida em posts.hot_score por services/ranking_service:
       score = likes_count * 2 + comments_count + recency_score
     Onde recency_score diminui com o tempo (mais recente => maior score).
     Aceita query params: page (default 1), per_page (default 30)
+    ou cursor/limit para paginação por cursor.
     """
-    try:
-        page = int(request.args.get("page", 1))
-        per_page = int(request.args.get("per_page", 30))
-        # obter um conjunto amplo (ex: page=1 per_page=200) e ordenar por score localmente
-        # Para simplicidade e compatibilidade com seu DAO existente, usamos a função de paginação:
-        posts = post_dao.get_all_posts_paginated(page, per_page)
-        if not posts:
-            return jsonify([]), 200
-
-        # converter para dicts (defensivo)
-        # assumimos que post.to_dict() inclui likes/comments ou dados suficientes
-        posts_data = [p.to_dict() for p in posts]
-
-        # calcular score (defensivo para formatos diferentes)
-        now = datetime.now(timezone.utc)
-        def calc_score(pd):
-            likes = pd.get("likes_count")
-            if likes is None:
-                likes = len(pd.get("likes", [])) if pd.get("likes") else 0
-            comments = pd.get("comments_count")
-            if comments is None:
-                comments = len(pd.get("comments", [])) if pd.get("comments") else 0
-
-            # recency: dias desde publicação
-            created = pd.get("created_at")
-            recency_score = 0
-            if created:
-                try:
-                    # tenta parse isoformat
-                    dt = datetime.fromisoformat(created.replace("Z", "+00:00"))
-                    age_hours = max(0, (now - dt).total_seconds() / 3600.0)
-                    # mais recente => maior score; decai com horas
-                    recency_score = max(0, 48 - age_hours) / 48  # 0..1 for last 48h
-                except Exception:
-                    recency_score = 0
-
-            score = (likes * 2) + comments + (recency_score * 3)
-            return score
-
-        posts_data.sort(key=lambda pd: calc_score(pd), reverse=True)
-
-        return jsonify(posts_data), 200
-    except Exception as e:
-        # log do erro provavelmente aqui
-        return jsonify({"error": "Erro interno ao gerar explorar", "detail": str(e)}), 500
\ No newline at end of file
+    if wants_cursor(request.args):
+        try:
+            limit = parse_limit(request.args.get('limit'), default=30)
+            posts, next_cursor = post_dao.get_explore_posts_by_cursor(request.args.get('cursor'), limit)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor or limit'}), 400
+        return jsonify({
+            'posts': serialize_posts(posts),
+            'next_cursor': next_cursor
+        }), 200
+
+    page = int(request.args.get("page", 1))
+    per_page = int(request.args.get("per_page", 30))
+    posts = post_dao.get_explore_posts_paginated(page, per_page)
+    return jsonify(serialize_posts(posts)), 200
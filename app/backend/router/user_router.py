@@ -1,18 +1,16 @@
-import os
-import uuid
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify
 from DAO import user_dao, follow_dao
-from bcrypt import hashpw, gensalt
-from middleware.jwt_util import token_required
+from DAO.pagination import parse_limit
+from models.user import user_summary
+from services import username_index, follow_graph
+from services.user_lists import user_list_response
+from services.password_service import password_hasher
+from services.image_pipeline import image_pipeline
+from services.upload_storage import upload_storage, UploadRejected
+from middleware.jwt_util import token_required, optional_user_id
 
 user_bp = Blueprint('user_bp', __name__)
 
-ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
-
-def allowed_file(filename):
-    """Verifica se o arquivo tem extensão permitida."""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
-
 # --- Rotas Usuário ---
 
 @user_bp.route('/users', methods=['GET'])
@@ -22,11 +20,21 @@ def get_all_users():
 
 @user_bp.route('/users/search', methods=['GET'])
 def search_users():
+    """
+    Busca usuários (FTS5, ordenado por relevância).
+    Query params: q, page (default 1), limit (default 20, máx. 100)
+    """
     query = request.args.get('q', '').strip()
     if not query:
         return jsonify({'error': 'Missing search query'}), 400
-    users = user_dao.search_users_by_name_or_username(query)
-    return jsonify([u.to_dict() for u in users]), 200
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        limit = parse_limit(request.args.get('limit'))
+    except ValueError:
+        return jsonify({'error': 'Invalid page or limit'}), 400
+
+    rows = user_dao.search_users(query, limit=limit, offset=(page - 1) * limit)
+    return jsonify([{**user_summary(row), 'bio': row.bio} for row in rows]), 200
 
 
 @user_bp.route('/users', methods=['POST'])
@@ -42,7 +50,7 @@ def create_user():
         return jsonify({'error': 'Username already exists'}), 400
 
     # Hash da senha
-    data['password'] = hashpw(data['password'].encode('utf-8'), gensalt()).decode('utf-8')
+    data['password'] = password_hasher.hash_password(data['password'])
     data['admin'] = False
 
     user = user_dao.create_user(data)
@@ -58,16 +66,12 @@ def get_user(user_id):
 
     user_data = user.to_dict()
 
-    # Verifica se o usuário atual está seguindo
-    auth_header = request.headers.get('Authorization')
-    if auth_header and auth_header.startswith('Bearer '):
-        from middleware.jwt_util import decode_token
-        token = auth_header.split(' ')[1]
-        payload = decode_token(token)
-        if payload:
-            current_user_id = payload['user_id']
-            if current_user_id != user.id:
-                user_data['is_following'] = follow_dao.is_following(current_user_id, user.id)
+    # Relação com o usuário atual, pelo grafo de follows em memória
+    current_user_id = optional_user_id()
+    if current_user_id is not None and current_user_id != user.id:
+        graph = follow_graph.ensure_loaded()
+        user_data['is_following'] = graph.is_following(current_user_id, user.id)
+        user_data['follows_you'] = graph.is_following(user.id, current_user_id)
 
     return jsonify(user_data), 200
 
@@ -98,7 +102,7 @@ def update_user(user_id):
 
     # Hash senha nova se enviada
     if 'password' in data:
-        data['password'] = hashpw(data['password'].encode('utf-8'), gensalt()).decode('utf-8')
+        data['password'] = password_hasher.hash_password(data['password'])
 
     if 'bio' in data and not isinstance(data['bio'], str):
         return jsonify({'error': 'Bio must be a string'}), 400
@@ -139,32 +143,14 @@ def update_profile(user_id):
         update_data['bio'] = bio
 
     if file:
-        if not allowed_file(file.filename):
-            return jsonify({'error': 'File extension not allowed'}), 400
-
-        ext = file.filename.rsplit('.', 1)[1].lower()
-        unique_filename = f"{uuid.uuid4().hex}.{ext}"
-        upload_folder = os.path.join(current_app.root_path, 'uploads')
-        os.makedirs(upload_folder, exist_ok=True)
-        filepath = os.path.join(upload_folder, unique_filename)
-
+        # A foto anterior é liberada por update_user e apagada depois pela coleta de lixo
         try:
-            file.save(filepath)
-        except Exception as e:
+            update_data['profile_picture'] = upload_storage.save(file).path
+        except UploadRejected as e:
+            return jsonify({'error': str(e)}), 400
+        except OSError:
             return jsonify({'error': 'Failed to save file'}), 500
 
-        # Remove imagem anterior
-        existing_user = user_dao.get_user_by_id(user_id)
-        if existing_user and existing_user.profile_picture:
-            old_path = os.path.join(current_app.root_path, existing_user.profile_picture.split('?')[0])
-            try:
-                if os.path.exists(old_path):
-                    os.remove(old_path)
-            except Exception:
-                pass
-
-        update_data['profile_picture'] = f'uploads/{unique_filename}'
-
     if not update_data:
         return jsonify({'error': 'No data provided'}), 400
 
@@ -172,22 +158,24 @@ def update_profile(user_id):
     if not user:
         return jsonify({'error': 'User not found'}), 404
 
+    if 'profile_picture' in update_data:
+        image_pipeline.enqueue('avatar', user.id, user.profile_picture)
     return jsonify(user.to_dict()), 200
 
 @user_bp.route('/users/<int:user_id>/followers', methods=['GET'])
 def get_followers(user_id):
-    followers = follow_dao.get_followers(user_id)
-    return jsonify({
-        'count': len(followers),
-        'followers': [f.to_dict() for f in followers]
-    }), 200
-
-
+    """
+    Seguidores do usuário. Sem cursor/limit mantém o formato {count, followers},
+    com count vindo do contador desnormalizado.
+    """
+    return user_list_response(
+        follow_dao.get_followers_page, user_id,
+        legacy=lambda users: {'count': user_dao.count_followers(user_id), 'followers': users}
+    )
 
 @user_bp.route('/users/<int:user_id>/following', methods=['GET'])
 def get_following(user_id):
-    following = follow_dao.get_following(user_id)
-    return jsonify([user.to_dict() for user in following]), 200
+    return user_list_response(follow_dao.get_following_page, user_id)
 
 @user_bp.route('/users/by_username/<string:username>', methods=['GET'])
 def get_user_by_username(username):
@@ -197,16 +185,12 @@ def get_user_by_username(username):
 
     user_data = user.to_dict()
 
-    # Verifica se o usuário atual está seguindo
-    auth_header = request.headers.get('Authorization')
-    if auth_header and auth_header.startswith('Bearer '):
-        from middleware.jwt_util import decode_token
-        token = auth_header.split(' ')[1]
-        payload = decode_token(token)
-        if payload:
-            current_user_id = payload['user_id']
-            if current_user_id != user.id:
-                user_data['is_following'] = follow_dao.is_following(current_user_id, user.id)
+    # Relação com o usuário atual, pelo grafo de follows em memória
+    current_user_id = optional_user_id()
+    if current_user_id is not None and current_user_id != user.id:
+        graph = follow_graph.ensure_loaded()
+        user_data['is_following'] = graph.is_following(current_user_id, user.id)
+        user_data['follows_you'] = graph.is_following(user.id, current_user_id)
 
     return jsonify(user_data), 200
 
@@ -220,20 +204,48 @@ def get_users_by_usernames():
     if not data or 'usernames' not in data or not isinstance(data['usernames'], list):
         return jsonify({'error': 'Payload inválido, esperado JSON com lista "usernames"'}), 400
 
-    usernames = [u.lower() for u in data['usernames']]
-    users = user_dao.get_users_by_usernames(usernames)
-
-    return jsonify([user.to_dict() for user in users]), 200
+    usernames = [u for u in data['usernames'] if isinstance(u, str)]
+    users = username_index.ensure_loaded().get_many(usernames)
+
+    return jsonify(users), 200
+
+@user_bp.route('/users/autocomplete', methods=['GET'])
+def autocomplete_usernames():
+    """
+    Autocomplete de menções (@username) pelo índice de prefixos em memória.
+    Query params: prefix, limit (default 10, máx. 50). Ordenado por número de seguidores.
+    """
+    prefix = request.args.get('prefix', '').strip().lstrip('@')
+    if not prefix:
+        return jsonify([]), 200
+    try:
+        limit = parse_limit(request.args.get('limit'), default=10, maximum=50)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+
+    return jsonify(username_index.ensure_loaded().search(prefix, limit)), 200
+
+@user_bp.route('/users/<int:user_id>/suggestions', methods=['GET'])
+def get_follow_suggestions(user_id):
+    """
+    Sugestões de quem seguir: contatos de segundo grau ainda não seguidos,
+    ordenados por quantos dos seguidos pelo usuário também os seguem (mutual_count).
+    Query param: limit (default 10, máx. 50).
+    """
+    if not user_dao.get_user_by_id(user_id):
+        return jsonify({'error': 'User not found'}), 404
+    try:
+        limit = parse_limit(request.args.get('limit'), default=10, maximum=50)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+
+    ranked = follow_graph.ensure_loaded().suggestions(user_id, limit)
+    users = {user.id: user for user in user_dao.get_users_by_ids([uid for uid, _ in ranked])}
+    return jsonify([
+        dict(user_summary(users[uid]), mutual_count=mutual_count)
+        for uid, mutual_count in ranked if uid in users
+    ]), 200
 
 @user_bp.route('/users/<int:user_id>/followers/list', methods=['GET'])
 def get_followers_list(user_id):
-    followers = follow_dao.get_followers(user_id)
-    result = []
-    for user in followers:
-        result.append({
-            'id': user.id,
-            'username': user.username,
-            'name': user.name,
-            'profile_picture': user.profile_picture
-        })
-    return jsonify(result), 200
+    return user_list_response(follow_dao.get_followers_page, user_id)
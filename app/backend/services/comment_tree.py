@@ -0,0 +1,61 @@
+"""
+Montagem da árvore de comentários de um post.
+
+Em vez de Comment.to_dict (que carrega cada nível de respostas e cada autor
+separadamente), uma página de comentários é resolvida com um número fixo de consultas:
+
+  1. página de comentários raiz (post ou respostas de um comentário), por cursor
+  2. descendentes até `depth` níveis (CTE recursiva)
+  3. quantidade de respostas dos nós no limite de profundidade
+  4. autores
+
+A árvore é montada em memória. Cada nó mostra até `replies_limit` respostas; o restante
+vira um stub `more_replies` com o cursor para continuar pela mesma rota (parent_id + cursor).
+"""
+from collections import defaultdict
+from DAO import comment_dao, user_dao
+from DAO.pagination import encode_cursor
+
+def build_comment_page(post_id, parent_id=None, cursor=None, limit=20, depth=3, replies_limit=3):
+    """Retorna (comentários serializados em árvore, next_cursor)."""
+    roots, next_cursor = comment_dao.get_comments_page(post_id, parent_id, cursor, limit)
+    if not roots:
+        return [], next_cursor
+
+    descendants = comment_dao.get_descendants([c.id for c in roots], depth)
+
+    children = defaultdict(list)
+    levels = {comment.id: 0 for comment in roots}
+    for comment, level in descendants:
+        children[comment.parent_id].append(comment)
+        levels[comment.id] = level
+
+    boundary_counts = comment_dao.count_replies(
+        [comment_id for comment_id, level in levels.items() if level == depth]
+    )
+
+    user_ids = {c.user_id for c in roots} | {c.user_id for c, _ in descendants}
+    users = {user.id: user for user in user_dao.get_users_by_ids(user_ids)}
+
+    def build(comment, level):
+        if level >= depth:
+            shown, total = [], boundary_counts.get(comment.id, 0)
+        else:
+            replies = children.get(comment.id, [])
+            shown, total = replies[:replies_limit], len(replies)
+
+        data = comment.build_dict(
+            author=users.get(comment.user_id),
+            replies=[build(reply, level + 1) for reply in shown]
+        )
+        data['replies_count'] = total
+
+        remaining = total - len(shown)
+        data['more_replies'] = {
+            'count': remaining,
+            'parent_id': comment.id,
+            'cursor': encode_cursor([shown[-1].id]) if shown else None
+        } if remaining > 0 else None
+        return data
+
+    return [build(comment, 0) for comment in roots], next_cursor
@@ -0,0 +1,69 @@
+"""
+Verificação e reparo dos contadores desnormalizados.
+
+Os contadores (likes/comentários por post, seguidores/seguindo/posts e
+notificações não lidas por usuário, referências de cada upload)
+são mantidos pelos DAOs na mesma transação das escritas. Este módulo compara os
+valores armazenados com a contagem real e corrige divergências
+(usado por `flask check-counters`).
+"""
+from sqlalchemy import false, func, select
+from extensions import db
+from DAO.counters import unchanged_onupdate
+from models.post import Post
+from models.user import User
+from models.like import Like
+from models.comment import Comment
+from models.follow import Follow
+from models.notification import Notification
+from models.upload import UploadBlob
+
+def _counters():
+    """(modelo, coluna, subconsulta correlacionada com a contagem real)."""
+    return [
+        (Post, 'likes_count', select(func.count(Like.id)).where(Like.post_id == Post.id)),
+        (Post, 'comments_count', select(func.count(Comment.id)).where(Comment.post_id == Post.id)),
+        (User, 'followers_count', select(func.count(Follow.id)).where(Follow.followed_id == User.id)),
+        (User, 'following_count', select(func.count(Follow.id)).where(Follow.follower_id == User.id)),
+        (User, 'posts_count', select(func.count(Post.id)).where(Post.user_id == User.id)),
+        (User, 'unread_notifications_count', select(func.count(Notification.id)).where(
+            Notification.user_id == User.id, Notification.read == false())),
+        (UploadBlob, 'refcount', select(
+            select(func.count(Post.id)).where(Post.image_url == UploadBlob.path)
+            .correlate(UploadBlob).scalar_subquery()
+            + select(func.count(User.id)).where(User.profile_picture == UploadBlob.path)
+            .correlate(UploadBlob).scalar_subquery()
+        )),
+    ]
+
+def find_counter_drift():
+    """
+    Retorna a lista de divergências como dicts
+    {table, id, column, stored, actual}.
+    """
+    drift = []
+    for model, column, actual_query in _counters():
+        stored = getattr(model, column)
+        actual = actual_query.scalar_subquery()
+        rows = db.session.query(model.id, stored, actual).filter(stored != actual).all()
+        for row_id, stored_value, actual_value in rows:
+            drift.append({
+                'table': model.__tablename__,
+                'id': row_id,
+                'column': column,
+                'stored': stored_value,
+                'actual': actual_value,
+            })
+    return drift
+
+def repair_counters():
+    """Recalcula os contadores divergentes. Retorna o número de linhas corrigidas."""
+    fixed = 0
+    for model, column, actual_query in _counters():
+        stored = getattr(model, column)
+        actual = actual_query.scalar_subquery()
+        fixed += model.query.filter(stored != actual).update(
+            {stored: actual, **unchanged_onupdate(model)}, synchronize_session=False
+        )
+    db.session.commit()
+    return fixed
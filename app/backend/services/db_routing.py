@@ -0,0 +1,180 @@
+"""
+Roteamento da sessão entre leitura e escrita.
+
+Com o SQLite em WAL (services/sqlite_profile) leitores não disputam com o escritor.
+As consultas vão para um engine somente leitura (`mode=ro`, query_only) com pool
+próprio, e as escritas para o engine principal, reduzido a SQLITE_WRITER_POOL_SIZE
+conexão: os escritores do processo esperam a vez no pool, em fila, em vez de
+disputar o lock do arquivo.
+
+A rota da requisição vem, nesta ordem:
+
+  - do decorator da view: @db_route('read') ou @db_route('write');
+  - da rota do blueprint: db_router.route_blueprint(bp, 'read' | 'write');
+  - do método: GET/HEAD leem no engine somente leitura, os demais usam o escritor.
+
+Fora de requisições (threads de fundo, CLI) vale 'write'. As funções de leitura dos
+DAOs, marcadas com @reads, leem no engine somente leitura em qualquer rota.
+
+Nos dois casos, depois da primeira escrita da transação as consultas seguintes vão
+para o escritor (a sessão enxerga o que acabou de gravar), até o commit/rollback.
+Só SELECTs são roteados; o resto (e session.connection()) usa sempre o escritor.
+"""
+import functools
+import threading
+import weakref
+from contextlib import contextmanager
+from flask import current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql import CompoundSelect, Select, TextClause
+
+READ = 'read'
+WRITE = 'write'
+ROUTES = (READ, WRITE)
+
+# session.info: a transação atual já usou o escritor
+_WRITER_IN_TX = 'db_writer_in_tx'
+# Engines somente leitura criados por init_app (um por app)
+_readers = weakref.WeakSet()
+
+def db_route(route):
+    """Decorator de view: fixa a rota de banco da requisição ('read' ou 'write')."""
+    if route not in ROUTES:
+        raise ValueError(f'Rota de banco inválida: {route!r}')
+
+    def decorator(view):
+        view.db_route = route
+        return view
+    return decorator
+
+@contextmanager
+def reading():
+    """Consultas dentro do bloco vão para o engine somente leitura (se não houver escrita pendente)."""
+    if not has_app_context():
+        yield
+        return
+    previous = g.get('db_route')
+    g.db_route = READ
+    try:
+        yield
+    finally:
+        g.db_route = previous
+
+def reads(fn):
+    """Marca uma função de leitura de DAO: roda em reading()."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with reading():
+            return fn(*args, **kwargs)
+    return wrapper
+
+def _is_query(clause):
+    if isinstance(clause, (Select, CompoundSelect)):
+        return True
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip()[:6].upper() == 'SELECT'
+    return False
+
+class RoutingSession(Session):
+    """Sessão do Flask-SQLAlchemy que manda os SELECTs da rota de leitura ao engine somente leitura."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            reader = db_router.reader_for(self, clause)
+            if reader is not None:
+                return reader
+            db_router.count('writer')
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(RoutingSession, 'after_begin')
+def _track_writer(session, transaction, connection):
+    if connection.engine not in _readers:
+        session.info[_WRITER_IN_TX] = True
+
+@event.listens_for(RoutingSession, 'after_transaction_end')
+def _reset_writer(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_WRITER_IN_TX, None)
+
+class DbRouter:
+    def __init__(self):
+        self._blueprints = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': {READ: 0, WRITE: 0},
+            'sources': {'view': 0, 'blueprint': 0, 'method': 0},
+            'statements': {'reader': 0, 'writer': 0},
+        }
+
+    def init_app(self, app, engine):
+        """
+        Cria o engine somente leitura de `engine` (o principal, depois de db.init_app) e
+        registra a escolha da rota por requisição. Sem o perfil do SQLite (ou em bancos
+        em memória), tudo continua no engine principal.
+        """
+        from services.sqlite_profile import sqlite_profile
+
+        app.extensions.pop('db_reader', None)
+        if not (app.config.get('DB_ROUTING_ENABLED', True) and sqlite_profile.enabled):
+            return
+
+        url = make_url(engine.url).update_query_dict({'mode': 'ro', 'uri': 'true'})
+        url = url.set(database=f'file:{url.database}')
+        reader = create_engine(url, **sqlite_profile.engine_options(
+            None,
+            app.config.get('SQLITE_POOL_SIZE', 10),
+            app.config.get('SQLITE_POOL_MAX_OVERFLOW', 10),
+            app.config.get('SQLITE_POOL_TIMEOUT', 10),
+        ))
+        sqlite_profile.attach(reader, read_only=True)
+        _readers.add(reader)
+        app.extensions['db_reader'] = reader
+        app.before_request(self._route_request)
+
+    def route_blueprint(self, blueprint, route):
+        """Rota de banco padrão das views do blueprint (o decorator da view prevalece)."""
+        if route not in ROUTES:
+            raise ValueError(f'Rota de banco inválida: {route!r}')
+        self._blueprints[blueprint.name] = route
+
+    def _route_request(self):
+        view = current_app.view_functions.get(request.endpoint)
+        route, source = getattr(view, 'db_route', None), 'view'
+        if route is None and request.blueprint in self._blueprints:
+            route, source = self._blueprints[request.blueprint], 'blueprint'
+        if route is None:
+            route, source = (READ if request.method in ('GET', 'HEAD') else WRITE), 'method'
+        g.db_route = route
+        with self._lock:
+            self._stats['requests'][route] += 1
+            self._stats['sources'][source] += 1
+
+    def reader_for(self, session, clause):
+        """Engine somente leitura para a consulta, ou None se ela deve ir ao escritor."""
+        if not has_app_context() or g.get('db_route') != READ:
+            return None
+        reader = current_app.extensions.get('db_reader')
+        if reader is None or session.info.get(_WRITER_IN_TX) or not _is_query(clause):
+            return None
+        self.count('reader')
+        return reader
+
+    def count(self, engine):
+        with self._lock:
+            self._stats['statements'][engine] += 1
+
+    def metrics(self):
+        from services.sqlite_profile import pool_status
+
+        with self._lock:
+            stats = {key: dict(value) for key, value in self._stats.items()}
+        reader = current_app.extensions.get('db_reader') if has_app_context() else None
+        stats['enabled'] = reader is not None
+        stats['blueprints'] = dict(self._blueprints)
+        if reader is not None:
+            stats['reader_pool'] = pool_status(reader)
+        return stats
+
+db_router = DbRouter()
@@ -0,0 +1,88 @@
+"""
+Serialização em lote do feed.
+
+Post.to_dict resolve autor, likes, "is_following" e a árvore de comentários
+com consultas por post (N+1). Aqui cada informação é buscada uma única vez
+para a página inteira, com consultas agrupadas por IN:
+
+  1. autores dos posts
+  2. posts curtidos pelo usuário atual
+  3. prévia de comentários dos posts (comments_preview)
+  4. autores dos comentários que ainda não foram carregados
+
+Os autores seguidos pelo usuário atual vêm do grafo de follows em memória.
+
+A contagem de likes vem do contador desnormalizado Post.likes_count.
+
+O formato de saída é o de Post.to_dict, mas com `comments_preview` (os primeiros
+COMMENTS_PREVIEW_SIZE comentários, sem respostas) no lugar da árvore completa,
+que é servida por /api/posts/<id>/comments.
+"""
+from collections import defaultdict
+from flask import current_app
+from extensions import db
+from models.like import Like
+from DAO import comment_dao, user_dao
+from services import follow_graph
+
+def _load_users(user_ids, known=None):
+    """Retorna {id: User} para os ids dados, reaproveitando os já conhecidos."""
+    users = dict(known or {})
+    missing = set(user_ids) - set(users)
+    for user in user_dao.get_users_by_ids(missing):
+        users[user.id] = user
+    return users
+
+def _comments_previews(post_ids, users):
+    """
+    Carrega a prévia de comentários de todos os posts em uma consulta.
+    Retorna {post_id: [comentários de primeiro nível, sem respostas]}.
+    """
+    comments = comment_dao.get_comments_preview(
+        post_ids, current_app.config.get('COMMENTS_PREVIEW_SIZE', 3)
+    )
+    users.update(_load_users({c.user_id for c in comments}, users))
+
+    previews = defaultdict(list)
+    for comment in comments:
+        previews[comment.post_id].append(
+            comment.build_dict(author=users.get(comment.user_id), replies=[])
+        )
+    return previews
+
+def serialize_posts(posts, current_user=None, include_comments=True):
+    """Serializa uma lista de posts com um número fixo de consultas."""
+    if not posts:
+        return []
+
+    post_ids = [post.id for post in posts]
+    author_ids = {post.user_id for post in posts}
+
+    users = _load_users(author_ids)
+
+    liked = set()
+    following = set()
+    if current_user:
+        liked = {
+            post_id for (post_id,) in
+            db.session.query(Like.post_id)
+            .filter(Like.user_id == current_user.id, Like.post_id.in_(post_ids))
+        }
+        following = follow_graph.ensure_loaded().following_among(current_user.id, author_ids)
+
+    previews = _comments_previews(post_ids, users) if include_comments else None
+
+    return [
+        post.build_dict(
+            author=users.get(post.user_id),
+            is_following=post.user_id in following,
+            likes_count=post.likes_count,
+            liked_by_user=post.id in liked,
+            comments_preview=previews.get(post.id, []) if previews is not None else None
+        )
+        for post in posts
+    ]
+
+def serialize_post(post, current_user=None, include_comments=True):
+    """Atalho para serializar um único post."""
+    return serialize_posts([post], current_user, include_comments)[0]
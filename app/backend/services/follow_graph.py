@@ -0,0 +1,140 @@
+"""
+Grafo de follows compacto em memória.
+
+Mantém, por processo, listas de adjacência ordenadas em array('i') (4 bytes por
+aresta) para "seguindo" e "seguidores" de cada usuário. Checagens de relação
+(is_following, follow mútuo, pertinência em lote) são buscas binárias, sem tocar
+no banco, e as sugestões de "quem seguir" são calculadas a partir dos contatos
+de segundo grau.
+
+O grafo é carregado na inicialização (ou no primeiro uso) e atualizado pelos DAOs
+via after_commit em follow/unfollow e na remoção de usuários.
+"""
+import heapq
+import logging
+import threading
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+
+logger = logging.getLogger(__name__)
+
+def _contains(ids, value):
+    i = bisect_left(ids, value)
+    return i < len(ids) and ids[i] == value
+
+def _insert(ids, value):
+    i = bisect_left(ids, value)
+    if i < len(ids) and ids[i] == value:
+        return False
+    ids.insert(i, value)
+    return True
+
+def _discard(ids, value):
+    i = bisect_left(ids, value)
+    if i < len(ids) and ids[i] == value:
+        del ids[i]
+        return True
+    return False
+
+class FollowGraph:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._following = {}  # user_id -> array('i') ordenado de quem ele segue
+        self._followers = {}  # user_id -> array('i') ordenado de quem o segue
+        self.loaded = False
+
+    def load(self, edges):
+        """Recarrega o grafo a partir de pares (follower_id, followed_id)."""
+        following = defaultdict(list)
+        followers = defaultdict(list)
+        for follower_id, followed_id in edges:
+            following[follower_id].append(followed_id)
+            followers[followed_id].append(follower_id)
+
+        with self._lock:
+            self._following = {uid: array('i', sorted(ids)) for uid, ids in following.items()}
+            self._followers = {uid: array('i', sorted(ids)) for uid, ids in followers.items()}
+            self.loaded = True
+
+    def add(self, follower_id, followed_id):
+        with self._lock:
+            _insert(self._following.setdefault(follower_id, array('i')), followed_id)
+            _insert(self._followers.setdefault(followed_id, array('i')), follower_id)
+
+    def remove(self, follower_id, followed_id):
+        with self._lock:
+            _discard(self._following.get(follower_id, array('i')), followed_id)
+            _discard(self._followers.get(followed_id, array('i')), follower_id)
+
+    def remove_user(self, user_id):
+        """Remove o usuário e todas as arestas dele."""
+        with self._lock:
+            for followed_id in self._following.pop(user_id, ()):
+                _discard(self._followers.get(followed_id, array('i')), user_id)
+            for follower_id in self._followers.pop(user_id, ()):
+                _discard(self._following.get(follower_id, array('i')), user_id)
+
+    def is_following(self, follower_id, followed_id):
+        with self._lock:
+            return _contains(self._following.get(follower_id, ()), followed_id)
+
+    def is_mutual(self, user_a, user_b):
+        """True se os dois usuários se seguem."""
+        with self._lock:
+            return (_contains(self._following.get(user_a, ()), user_b)
+                    and _contains(self._following.get(user_b, ()), user_a))
+
+    def following_among(self, follower_id, user_ids):
+        """Retorna o conjunto dos user_ids dados que follower_id segue."""
+        with self._lock:
+            following = self._following.get(follower_id, ())
+            return {uid for uid in user_ids if _contains(following, uid)}
+
+    def followers_count(self, user_id):
+        with self._lock:
+            return len(self._followers.get(user_id, ()))
+
+    def suggestions(self, user_id, limit=10):
+        """
+        "Quem seguir": usuários seguidos por quem user_id segue, que ele ainda não segue.
+        Ordenados pelo número desses contatos em comum e, no empate, por seguidores.
+        Retorna [(user_id, mutual_count)].
+        """
+        with self._lock:
+            following = self._following.get(user_id, array('i'))
+            scores = defaultdict(int)
+            for friend_id in following:
+                for candidate_id in self._following.get(friend_id, ()):
+                    scores[candidate_id] += 1
+
+            scores.pop(user_id, None)
+            candidates = [
+                (count, len(self._followers.get(candidate_id, ())), candidate_id)
+                for candidate_id, count in scores.items()
+                if not _contains(following, candidate_id)
+            ]
+        best = heapq.nlargest(limit, candidates)
+        return [(candidate_id, count) for count, _, candidate_id in best]
+
+follow_graph = FollowGraph()
+
+def ensure_loaded():
+    """Carrega o grafo a partir do banco se ainda não foi carregado neste processo."""
+    if follow_graph.loaded:
+        return follow_graph
+    from models.follow import Follow
+    from extensions import db
+
+    edges = db.session.query(Follow.follower_id, Follow.followed_id).all()
+    follow_graph.load(edges)
+    logger.info('Grafo de follows carregado com %d arestas', len(edges))
+    return follow_graph
+
+def warm_up(app):
+    """Carrega o grafo na inicialização; se o banco ainda não estiver migrado, adia para o primeiro uso."""
+    with app.app_context():
+        try:
+            ensure_loaded()
+        except Exception as exc:
+            logger.warning('Grafo de follows não carregado na inicialização: %s', exc)
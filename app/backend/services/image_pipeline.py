@@ -0,0 +1,267 @@
+"""
+Pipeline das imagens enviadas (imagens de post e fotos de perfil).
+
+O upload grava o original em uploads/ como antes e só enfileira o processamento;
+uma thread de fundo gera as versões de tamanho fixo servidas ao feed:
+
+  - post:   feed (640 px no maior lado) e full (1280 px), sem ampliar o original;
+  - avatar: 64 e 128 (quadradas, recorte central).
+
+As versões são recodificadas em WebP (JPEG se o Pillow não tiver suporte a WebP),
+com a orientação EXIF aplicada e sem metadados (EXIF, GPS, ICC). Ficam em
+uploads/variants/ e os caminhos, junto com as dimensões do original, são gravados
+no Post/User; to_dict expõe as variantes e o cliente cai para o original enquanto
+elas não existem. GIFs animados não são processados (o original é servido).
+
+Se a imagem do post/usuário mudou enquanto a tarefa rodava, a gravação é ignorada.
+Os arquivos levam o nome do original (o hash do conteúdo, ver services/upload_storage):
+imagens repetidas reaproveitam as variantes já geradas, que são apagadas junto com o
+original pela coleta de lixo dos uploads.
+
+Com IMAGE_VARIANTS_ASYNC desligado o processamento é feito na própria requisição;
+com a fila cheia a tarefa é descartada (as imagens sem variantes são processadas
+por `python manage.py generate-image-variants`).
+
+Sem o Pillow instalado o pipeline fica desativado e os originais são servidos.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from extensions import after_commit
+from services.unit_of_work import in_unit_of_work
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow é opcional: sem ele, só os originais são servidos
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_DIR = 'variants'
+
+# Tipo de imagem -> {nome da variante: tamanho}
+POST_VARIANTS = {'feed': 640, 'full': 1280}
+AVATAR_VARIANTS = {'64': 64, '128': 128}
+
+_STOP = object()
+
+def variant_paths(path):
+    """Caminhos possíveis das variantes de uma imagem, em qualquer formato (coleta de lixo)."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return [
+        f'uploads/{VARIANTS_DIR}/{stem}-{name}.{ext}'
+        for name in (*POST_VARIANTS, *AVATAR_VARIANTS) for ext in ('webp', 'jpg')
+    ]
+
+def _output_format(preferred):
+    if preferred == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return preferred
+
+def _original_size(image):
+    """(largura, altura) do original como exibido (orientação EXIF aplicada)."""
+    width, height = image.size
+    if image.getexif().get(0x0112) in (5, 6, 7, 8):  # rotação de 90/270 graus
+        return height, width
+    return width, height
+
+def _encode(image, path, fmt, quality):
+    if fmt == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    tmp = f'{path}.tmp'
+    # Sem exif/icc_profile: a imagem nova não carrega os metadados do original
+    image.save(tmp, fmt, quality=quality, optimize=fmt == 'JPEG')
+    os.replace(tmp, path)
+
+def render_variants(source_path, kind, output_dir, fmt='WEBP', quality=80):
+    """
+    Gera as variantes de uma imagem. Retorna (largura, altura, {nome: nome do arquivo})
+    do original; variantes vazias para GIFs animados. Variantes que já existem
+    (mesmo conteúdo enviado antes) não são geradas de novo.
+    """
+    sizes = AVATAR_VARIANTS if kind == 'avatar' else POST_VARIANTS
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    ext = 'jpg' if fmt == 'JPEG' else fmt.lower()
+    files = {name: f'{stem}-{name}.{ext}' for name in sizes}
+
+    with Image.open(source_path) as image:
+        width, height = _original_size(image)
+        if getattr(image, 'is_animated', False):
+            return width, height, {}
+        if all(os.path.exists(os.path.join(output_dir, filename)) for filename in files.values()):
+            return width, height, files
+
+        # JPEG: decodifica já reduzido (DCT em escala) quando o original é bem maior
+        largest = max(sizes.values())
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            # Paleta, P&B etc.: converte antes de redimensionar (em modo P o resize usa NEAREST)
+            has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        os.makedirs(output_dir, exist_ok=True)
+        for name, size in sorted(sizes.items(), key=lambda item: -item[1]):
+            if kind == 'avatar':
+                variant = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            else:
+                variant = image.copy()
+                variant.thumbnail((size, size), Image.Resampling.LANCZOS)  # nunca amplia
+            _encode(variant, os.path.join(output_dir, files[name]), fmt, quality)
+    return width, height, files
+
+class ImagePipeline:
+    def __init__(self):
+        self.app = None
+        self.enabled = Image is not None
+        self.async_enabled = True
+        self.max_queue = 1000
+        self.format = 'WEBP'
+        self.quality = 80
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'processed': 0,
+            'skipped': 0,
+            'stale': 0,
+            'failed': 0,
+            'dropped': 0,
+            'total_ms': 0.0,
+        }
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = Image is not None and app.config.get('IMAGE_VARIANTS_ENABLED', True)
+        self.async_enabled = app.config.get('IMAGE_VARIANTS_ASYNC', True)
+        self.max_queue = app.config.get('IMAGE_VARIANTS_QUEUE_MAX', 1000)
+        self.quality = app.config.get('IMAGE_VARIANT_QUALITY', 80)
+        if Image is not None:
+            self.format = _output_format(app.config.get('IMAGE_VARIANT_FORMAT', 'WEBP').upper())
+        elif app.config.get('IMAGE_VARIANTS_ENABLED', True):
+            logger.warning('Pillow não instalado; variantes de imagem desativadas')
+
+    def enqueue(self, kind, row_id, path):
+        """Agenda as variantes da imagem `path` (relativa ao app) do post/usuário (kind 'post'/'avatar')."""
+        if not self.enabled or not path:
+            return
+        job = (kind, row_id, path)
+        if not self.async_enabled or not self._ensure_started():
+            return self.process(*job)
+        if in_unit_of_work():
+            # A thread de fundo só enxerga o post/usuário depois do commit da requisição
+            return after_commit(lambda: self._put(job))
+        self._put(job)
+
+    def _put(self, job):
+        kind, row_id, _ = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                self._stats['dropped'] += 1
+            logger.warning('Fila de imagens cheia; variantes de %s #%s ficam para o backfill', kind, row_id)
+            return
+        with self._lock:
+            self._stats['enqueued'] += 1
+
+    def _ensure_started(self):
+        if self.app is None:
+            return False
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return True
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='image-pipeline', daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            try:
+                with self.app.app_context():
+                    self.process(*job)
+            except Exception:
+                logger.exception('Falha ao processar a imagem %s', job[2])
+            finally:
+                self._queue.task_done()
+
+    def process(self, kind, row_id, path):
+        """
+        Gera e grava as variantes de uma imagem (na thread atual).
+        Retorna True se foram gravadas no post/usuário.
+        """
+        from DAO import post_dao, user_dao
+
+        started = time.perf_counter()
+        root = self.app.root_path
+        output_dir = os.path.join(root, 'uploads', VARIANTS_DIR)
+        try:
+            width, height, files = render_variants(
+                os.path.join(root, path), kind, output_dir, self.format, self.quality
+            )
+        except Exception:
+            logger.exception('Falha ao gerar variantes de %s', path)
+            with self._lock:
+                self._stats['failed'] += 1
+            return False
+
+        variants = {name: f'uploads/{VARIANTS_DIR}/{filename}' for name, filename in files.items()}
+        if kind == 'avatar':
+            saved = user_dao.set_profile_picture_variants(row_id, path, variants)
+        else:
+            saved = post_dao.set_image_variants(row_id, path, width, height, variants)
+
+        with self._lock:
+            if not saved:
+                self._stats['stale'] += 1
+            elif not files:
+                self._stats['skipped'] += 1
+            else:
+                self._stats['processed'] += 1
+            self._stats['total_ms'] += (time.perf_counter() - started) * 1000
+        return saved
+
+    def flush(self, timeout=5.0):
+        """Aguarda a fila esvaziar (todas as imagens enfileiradas processadas)."""
+        deadline = time.monotonic() + timeout
+        while self._queue is not None and time.monotonic() < deadline:
+            if not self._queue.unfinished_tasks:
+                return True
+            time.sleep(0.01)
+        return self._queue is None
+
+    def stop(self, timeout=5.0):
+        """Processa o que está na fila e encerra a thread (chamado na saída do processo)."""
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+        total_ms = stats.pop('total_ms')
+        done = stats['processed'] + stats['skipped'] + stats['stale']
+        stats['avg_ms'] = round(total_ms / done, 1) if done else 0.0
+        stats['queue_depth'] = self._queue.qsize() if self._queue is not None else 0
+        stats['running'] = bool(self._thread and self._thread.is_alive())
+        stats['enabled'] = self.enabled
+        stats['format'] = self.format
+        return stats
+
+image_pipeline = ImagePipeline()
+atexit.register(image_pipeline.stop)
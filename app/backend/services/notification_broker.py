@@ -0,0 +1,108 @@
+"""
+Pub/sub em processo para as notificações ao vivo (Server-Sent Events).
+
+Cada conexão de /api/notifications/stream é uma assinatura com uma fila própria;
+o caminho de escrita das notificações (notification_dao) publica, após o commit,
+apenas os eventos novos e a contagem de não lidas atualizada dos destinatários
+que têm alguma conexão aberta. Sem assinantes, a publicação não custa nada.
+
+Uma conexão ociosa é só uma thread (ou greenlet, com workers gevent) bloqueada
+em Queue.get até o próximo evento ou heartbeat: não faz polling nem segura
+conexão do banco.
+
+Se a fila de uma assinatura enche (cliente lento), os eventos pendentes são
+descartados e o cliente recebe um evento `resync` para recarregar a lista.
+
+O broker é por processo: com vários workers, cada um entrega só os eventos gravados
+por ele mesmo, por isso o stream exige um único processo (gevent ou threads; ver o
+README). A retomada por Last-Event-ID consulta o banco, então funciona mesmo
+reconectando em outro processo.
+"""
+import queue
+import threading
+from DAO.pagination import encode_cursor
+
+RESYNC = ('resync', None, {})
+
+def event_id(notification):
+    """Id do evento SSE de uma notificação: a posição (updated_at, id) usada no Last-Event-ID."""
+    return encode_cursor([notification.updated_at or notification.created_at, notification.id])
+
+class Subscription:
+    def __init__(self, user_id, max_pending):
+        self.user_id = user_id
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._overflowed = False
+
+    def put(self, event):
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self._overflowed = True
+            return False
+
+    def get(self, timeout):
+        """Próximo evento (tipo, id, dados), ou None se nada chegou dentro do timeout."""
+        if self._overflowed:
+            self._overflowed = False
+            while True:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            return RESYNC
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class NotificationBroker:
+    def __init__(self, max_pending=100):
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._subscribers = {}  # user_id -> set de Subscription
+        self._stats = {'published': 0, 'delivered': 0, 'dropped': 0, 'max_connections': 0}
+
+    def init_app(self, app):
+        self.max_pending = app.config.get('NOTIFICATION_STREAM_MAX_PENDING', 100)
+
+    def subscribe(self, user_id):
+        subscription = Subscription(user_id, self.max_pending)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+            connections = sum(len(subs) for subs in self._subscribers.values())
+            if connections > self._stats['max_connections']:
+                self._stats['max_connections'] = connections
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subs = self._subscribers.get(subscription.user_id)
+            if subs is not None:
+                subs.discard(subscription)
+                if not subs:
+                    del self._subscribers[subscription.user_id]
+
+    def is_listening(self, user_id):
+        """True se o usuário tem alguma conexão aberta neste processo."""
+        return user_id in self._subscribers
+
+    def publish(self, user_id, type, data, event_id=None):
+        """Entrega o evento a todas as conexões do usuário (sem bloquear)."""
+        with self._lock:
+            subs = list(self._subscribers.get(user_id, ()))
+        delivered = sum(1 for sub in subs if sub.put((type, event_id, data)))
+        with self._lock:
+            self._stats['published'] += 1
+            self._stats['delivered'] += delivered
+            self._stats['dropped'] += len(subs) - delivered
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['connections'] = sum(len(subs) for subs in self._subscribers.values())
+            stats['users'] = len(self._subscribers)
+        return stats
+
+notification_broker = NotificationBroker()
@@ -0,0 +1,182 @@
+"""
+Entrega assíncrona de notificações, fora do caminho da requisição.
+
+As rotas de escrita (like, comentário, follow) só enfileiram o evento; uma thread
+de fundo drena a fila e grava as notificações em lote (executemany) em uma única
+transação, a cada NOTIFICATION_FLUSH_MS milissegundos ou NOTIFICATION_BATCH_SIZE
+eventos, o que vier primeiro. Assim a latência das rotas não inclui o segundo
+commit (e o fsync do SQLite) da notificação.
+
+A thread é iniciada no primeiro evento (e reiniciada em processos filhos após
+um fork). Na saída do processo a fila é drenada antes de encerrar. Com
+NOTIFICATIONS_ASYNC desligado, ou com a fila cheia, a gravação é síncrona.
+
+Dentro de uma unidade de trabalho (services/unit_of_work) a gravação síncrona entra
+na transação da requisição, e o evento só vai para a fila depois do commit: uma
+requisição desfeita não deixa notificação para trás.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from extensions import after_commit
+from services.unit_of_work import in_unit_of_work
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+class NotificationDispatcher:
+    def __init__(self):
+        self.app = None
+        self.enabled = False
+        self.batch_size = 200
+        self.flush_interval = 0.005
+        self.max_queue = 10000
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'batches': 0,
+            'failed': 0,
+            'sync_writes': 0,
+            'max_queue_depth': 0,
+            'last_batch_size': 0,
+            'last_flush_ms': 0.0,
+        }
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('NOTIFICATIONS_ASYNC', True)
+        self.batch_size = app.config.get('NOTIFICATION_BATCH_SIZE', 200)
+        self.flush_interval = app.config.get('NOTIFICATION_FLUSH_MS', 5) / 1000.0
+        self.max_queue = app.config.get('NOTIFICATION_QUEUE_MAX', 10000)
+
+    def enqueue(self, user_id, type, message, actor_id=None, target_id=None):
+        """Enfileira um evento de notificação para gravação (agregada) em lote."""
+        event = {
+            'user_id': user_id,
+            'actor_id': actor_id,
+            'type': type,
+            'target_id': target_id,
+            'message': message,
+            'created_at': datetime.utcnow(),
+        }
+        if not self.enabled or not self._ensure_started():
+            return self._write_sync([event])
+        if in_unit_of_work():
+            return after_commit(lambda: self._put(event))
+        self._put(event)
+
+    def _put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            return self._write_sync([event])
+
+        with self._lock:
+            self._stats['enqueued'] += 1
+            depth = self._queue.qsize()
+            if depth > self._stats['max_queue_depth']:
+                self._stats['max_queue_depth'] = depth
+
+    def _ensure_started(self):
+        if self.app is None:
+            return False
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return True
+            self._queue = queue.Queue(maxsize=self.max_queue)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='notification-dispatcher', daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is _STOP:
+                return
+            batch = [event]
+            deadline = time.monotonic() + self.flush_interval
+            stopping = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    event = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if event is _STOP:
+                    stopping = True
+                    break
+                batch.append(event)
+
+            self._write(batch)
+            if stopping:
+                return
+
+    def _write(self, batch):
+        from DAO import notification_dao
+
+        started = time.perf_counter()
+        try:
+            with self.app.app_context():
+                notification_dao.create_notifications(batch)
+        except Exception:
+            logger.exception('Falha ao gravar lote de %d notificações', len(batch))
+            with self._lock:
+                self._stats['failed'] += len(batch)
+            return
+        with self._lock:
+            self._stats['written'] += len(batch)
+            self._stats['batches'] += 1
+            self._stats['last_batch_size'] = len(batch)
+            self._stats['last_flush_ms'] = round((time.perf_counter() - started) * 1000, 3)
+
+    def _write_sync(self, events):
+        from DAO import notification_dao
+
+        notification_dao.create_notifications(events)
+        with self._lock:
+            self._stats['sync_writes'] += len(events)
+
+    def flush(self, timeout=5.0):
+        """Aguarda a fila esvaziar (todas as notificações enfileiradas gravadas)."""
+        deadline = time.monotonic() + timeout
+        while self._queue is not None and time.monotonic() < deadline:
+            with self._lock:
+                pending = self._stats['enqueued'] - self._stats['written'] - self._stats['failed']
+            if pending <= 0:
+                return True
+            time.sleep(self.flush_interval or 0.001)
+        return self._queue is None
+
+    def stop(self, timeout=5.0):
+        """Drena a fila e encerra a thread (chamado na saída do processo)."""
+        thread = self._thread
+        if thread is None or not thread.is_alive() or self._pid != os.getpid():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning('Fila de notificações cheia na saída; %d evento(s) descartado(s)', self._queue.qsize())
+            return
+        thread.join(timeout)
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queue_depth'] = self._queue.qsize() if self._queue is not None else 0
+        stats['running'] = bool(self._thread and self._thread.is_alive())
+        return stats
+
+notification_dispatcher = NotificationDispatcher()
+atexit.register(notification_dispatcher.stop)
@@ -0,0 +1,120 @@
+"""
+Retenção das notificações.
+
+A tabela `notification` só crescia (a única limpeza era o /clear manual). Este job:
+
+  1. remove as notificações lidas sem atividade há mais de NOTIFICATION_RETENTION_DAYS;
+  2. mantém no máximo NOTIFICATION_MAX_PER_USER notificações por usuário (as mais
+     recentes), descontando as não lidas removidas do contador do usuário;
+  3. devolve as páginas livres ao sistema com PRAGMA incremental_vacuum.
+
+As remoções são feitas em lotes de NOTIFICATION_RETENTION_BATCH_SIZE, cada um em
+uma transação curta, com uma pausa entre eles para que as escritas da aplicação
+não fiquem esperando o lock de escrita do SQLite. Com NOTIFICATION_ARCHIVE, as
+linhas removidas são copiadas antes para `notification_archive`.
+
+O incremental_vacuum só tem efeito com PRAGMA auto_vacuum = INCREMENTAL, que exige
+um VACUUM completo para ser ativado em um banco existente
+(`python manage.py prune-notifications --enable-incremental-vacuum`).
+
+Uso: python manage.py prune-notifications, ou pelo agendador (SCHEDULER_ENABLED).
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from extensions import db
+from DAO import notification_dao
+
+logger = logging.getLogger(__name__)
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+def _purge_in_batches(next_ids, archive, pause):
+    """Remove lotes devolvidos por next_ids() até acabar. Retorna (removidas, lotes)."""
+    removed = batches = 0
+    while True:
+        ids = next_ids()
+        if not ids:
+            return removed, batches
+        removed += notification_dao.purge_notifications(ids, archive=archive)
+        batches += 1
+        if pause:
+            time.sleep(pause)
+
+def incremental_vacuum(max_pages=None):
+    """
+    Devolve até max_pages páginas livres ao sistema de arquivos.
+    Retorna o número de páginas liberadas, ou None se o auto_vacuum incremental
+    não estiver ativado no banco.
+    """
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        if conn.exec_driver_sql('PRAGMA auto_vacuum').scalar() != AUTO_VACUUM_INCREMENTAL:
+            return None
+        free = conn.exec_driver_sql('PRAGMA freelist_count').scalar() or 0
+        pages = min(free, max_pages) if max_pages else free
+        if pages:
+            # O sqlite3 do Python avança esse PRAGMA um passo (uma página) por execute;
+            # o executescript o roda até o fim
+            conn.connection.dbapi_connection.executescript(f'PRAGMA incremental_vacuum({int(pages)});')
+    return pages
+
+def enable_incremental_vacuum():
+    """Ativa auto_vacuum = INCREMENTAL (reescreve o banco inteiro com VACUUM, uma vez)."""
+    db.session.remove()
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.exec_driver_sql('PRAGMA auto_vacuum = INCREMENTAL')
+        conn.exec_driver_sql('VACUUM')
+
+def prune_notifications(max_age_days=None, max_per_user=None, archive=None):
+    """
+    Executa a retenção completa e retorna o relatório:
+    {expired, over_cap, archived, batches, vacuumed_pages, elapsed_ms}.
+    """
+    config = current_app.config
+    if max_age_days is None:
+        max_age_days = config.get('NOTIFICATION_RETENTION_DAYS', 90)
+    if max_per_user is None:
+        max_per_user = config.get('NOTIFICATION_MAX_PER_USER', 1000)
+    if archive is None:
+        archive = config.get('NOTIFICATION_ARCHIVE', False)
+    batch_size = config.get('NOTIFICATION_RETENTION_BATCH_SIZE', 500)
+    pause = config.get('NOTIFICATION_RETENTION_PAUSE_MS', 20) / 1000.0
+
+    started = time.perf_counter()
+
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    expired, batches = _purge_in_batches(
+        lambda: notification_dao.get_expired_notification_ids(cutoff, batch_size), archive, pause
+    )
+
+    over_cap = 0
+    if max_per_user:
+        for user_id in notification_dao.get_users_over_cap(max_per_user):
+            removed, user_batches = _purge_in_batches(
+                lambda: notification_dao.get_notification_ids_over_cap(user_id, max_per_user, batch_size),
+                archive, pause
+            )
+            over_cap += removed
+            batches += user_batches
+
+    db.session.close()  # o vacuum usa outra conexão; não deixa leitura pendente na sessão
+    vacuumed = incremental_vacuum(config.get('NOTIFICATION_VACUUM_PAGES', 2000))
+
+    report = {
+        'expired': expired,
+        'over_cap': over_cap,
+        'archived': expired + over_cap if archive else 0,
+        'batches': batches,
+        'vacuumed_pages': vacuumed,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+    logger.info('Retenção de notificações: %s', report)
+    return report
+
+def start_scheduler(app):
+    """Agenda a retenção periódica, se o agendador estiver habilitado."""
+    from services import scheduler
+
+    scheduler.schedule(app, 'notification-retention',
+                       app.config['NOTIFICATION_RETENTION_INTERVAL_SECONDS'], prune_notifications)
@@ -0,0 +1,16 @@
+"""
+Serialização em lote das notificações.
+
+Cada notificação agregada guarda os ids dos atores mais recentes; os usuários
+de todas as notificações da página são carregados em uma única consulta IN.
+"""
+from DAO import user_dao
+
+def serialize_notifications(notifications):
+    """Serializa uma lista de notificações com os atores carregados em lote."""
+    actor_ids = {actor_id for n in notifications for actor_id in n.recent_actor_ids}
+    actors = {user.id: user for user in user_dao.get_users_by_ids(actor_ids)}
+    return [
+        n.build_dict([actors[actor_id] for actor_id in n.recent_actor_ids if actor_id in actors])
+        for n in notifications
+    ]
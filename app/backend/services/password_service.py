@@ -0,0 +1,188 @@
+"""
+Hash e verificação de senhas (bcrypt) fora das threads de requisição.
+
+Cada bcrypt custa centenas de milissegundos de CPU; feito na thread da requisição,
+uma rajada de logins ocupa todos os workers e atrasa todas as outras rotas. Aqui o
+trabalho vai para um pool de processos limitado (PASSWORD_POOL_WORKERS), com no
+máximo PASSWORD_POOL_QUEUE_MAX tarefas esperando. Com o pool saturado a chamada
+falha na hora com PasswordHasherBusy (respondido como 503 + Retry-After), em vez
+de enfileirar sem limite. Timeout de espera e pool quebrado também viram 503; o
+bcrypt nunca cai de volta para a thread da requisição.
+
+O custo (PASSWORD_BCRYPT_ROUNDS) é configurável; needs_rehash indica hashes
+gravados com outro custo, refeitos no próximo login bem-sucedido.
+
+Com PASSWORD_POOL_WORKERS = 0 o bcrypt roda na própria thread (sem pool).
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from flask import jsonify
+
+logger = logging.getLogger(__name__)
+
+class PasswordHasherBusy(Exception):
+    """Pool de hash saturado (ou sem resposta dentro do timeout)."""
+
+# Executadas nos processos do pool: precisam ser funções de módulo (picklable)
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password, hashed)
+
+def hash_cost(hashed):
+    """Custo (log2 das rodadas) de um hash bcrypt "$2b$12$...", ou None se não reconhecido."""
+    parts = (hashed or '').split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+class PasswordHasher:
+    def __init__(self):
+        self.rounds = 12
+        self.workers = 2
+        self.queue_max = 32
+        self.timeout = 5.0
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_max)
+        self._stats = {
+            'completed': 0,
+            'rejected': 0,
+            'timed_out': 0,
+            'rehashed': 0,
+            'in_flight': 0,
+            'max_in_flight': 0,
+            'total_ms': 0.0,
+        }
+
+    def init_app(self, app):
+        self.rounds = app.config.get('PASSWORD_BCRYPT_ROUNDS', 12)
+        self.workers = app.config.get('PASSWORD_POOL_WORKERS', 2)
+        self.queue_max = app.config.get('PASSWORD_POOL_QUEUE_MAX', 32)
+        self.timeout = app.config.get('PASSWORD_POOL_TIMEOUT_SECONDS', 5)
+        self._slots = threading.BoundedSemaphore(max(1, self.workers + self.queue_max))
+        app.register_error_handler(PasswordHasherBusy, _busy_response)
+
+    def hash_password(self, password):
+        """Hash bcrypt (str) da senha com o custo configurado."""
+        hashed = self._run(_hash, password.encode('utf-8'), self.rounds)
+        return hashed.decode('utf-8')
+
+    def verify(self, password, hashed):
+        """True se a senha confere com o hash gravado."""
+        if not hashed:
+            return False
+        try:
+            return self._run(_check, password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError:
+            # Hash gravado inválido
+            return False
+
+    def needs_rehash(self, hashed):
+        """True se o hash foi gerado com um custo diferente do configurado."""
+        return hash_cost(hashed) != self.rounds
+
+    def note_rehash(self):
+        with self._lock:
+            self._stats['rehashed'] += 1
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+                self._pid = os.getpid()
+            return self._pool
+
+    def _discard_pool(self, pool):
+        """Descarta um pool quebrado; o próximo _executor() cria outro."""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats['rejected'] += 1
+            raise PasswordHasherBusy()
+
+        started = time.perf_counter()
+        with self._lock:
+            self._stats['in_flight'] += 1
+            if self._stats['in_flight'] > self._stats['max_in_flight']:
+                self._stats['max_in_flight'] = self._stats['in_flight']
+
+        if not self.workers:
+            try:
+                return func(*args)
+            finally:
+                self._release(started)
+
+        pool = self._executor()
+        try:
+            future = pool.submit(func, *args)
+        except BrokenProcessPool:
+            self._release(started)
+            logger.exception('Pool de hash de senhas quebrado; recriando')
+            self._discard_pool(pool)
+            raise PasswordHasherBusy()
+        except BaseException:
+            self._release(started)
+            raise
+        # A vaga só é devolvida quando a tarefa sai do pool (concluída ou cancelada),
+        # não quando a requisição desiste de esperar: o pool nunca tem mais que
+        # workers + queue_max tarefas.
+        future.add_done_callback(lambda _: self._release(started))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # Ainda na fila: sai dela; já rodando: termina e devolve a vaga depois
+            future.cancel()
+            with self._lock:
+                self._stats['timed_out'] += 1
+            raise PasswordHasherBusy()
+        except BrokenProcessPool:
+            # Um processo do pool morreu: responde 503 e recria o pool, sem rodar o
+            # bcrypt na thread da requisição
+            logger.exception('Pool de hash de senhas quebrado; recriando')
+            self._discard_pool(pool)
+            raise PasswordHasherBusy()
+
+    def _release(self, started):
+        self._slots.release()
+        with self._lock:
+            self._stats['in_flight'] -= 1
+            self._stats['completed'] += 1
+            self._stats['total_ms'] += (time.perf_counter() - started) * 1000
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None and self._pid == os.getpid():
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+        total_ms = stats.pop('total_ms')
+        stats['avg_ms'] = round(total_ms / stats['completed'], 1) if stats['completed'] else 0.0
+        stats['workers'] = self.workers
+        stats['queue_max'] = self.queue_max
+        stats['rounds'] = self.rounds
+        return stats
+
+def _busy_response(error):
+    response = jsonify({'error': 'Servidor ocupado, tente novamente em instantes'})
+    response.status_code = 503
+    response.headers['Retry-After'] = '1'
+    return response
+
+password_hasher = PasswordHasher()
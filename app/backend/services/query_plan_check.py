@@ -0,0 +1,394 @@
+"""
+Verificação dos planos de consulta dos DAOs (EXPLAIN QUERY PLAN).
+
+Cria um banco SQLite temporário com o schema das migrations, popula com um volume
+de dados realista (e roda ANALYZE), executa cenários que chamam todas as funções
+públicas dos DAOs e passa cada comando SQL emitido por EXPLAIN QUERY PLAN.
+
+Falha quando:
+  - algum comando faz SCAN completo de uma tabela grande (sem índice);
+  - alguma função pública de DAO não foi exercitada por nenhum cenário
+    (consulta nova sem cobertura).
+
+Varreduras intencionais (listagens completas, auditorias) ficam em ALLOWED_SCANS.
+Uso: python manage.py check-query-plans; também roda na suíte de testes
+(tests/test_query_plans.py).
+"""
+import inspect
+import os
+import random
+import re
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from sqlalchemy import event, text
+
+# Tabelas que crescem com o uso; um SCAN sem índice nelas é regressão
+LARGE_TABLES = {
+    'users', 'posts', 'likes', 'follows', 'comments', 'notification', 'timeline_entries',
+    'upload_blobs',
+}
+
+# Função de DAO -> tabelas que ela pode varrer por completo de propósito
+ALLOWED_SCANS = {
+    'user_dao.get_all_users': {'users'},
+}
+
+DAO_MODULES = [
+    'comment_dao', 'follow_dao', 'like_dao', 'notification_dao',
+    'post_dao', 'timeline_dao', 'upload_dao', 'user_dao',
+]
+
+SEED = {
+    'users': 1000,
+    'follows_per_user': 20,
+    'posts_per_user': 10,
+    'likes': 50000,
+    'comments': 20000,
+    'notifications': 20000,
+}
+
+_SCAN = re.compile(r'^SCAN (\w+)')
+
+def _scanned_table(detail):
+    """Tabela grande varrida por completo em uma linha do plano, ou None."""
+    match = _SCAN.match(detail)
+    if not match or ' USING ' in detail:
+        return None
+    name = match.group(1)
+    base = re.sub(r'_\d+$', '', name)  # aliases gerados pelo SQLAlchemy (posts_1)
+    if name in LARGE_TABLES:
+        return name
+    if base in LARGE_TABLES:
+        return base
+    return None
+
+def seed(db, sizes=SEED, rng=None):
+    """Popula o banco com dados sintéticos e atualiza as estatísticas do planner."""
+    rng = rng or random.Random(0)
+    now = datetime.utcnow()
+    n_users = sizes['users']
+
+    db.session.execute(
+        text("INSERT INTO users (id, name, username, email, password, admin, bio) "
+             "VALUES (:id, :name, :username, :email, 'x', 0, '')"),
+        [{'id': i, 'name': f'User {i}', 'username': f'user{i}', 'email': f'user{i}@example.com'}
+         for i in range(1, n_users + 1)]
+    )
+
+    follows = {
+        (i, rng.randint(1, n_users))
+        for i in range(1, n_users + 1) for _ in range(sizes['follows_per_user'])
+    }
+    db.session.execute(
+        text("INSERT INTO follows (follower_id, followed_id, created_at) VALUES (:a, :b, :t)"),
+        [{'a': a, 'b': b, 't': now} for a, b in follows if a != b]
+    )
+
+    n_posts = n_users * sizes['posts_per_user']
+    db.session.execute(
+        text("INSERT INTO posts (id, user_id, content, created_at, hot_score) "
+             "VALUES (:id, :user_id, :content, :created_at, :hot_score)"),
+        [{'id': i, 'user_id': rng.randint(1, n_users), 'content': f'post {i} sobre tema {i % 50}',
+          'created_at': now - timedelta(minutes=n_posts - i), 'hot_score': rng.random() * 10}
+         for i in range(1, n_posts + 1)]
+    )
+
+    likes = {(rng.randint(1, n_users), rng.randint(1, n_posts)) for _ in range(sizes['likes'])}
+    db.session.execute(
+        text("INSERT INTO likes (user_id, post_id) VALUES (:u, :p)"),
+        [{'u': u, 'p': p} for u, p in likes]
+    )
+
+    comments = []
+    for i in range(1, sizes['comments'] + 1):
+        parent = comments[rng.randrange(len(comments))] if comments and rng.random() < 0.3 else None
+        comments.append({
+            'id': i, 'post_id': parent['post_id'] if parent else rng.randint(1, n_posts),
+            'user_id': rng.randint(1, n_users), 'parent_id': parent['id'] if parent else None,
+            'content': f'comentário {i}', 'created_at': now
+        })
+    db.session.execute(
+        text("INSERT INTO comments (id, post_id, user_id, parent_id, content, created_at) "
+             "VALUES (:id, :post_id, :user_id, :parent_id, :content, :created_at)"),
+        comments
+    )
+
+    db.session.execute(
+        text("INSERT INTO notification (user_id, actor_id, type, message, read, created_at, "
+             "updated_at, target_id, group_key, actor_ids) "
+             "VALUES (:u, :a, 'like', 'x', :r, :t, :t, :p, 'like:' || :p || ':' || :i, :a)"),
+        [{'u': rng.randint(1, n_users), 'a': rng.randint(1, n_users), 'r': rng.random() < 0.5,
+          't': now - timedelta(minutes=i), 'p': rng.randint(1, n_posts), 'i': i}
+         for i in range(sizes['notifications'])]
+    )
+
+    db.session.execute(text("""
+        INSERT OR IGNORE INTO timeline_entries (user_id, post_id, author_id, created_at)
+        SELECT follows.follower_id, posts.id, posts.user_id, posts.created_at
+        FROM follows JOIN posts ON posts.user_id = follows.followed_id
+    """))
+    db.session.execute(text("""
+        UPDATE posts SET
+            likes_count = (SELECT COUNT(*) FROM likes WHERE likes.post_id = posts.id),
+            comments_count = (SELECT COUNT(*) FROM comments WHERE comments.post_id = posts.id)
+    """))
+    db.session.execute(text("""
+        UPDATE users SET
+            followers_count = (SELECT COUNT(*) FROM follows WHERE follows.followed_id = users.id),
+            following_count = (SELECT COUNT(*) FROM follows WHERE follows.follower_id = users.id),
+            posts_count = (SELECT COUNT(*) FROM posts WHERE posts.user_id = users.id)
+    """))
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+def scenarios():
+    """
+    Lista ordenada de (nome, função) que exercita todas as funções públicas dos DAOs.
+    Os cenários de escrita vêm por último e só tocam dados criados por eles mesmos
+    ou pelo seed.
+    """
+    from DAO import (comment_dao, follow_dao, like_dao, notification_dao,
+                     post_dao, timeline_dao, upload_dao, user_dao)
+
+    def second_page(fetch):
+        _, cursor = fetch(None)
+        return fetch(cursor)
+
+    def new_user(name):
+        return user_dao.create_user({
+            'name': name, 'username': name, 'email': f'{name}@example.com', 'password': 'x'
+        })
+
+    def write_flow():
+        for path in ('uploads/plano.png', 'uploads/reader.png'):
+            upload_dao.register_blob(path, None, 1, 'image/png')
+        author = new_user('plan_author')
+        reader = new_user('plan_reader')
+        follow_dao.follow_user(reader.id, 1)
+        user_dao.follow_user(reader.id, author.id)
+        post = post_dao.create_post({'user_id': author.id, 'content': 'plano', 'image_url': 'uploads/plano.png'})
+        post_dao.set_image_variants(post.id, 'uploads/plano.png', 800, 600,
+                                    {'feed': 'uploads/variants/plano-feed.webp'})
+        reply = post_dao.create_post({'user_id': reader.id, 'content': 're', 'reply_id': post.id})
+        post_dao.update_post(post.id, {'content': 'plano editado'})
+        like_dao.like_post(reader.id, post.id)
+        like_dao.unlike_post(reader.id, post.id)
+        like_dao.like_post(reader.id, post.id)
+        comment = comment_dao.create_comment(post.id, reader.id, 'oi')
+        comment_dao.create_comment(post.id, author.id, 'resposta', parent_id=comment.id)
+        comment_dao.delete_comment(comment.id)
+        notification = notification_dao.create_notification(author.id, 'like', 'x', actor_id=reader.id,
+                                                            target_id=post.id)
+        notification_dao.mark_notification_as_read(notification.id)
+        notification_dao.delete_notification(notification.id)
+        notification_dao.create_notifications([
+            {'user_id': author.id, 'actor_id': actor_id, 'type': 'like', 'target_id': post.id,
+             'message': 'x', 'created_at': datetime.utcnow()}
+            for actor_id in (reader.id, 1, 2)
+        ])
+        notification_dao.mark_all_as_read(author.id, notification.id + 1)
+        notification_dao.mark_all_as_read(author.id)
+        notification_dao.purge_notifications(
+            notification_dao.get_notification_ids_over_cap(author.id, 1, 500), archive=True
+        )
+        notification_dao.delete_all_notifications_by_user(author.id)
+        notification_dao.create_stream_ticket(reader.id, 'plano', datetime.utcnow() + timedelta(seconds=30))
+        notification_dao.redeem_stream_ticket('plano')
+        notification_dao.create_stream_ticket(reader.id, 'plano-pendente', datetime.utcnow())
+        user_dao.update_user(reader.id, {'bio': 'nova bio', 'profile_picture': 'uploads/reader.png'})
+        user_dao.set_profile_picture_variants(reader.id, 'uploads/reader.png',
+                                              {'64': 'uploads/variants/reader-64.webp'})
+        follow_dao.unfollow_user(reader.id, 1)
+        user_dao.unfollow_user(reader.id, author.id)
+        post_dao.delete_post(reply.id)
+        post_dao.delete_post(post.id)
+        # Remoção em cascata: likes, comentários (com respostas) e posts do usuário
+        like_dao.like_post(reader.id, 1)
+        comment = comment_dao.create_comment(1, reader.id, 'até logo')
+        comment_dao.create_comment(1, author.id, 'tchau', parent_id=comment.id)
+        post_dao.create_post({'user_id': reader.id, 'content': 'último'})
+        user_dao.delete_user(reader.id)
+        cutoff = datetime.utcnow() + timedelta(seconds=1)
+        for blob_id in [blob.id for blob in upload_dao.get_garbage_blobs(cutoff, 10)]:
+            upload_dao.delete_blob(blob_id, cutoff)
+
+    return [
+        ('post_dao: leitura', lambda: (
+            post_dao.get_post_by_id(10),
+            post_dao.get_all_posts_paginated(3, 20),
+            second_page(lambda c: post_dao.get_all_posts_by_cursor(c, 20)),
+            post_dao.get_posts_by_user_id_paginated(5, 1, 20),
+            second_page(lambda c: post_dao.get_posts_by_user_id_by_cursor(5, c, 3)),
+            second_page(lambda c: post_dao.get_explore_posts_by_cursor(c, 30)),
+            post_dao.get_explore_posts_paginated(2, 30),
+            post_dao.search_posts('tema', 20),
+            post_dao.get_posts_without_variants(0, 100),
+        )),
+        ('user_dao: leitura', lambda: (
+            user_dao.get_all_users(),
+            user_dao.get_user_by_id(7),
+            user_dao.get_user_by_email('user7@example.com'),
+            user_dao.get_user_by_username('user7'),
+            user_dao.get_users_by_ids([1, 2, 3]),
+            user_dao.get_users_by_usernames(['USER1', 'user2']),
+            user_dao.count_followers(7),
+            user_dao.get_followers(7),
+            user_dao.get_following(7),
+            user_dao.search_users('user1', 20),
+            user_dao.get_users_without_variants(0, 100),
+        )),
+        ('follow_dao: leitura', lambda: (
+            follow_dao.is_following(1, 2),
+            follow_dao.get_followers(3),
+            follow_dao.get_following(3),
+            second_page(lambda c: follow_dao.get_followers_page(3, c, 2)),
+            second_page(lambda c: follow_dao.get_following_page(3, c, 2)),
+            follow_dao.get_followers_page(3),
+        )),
+        ('like_dao: leitura', lambda: (
+            like_dao.get_like_by_id(1),
+            like_dao.get_like_by_user_and_post(1, 1),
+            like_dao.get_likes_by_user(1),
+            like_dao.get_likes_by_post(1),
+            like_dao.count_likes_by_post(1),
+            second_page(lambda c: like_dao.get_likers_page(1, c, 2)),
+        )),
+        ('comment_dao: leitura', lambda: (
+            comment_dao.get_comment_by_id(1),
+            second_page(lambda c: comment_dao.get_comments_page(1, None, c, 1)),
+            comment_dao.get_descendants([1, 2, 3], 3),
+            comment_dao.count_replies([1, 2, 3]),
+            comment_dao.get_comments_preview([1, 2, 3], 3),
+        )),
+        ('notification_dao: leitura', lambda: (
+            notification_dao.get_notifications_by_user(1),
+            notification_dao.get_notification_by_id(1),
+            notification_dao.get_unread_count(1),
+            notification_dao.get_unread_counts([1, 2, 3]),
+            notification_dao.get_notifications_since(1, datetime(2000, 1, 1)),
+            notification_dao.get_notifications_since(1, datetime(2000, 1, 1), after_id=1),
+            notification_dao.get_expired_notification_ids(datetime.utcnow(), 500),
+            notification_dao.get_users_over_cap(10),
+            notification_dao.get_notification_ids_over_cap(1, 10, 500),
+        )),
+        ('timeline_dao: leitura', lambda: (
+            second_page(lambda c: timeline_dao.get_home_timeline(1, c, 20)),
+        )),
+        ('escrita', write_flow),
+    ]
+
+def _public_functions():
+    """{'modulo.funcao': (modulo, funcao)} das funções públicas definidas nos DAOs."""
+    import importlib
+    functions = {}
+    for name in DAO_MODULES:
+        module = importlib.import_module(f'DAO.{name}')
+        for attr, value in vars(module).items():
+            if (inspect.isfunction(value) and not attr.startswith('_')
+                    and value.__module__ == module.__name__):
+                functions[f'{name}.{attr}'] = (module, attr)
+    return functions
+
+def _traced(functions, called, stack):
+    """Substitui as funções dos DAOs por versões que registram quem foi chamado."""
+    originals = {}
+    for key, (module, attr) in functions.items():
+        original = getattr(module, attr)
+        originals[key] = original
+
+        def wrapper(*args, _key=key, _original=original, **kwargs):
+            called.add(_key)
+            stack.append(_key)
+            try:
+                return _original(*args, **kwargs)
+            finally:
+                stack.pop()
+        setattr(module, attr, wrapper)
+    return originals
+
+def _explain(db, statement, parameters):
+    if isinstance(parameters, (list, tuple)) and parameters and isinstance(parameters[0], (list, tuple, dict)):
+        parameters = parameters[0]  # executemany: o plano é o mesmo para todas as linhas
+    connection = db.session.connection().connection.driver_connection
+    return [row[3] for row in connection.execute('EXPLAIN QUERY PLAN ' + statement, parameters or ())]
+
+def check(app_factory, sizes=SEED, verbose=False, echo=print):
+    """
+    Roda a verificação em um banco temporário. app_factory(config_overrides) cria o app.
+    Retorna a lista de problemas encontrados (vazia se tudo ok).
+    """
+    from flask_migrate import upgrade
+
+    tmp = tempfile.mkdtemp(prefix='query-plans-')
+    db_path = os.path.join(tmp, 'app.sqlite')
+    app = app_factory({
+        'DB_PATH': db_path,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'SCHEDULER_ENABLED': False,
+    })
+    try:
+        with app.app_context():
+            upgrade(directory=os.path.join(app.root_path, 'migrations'))
+        return check_app(app, sizes, verbose, echo)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def check_app(app, sizes=SEED, verbose=False, echo=print):
+    """
+    Roda a verificação no banco de `app`, que deve estar migrado e vazio (é populado
+    pelo seed e alterado pelos cenários de escrita). Retorna a lista de problemas:
+    "[scan] ..." para full scans e "[sem cenário] ..." para funções não exercitadas.
+    """
+    from extensions import db
+
+    problems = []
+    with app.app_context():
+        seed(db, sizes)
+
+        functions = _public_functions()
+        called, stack, statements = set(), [], []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().split(None, 1)[0].upper() in ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH'):
+                statements.append((stack[0] if stack else None, statement, parameters))
+
+        originals = _traced(functions, called, stack)
+        # Consultas de leitura rodam no engine somente leitura (services/db_routing)
+        engines = [db.engine] + [app.extensions[key] for key in ('db_reader',) if key in app.extensions]
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            for name, run in scenarios():
+                run()
+                db.session.commit()
+        finally:
+            for engine in engines:
+                event.remove(engine, 'before_cursor_execute', capture)
+            for key, original in originals.items():
+                module, attr = functions[key]
+                setattr(module, attr, original)
+
+        seen = set()
+        for owner, statement, parameters in statements:
+            if (owner, statement) in seen:
+                continue
+            seen.add((owner, statement))
+            plan = _explain(db, statement, parameters)
+            allowed = ALLOWED_SCANS.get(owner, set())
+            for detail in plan:
+                table = _scanned_table(detail)
+                if table and table not in allowed:
+                    problems.append(f'[scan] {owner}: {detail}\n    {" ".join(statement.split())}')
+            if verbose:
+                echo(f'{owner}: {" ".join(statement.split())[:120]}')
+                for detail in plan:
+                    echo(f'    {detail}')
+
+        for key in sorted(set(functions) - called):
+            problems.append(f'[sem cenário] {key} não é exercitada pela verificação de planos')
+        db.session.remove()
+        for engine in engines:
+            engine.dispose()
+    return problems
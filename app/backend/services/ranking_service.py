@@ -0,0 +1,63 @@
+"""
+Ranking do Explorar (hot score).
+
+O score de cada post fica armazenado em posts.hot_score (indexado junto com o id):
+
+    hot_score = likes * LIKE + comentários * COMMENT + RECENCY * max(0, 1 - idade / janela)
+
+A parte de engajamento é atualizada incrementalmente pelos DAOs de like e comentário.
+A parte de recência muda com o tempo e é recalculada por refresh_hot_scores,
+executado periodicamente (agendador ou `flask refresh-hot-scores`). Só os posts
+que ainda podem carregar recência (dentro da janela + margem) são tocados.
+"""
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import func
+from extensions import db
+from DAO.counters import unchanged_onupdate
+from models.post import Post
+
+# Margem após a janela de recência para zerar posts que saíram dela entre duas execuções
+REFRESH_GRACE = timedelta(days=7)
+
+def engagement_score(likes_count, comments_count):
+    config = current_app.config
+    return (likes_count * config['HOT_SCORE_LIKE_WEIGHT']
+            + comments_count * config['HOT_SCORE_COMMENT_WEIGHT'])
+
+def initial_score():
+    """Score de um post recém-criado (sem engajamento, recência máxima)."""
+    return float(current_app.config['HOT_SCORE_RECENCY_WEIGHT'])
+
+def _score_expression():
+    config = current_app.config
+    window = float(config['HOT_SCORE_RECENCY_HOURS'])
+    age_hours = (func.julianday('now') - func.julianday(Post.created_at)) * 24.0
+    recency = func.max(0.0, window - age_hours) / window * config['HOT_SCORE_RECENCY_WEIGHT']
+    return engagement_score(Post.likes_count, Post.comments_count) + recency
+
+def refresh_hot_scores(full=False):
+    """
+    Recalcula o hot score (passo de decaimento). Com full=True recalcula todos os posts.
+    Retorna o número de posts atualizados.
+    """
+    query = Post.query
+    if not full:
+        window = timedelta(hours=current_app.config['HOT_SCORE_RECENCY_HOURS'])
+        cutoff = datetime.now(timezone.utc) - window - REFRESH_GRACE
+        query = query.filter(Post.created_at >= cutoff)
+
+    # O score não é uma edição: updated_at fica como está
+    updated = query.update({Post.hot_score: _score_expression(), **unchanged_onupdate(Post)},
+                           synchronize_session=False)
+    db.session.commit()
+    return updated
+
+def start_scheduler(app):
+    """Agenda o passo de decaimento periódico, se o agendador estiver habilitado."""
+    from services import scheduler
+
+    def task():
+        refresh_hot_scores()
+
+    scheduler.schedule(app, 'hot-score-refresh', app.config['HOT_SCORE_REFRESH_SECONDS'], task)
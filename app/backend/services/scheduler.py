@@ -0,0 +1,49 @@
+"""
+Agendador simples em processo para tarefas periódicas de manutenção.
+
+Cada tarefa roda em uma thread daemon própria, dentro de um app context,
+a cada `interval` segundos. Erros são registrados no log e não interrompem
+o agendamento. Habilitado por SCHEDULER_ENABLED; em produção com vários
+processos, prefira rodar os comandos equivalentes do manage.py via cron.
+"""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+
+class PeriodicTask(threading.Thread):
+    def __init__(self, app, name, interval, func):
+        super().__init__(name=f'scheduler-{name}', daemon=True)
+        self.app = app
+        self.task_name = name
+        self.interval = interval
+        self.func = func
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                with self.app.app_context():
+                    self.func()
+            except Exception:
+                logger.exception('Falha na tarefa agendada %s', self.task_name)
+
+    def stop(self):
+        self.stopped.set()
+
+def schedule(app, name, interval, func):
+    """Registra e inicia uma tarefa periódica. Ignora nomes já agendados."""
+    if name in _tasks:
+        return _tasks[name]
+    task = PeriodicTask(app, name, interval, func)
+    _tasks[name] = task
+    task.start()
+    return task
+
+def stop_all():
+    """Interrompe todas as tarefas agendadas."""
+    for task in _tasks.values():
+        task.stop()
+    _tasks.clear()
@@ -0,0 +1,149 @@
+"""
+Perfil do engine SQLite para servidores com várias threads.
+
+Sem configuração, o SQLite roda em modo rollback journal: uma escrita bloqueia todas
+as leituras e escritores concorrentes recebem `database is locked` na hora. Aqui
+cada conexão nova do pool recebe os PRAGMAs de SQLITE_*:
+
+  - journal_mode=WAL:      leitores não bloqueiam o escritor nem são bloqueados por ele;
+  - synchronous=NORMAL:    em WAL, fsync só nos checkpoints (um commit não perde
+                           integridade numa queda de energia, só durabilidade);
+  - busy_timeout:          escritores concorrentes esperam a vez em vez de falhar;
+  - cache_size / mmap_size: páginas em memória por conexão e leitura via mmap;
+  - temp_store=MEMORY:     ordenações e tabelas temporárias fora do disco;
+  - foreign_keys=ON:       as chaves estrangeiras passam a ser verificadas;
+  - journal_size_limit:    tamanho a que o arquivo -wal volta após um checkpoint.
+
+O pool (QueuePool) mantém SQLITE_POOL_SIZE conexões abertas, que podem ser usadas
+por qualquer thread. Com o roteamento de leitura/escrita (services/db_routing) esse
+pool passa a ser o do engine somente leitura, e o engine principal fica com
+SQLITE_WRITER_POOL_SIZE conexões (uma: o escritor único). Bancos em memória (testes)
+ficam com o pool padrão e sem WAL.
+"""
+import logging
+import threading
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+def _is_file_database(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database not in (None, '', ':memory:')
+
+def pragmas_from_config(config):
+    """PRAGMAs do perfil, na ordem em que são aplicados (busy_timeout antes de trocar o journal)."""
+    return [
+        ('busy_timeout', int(config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))),
+        ('journal_mode', config.get('SQLITE_JOURNAL_MODE', 'WAL')),
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        # Negativo: tamanho em KiB, e não em páginas
+        ('cache_size', -int(config.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))),
+        ('mmap_size', int(config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))),
+        ('temp_store', config.get('SQLITE_TEMP_STORE', 'MEMORY')),
+        ('foreign_keys', 'ON' if config.get('SQLITE_FOREIGN_KEYS', True) else 'OFF'),
+        ('journal_size_limit', int(config.get('SQLITE_JOURNAL_SIZE_LIMIT', 64 * 1024 * 1024))),
+    ]
+
+def pool_status(engine):
+    """Ocupação do pool (QueuePool) do engine, ou None."""
+    pool = engine.pool if engine is not None else None
+    if not isinstance(pool, QueuePool):
+        return None
+    return {
+        'size': pool.size(),
+        'checked_out': pool.checkedout(),
+        'checked_in': pool.checkedin(),
+        'overflow': pool.overflow(),
+    }
+
+# PRAGMAs que valem para conexões somente leitura (o resto só tem efeito em quem escreve)
+READ_ONLY_PRAGMAS = ('busy_timeout', 'cache_size', 'mmap_size', 'temp_store')
+
+class SqliteProfile:
+    def __init__(self):
+        self.enabled = False
+        self.pragmas = []
+        self.engine = None
+        self._lock = threading.Lock()
+        self._stats = {'connections': 0, 'busy_errors': 0}
+
+    def init_app(self, app):
+        """Opções do engine (pool); chamado antes de db.init_app."""
+        self.enabled = (app.config.get('SQLITE_PROFILE_ENABLED', True)
+                        and _is_file_database(app.config['SQLALCHEMY_DATABASE_URI']))
+        self.pragmas = pragmas_from_config(app.config) if self.enabled else []
+        self.engine = None
+        if not self.enabled:
+            return
+
+        if app.config.get('DB_ROUTING_ENABLED', True):
+            # Leituras no engine somente leitura: o principal só escreve, uma conexão por vez
+            pool = (app.config.get('SQLITE_WRITER_POOL_SIZE', 1), 0,
+                    app.config.get('SQLITE_WRITER_TIMEOUT', 30))
+        else:
+            pool = (app.config.get('SQLITE_POOL_SIZE', 10), app.config.get('SQLITE_POOL_MAX_OVERFLOW', 10),
+                    app.config.get('SQLITE_POOL_TIMEOUT', 10))
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = self.engine_options(
+            app.config.get('SQLALCHEMY_ENGINE_OPTIONS'), *pool
+        )
+
+    def engine_options(self, options, pool_size, max_overflow, pool_timeout):
+        """Opções de create_engine com o pool dado (valores já presentes em `options` prevalecem)."""
+        options = dict(options or {})
+        options.setdefault('poolclass', QueuePool)
+        options.setdefault('pool_size', pool_size)
+        options.setdefault('max_overflow', max_overflow)
+        options.setdefault('pool_timeout', pool_timeout)
+        connect_args = dict(options.get('connect_args') or {})
+        # Conexões do pool circulam entre threads; timeout é o busy handler do sqlite3
+        connect_args.setdefault('check_same_thread', False)
+        connect_args.setdefault('timeout', dict(self.pragmas)['busy_timeout'] / 1000)
+        options['connect_args'] = connect_args
+        return options
+
+    def attach(self, engine, read_only=False):
+        """
+        Aplica os PRAGMAs às conexões novas do engine (depois de db.init_app). Com read_only,
+        só os de leitura, mais query_only=ON (o engine somente leitura do roteamento).
+        """
+        if not self.enabled:
+            return
+        if read_only:
+            pragmas = [(name, value) for name, value in self.pragmas if name in READ_ONLY_PRAGMAS]
+            pragmas.append(('query_only', 'ON'))
+        else:
+            self.engine = engine
+            pragmas = list(self.pragmas)
+
+        @event.listens_for(engine, 'connect')
+        def _apply_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas:
+                    cursor.execute(f'PRAGMA {name}={value}')
+            finally:
+                cursor.close()
+            with self._lock:
+                self._stats['connections'] += 1
+
+        @event.listens_for(engine, 'handle_error')
+        def _count_busy(context):
+            error = context.sqlalchemy_exception
+            if isinstance(error, OperationalError) and 'database is locked' in str(error.orig):
+                with self._lock:
+                    self._stats['busy_errors'] += 1
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['enabled'] = self.enabled
+        stats['pragmas'] = dict(self.pragmas)
+        pool = pool_status(self.engine)
+        if pool is not None:
+            stats['pool'] = pool
+        return stats
+
+sqlite_profile = SqliteProfile()
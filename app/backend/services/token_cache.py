@@ -0,0 +1,99 @@
+"""
+Cache de tokens verificados.
+
+token_required decodificava o JWT (HMAC) e buscava o usuário no banco a cada
+requisição autenticada. Aqui, por processo, o resultado da verificação fica em
+um LRU limitado (AUTH_CACHE_MAX_SIZE) com TTL (AUTH_CACHE_TTL_SECONDS), indexado
+pelo SHA-256 do token (o token em si não é guardado), junto com um resumo leve
+do usuário (AuthUser) no lugar do objeto ORM.
+
+update_user e delete_user invalidam as entradas do usuário via after_commit.
+Em outros processos a entrada antiga vale até expirar o TTL.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# Campos do usuário autenticado usados pelas rotas (request.user)
+AuthUser = namedtuple('AuthUser', 'id username name email admin profile_picture')
+
+def snapshot_of(user):
+    """Resumo imutável do usuário, seguro para guardar entre requisições."""
+    return AuthUser(user.id, user.username, user.name, user.email, bool(user.admin), user.profile_picture)
+
+def _key(token):
+    return hashlib.sha256(token.encode('utf-8')).digest()
+
+class TokenCache:
+    def __init__(self, max_size=10000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # hash do token -> (expira_em, payload, AuthUser)
+        self._by_user = {}             # user_id -> set de hashes de token
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def init_app(self, app):
+        self.max_size = app.config.get('AUTH_CACHE_MAX_SIZE', 10000)
+        self.ttl = app.config.get('AUTH_CACHE_TTL_SECONDS', 60)
+
+    def get(self, token):
+        """(payload, AuthUser) de um token já verificado, ou None."""
+        key = _key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                if entry is not None:
+                    self._discard(key)
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry[1], entry[2]
+
+    def put(self, token, payload, user):
+        if not self.max_size:
+            return
+        expires_at = time.time() + self.ttl
+        if isinstance(payload.get('exp'), (int, float)):
+            expires_at = min(expires_at, payload['exp'])
+        key = _key(token)
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (expires_at, payload, user)
+            self._by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self._stats['evictions'] += 1
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._by_user.get(entry[2].id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[entry[2].id]
+
+    def invalidate_user(self, user_id):
+        """Remove todas as entradas do usuário (dados alterados ou conta removida)."""
+        with self._lock:
+            for key in list(self._by_user.get(user_id, ())):
+                self._discard(key)
+            self._stats['invalidations'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_user.clear()
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        return stats
+
+token_cache = TokenCache()
@@ -0,0 +1,205 @@
+"""
+Unidade de trabalho: uma transação, e um commit, por operação do usuário.
+
+As funções de escrita dos DAOs terminam em flush_or_commit(): dentro de
+unit_of_work() elas só fazem flush, e o bloco que abriu a unidade confirma tudo
+com um único commit ao sair (ou desfaz tudo, se levantar exceção). Fora de uma
+unidade (threads de fundo, CLI, agendador) cada função continua confirmando a
+própria escrita.
+
+Com request_transactions.init_app(app) cada requisição é uma unidade: o commit
+acontece uma vez, depois da view e antes de a resposta sair, e respostas de erro
+(4xx/5xx) desfazem o que a view gravou. Curtir um post (like, contadores e, com
+NOTIFICATIONS_ASYNC desligado, a notificação) passa a custar um commit (um fsync
+no SQLite) em vez de dois ou três, e é atômico. Trabalho entregue a threads de
+fundo (notificações, variantes de imagem) só é enfileirado depois do commit.
+
+Dentro da unidade, um passo que pode falhar sem invalidar os anteriores (chave
+estrangeira inexistente, corrida num insert) roda em savepoint(): a falha desfaz
+só o bloco. Efeitos fora do banco que dependem do resultado usam after_commit
+(extensions) ou after_rollback (ex.: registrar de novo um upload já gravado no disco).
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from flask import g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from extensions import db
+
+logger = logging.getLogger(__name__)
+
+# session.info: profundidade das unidades de trabalho abertas na sessão
+_DEPTH = 'unit_of_work_depth'
+# session.info: callbacks de after_rollback da transação atual
+_AFTER_ROLLBACK = 'after_rollback'
+
+class Rollback(Exception):
+    """Levantada dentro de savepoint() para desfazer o bloco sem que seja um erro do banco."""
+
+def in_unit_of_work():
+    """Se a sessão atual está dentro de uma unidade de trabalho."""
+    return has_app_context() and db.session.info.get(_DEPTH, 0) > 0
+
+def after_rollback(callback):
+    """
+    Agenda `callback` para rodar se a unidade de trabalho atual for desfeita, depois do
+    rollback (fora da transação, fora da unidade). Descartado se ela for confirmada.
+    """
+    db.session.info.setdefault(_AFTER_ROLLBACK, []).append(callback)
+
+def _run_after_rollback(session):
+    for callback in session.info.pop(_AFTER_ROLLBACK, []):
+        try:
+            callback()
+        except Exception:
+            logger.exception('Falha em callback after_rollback')
+
+@event.listens_for(Session, 'after_commit')
+def _discard_after_rollback(session):
+    session.info.pop(_AFTER_ROLLBACK, None)
+
+def _enter(session):
+    session.info[_DEPTH] = session.info.get(_DEPTH, 0) + 1
+
+def _leave(session):
+    depth = session.info.pop(_DEPTH, 1) - 1
+    if depth > 0:
+        session.info[_DEPTH] = depth
+    return depth
+
+@contextmanager
+def unit_of_work():
+    """
+    Agrupa as escritas do bloco em uma transação, confirmada uma vez ao sair. Unidades
+    aninhadas se juntam à de fora; uma exceção em qualquer nível desfaz a unidade inteira.
+    """
+    session = db.session()
+    _enter(session)
+    try:
+        yield session
+    except BaseException:
+        _leave(session)
+        session.rollback()
+        request_transactions.count('rollbacks')
+        _run_after_rollback(session)
+        raise
+    if _leave(session) == 0:
+        session.commit()
+        request_transactions.count('commits')
+
+def flush_or_commit():
+    """Fim de uma escrita de DAO: flush dentro de uma unidade de trabalho, commit fora dela."""
+    if in_unit_of_work():
+        db.session.flush()
+        request_transactions.count('deferred_commits')
+    else:
+        db.session.commit()
+
+@contextmanager
+def savepoint():
+    """
+    Bloco que, se levantar exceção, desfaz só as próprias escritas (Rollback é engolida,
+    as demais repropagadas): um SAVEPOINT dentro de uma unidade de trabalho que já gravou
+    algo; senão, o rollback da transação, que ainda não tem nada a perder.
+    """
+    session = db.session()
+    session.flush()
+    if not (in_unit_of_work() and _has_writes(session)):
+        try:
+            yield
+        except Rollback:
+            session.rollback()
+        except BaseException:
+            session.rollback()
+            raise
+        return
+
+    nested = session.begin_nested()
+    callbacks = len(session.info.get('after_commit', []))
+    try:
+        yield
+    except BaseException as error:
+        nested.rollback()
+        # Callbacks after_commit agendados pelo bloco desfeito não devem rodar
+        del session.info.get('after_commit', [])[callbacks:]
+        request_transactions.count('savepoint_rollbacks')
+        if not isinstance(error, Rollback):
+            raise
+    else:
+        nested.commit()
+
+def release_session():
+    """
+    Para views de longa duração (stream SSE): confirma a unidade de trabalho da
+    requisição agora e devolve a conexão ao pool (db.session.remove()).
+    """
+    session = g.pop('unit_of_work_session', None)
+    if session is not None and session is db.session() and _leave(session) == 0:
+        session.commit()
+        request_transactions.count('commits')
+    db.session.remove()
+
+def _has_writes(session):
+    """Se a conexão de escrita da sessão já tem uma transação aberta no banco."""
+    connection = session.connection().connection.driver_connection
+    # pysqlite só abre a transação (BEGIN) na primeira escrita
+    return getattr(connection, 'in_transaction', True)
+
+class RequestTransactions:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            'requests': 0,
+            'commits': 0,
+            'rollbacks': 0,
+            'deferred_commits': 0,
+            'savepoint_rollbacks': 0,
+        }
+
+    def init_app(self, app):
+        """Abre uma unidade de trabalho por requisição (UNIT_OF_WORK_PER_REQUEST)."""
+        if not app.config.get('UNIT_OF_WORK_PER_REQUEST', True):
+            return
+        app.before_request(self._begin)
+        app.after_request(self._finish)
+        app.teardown_request(self._discard)
+
+    def _begin(self):
+        session = db.session()
+        _enter(session)
+        g.unit_of_work_session = session
+        self.count('requests')
+
+    def _finish(self, response):
+        session = g.pop('unit_of_work_session', None)
+        # A view pode ter descartado a sessão (db.session.remove(), como no stream SSE)
+        if session is None or session is not db.session() or _leave(session) > 0:
+            return response
+        if response.status_code >= 400:
+            session.rollback()
+            self.count('rollbacks')
+            _run_after_rollback(session)
+        else:
+            session.commit()
+            self.count('commits')
+        return response
+
+    def _discard(self, exc):
+        # Exceção antes de _finish: nada da unidade é confirmado
+        session = g.pop('unit_of_work_session', None)
+        if session is not None and session is db.session():
+            session.info.pop(_DEPTH, None)
+            session.rollback()
+            self.count('rollbacks')
+            _run_after_rollback(session)
+
+    def count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def metrics(self):
+        with self._lock:
+            return dict(self._stats)
+
+request_transactions = RequestTransactions()
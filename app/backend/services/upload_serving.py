@@ -0,0 +1,112 @@
+"""
+Entrega dos arquivos de /uploads.
+
+Os nomes dos uploads nunca são reaproveitados para outro conteúdo (hash do conteúdo,
+ou uuid nos arquivos antigos; ver services/upload_storage), então as respostas podem
+ser cacheadas para sempre: com UPLOADS_CACHE_IMMUTABLE saem com
+`Cache-Control: public, max-age=31536000, immutable` e um ETag forte derivado do
+nome. Um GET condicional (If-None-Match) é respondido com 304 sem abrir o arquivo;
+Range é atendido com 206.
+
+UPLOADS_SERVE_MODE escolhe quem envia os bytes:
+
+  - "app":        o próprio Flask (send_file). Em servidores com wsgi.file_wrapper
+                  (gunicorn, uWSGI) o corpo sai por sendfile, sem cópia em Python;
+  - "x-accel":    só os cabeçalhos; o nginx entrega o arquivo pela location interna
+                  UPLOADS_ACCEL_PREFIX (X-Accel-Redirect);
+  - "x-sendfile": idem para Apache/lighttpd (X-Sendfile com o caminho absoluto).
+
+Nos dois últimos modos o tráfego de imagens não ocupa workers Python.
+"""
+import mimetypes
+import os
+import threading
+from flask import abort, current_app, request, send_from_directory
+from werkzeug.security import safe_join
+from services.upload_storage import TMP_DIR
+
+SERVE_MODES = ('app', 'x-accel', 'x-sendfile')
+ONE_YEAR = 31536000
+
+def _etag(filename):
+    # Nome imutável: o próprio nome identifica o conteúdo
+    return os.path.basename(filename)
+
+class UploadServer:
+    def __init__(self):
+        self.root = None
+        self.mode = 'app'
+        self.immutable = True
+        self.max_age = ONE_YEAR
+        self.accel_prefix = '/protected-uploads/'
+        self._lock = threading.Lock()
+        self._stats = {'served': 0, 'not_modified': 0, 'partial': 0, 'offloaded': 0}
+
+    def init_app(self, app):
+        self.root = os.path.join(app.root_path, 'uploads')
+        self.mode = app.config.get('UPLOADS_SERVE_MODE', 'app')
+        if self.mode not in SERVE_MODES:
+            raise ValueError(f'UPLOADS_SERVE_MODE inválido: {self.mode!r} (use {", ".join(SERVE_MODES)})')
+        self.immutable = app.config.get('UPLOADS_CACHE_IMMUTABLE', True)
+        self.max_age = app.config.get('UPLOADS_CACHE_MAX_AGE', ONE_YEAR)
+        self.accel_prefix = app.config.get('UPLOADS_ACCEL_PREFIX', '/protected-uploads/')
+        if self.mode == 'x-sendfile':
+            app.config['USE_X_SENDFILE'] = True  # send_file responde só com o cabeçalho
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _cache_headers(self, response, etag):
+        if self.immutable:
+            response.set_etag(etag)
+            response.cache_control.public = True
+            response.cache_control.max_age = self.max_age
+            response.cache_control.immutable = True
+        return response
+
+    def send(self, filename):
+        """Resposta para GET /uploads/<filename>."""
+        if filename.split('/', 1)[0] == TMP_DIR:
+            abort(404)
+        etag = _etag(filename)
+
+        if self.immutable and request.if_none_match.contains_weak(etag):
+            self._count('not_modified')
+            return self._cache_headers(current_app.response_class(status=304), etag)
+
+        if self.mode == 'x-accel':
+            path = safe_join(self.root, filename)
+            if path is None or not os.path.isfile(path):
+                abort(404)
+            response = current_app.response_class(
+                mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            )
+            response.headers['X-Accel-Redirect'] = self.accel_prefix.rstrip('/') + '/' + filename
+            self._count('offloaded')
+            return self._cache_headers(response, etag)
+
+        response = send_from_directory(
+            self.root, filename,
+            etag=etag if self.immutable else True,
+            max_age=self.max_age if self.immutable else None,
+            conditional=True,
+        )
+        if self.immutable:
+            response.cache_control.immutable = True
+        if self.mode == 'x-sendfile':
+            self._count('offloaded')
+        elif response.status_code == 206:
+            self._count('partial')
+        else:
+            self._count('served')
+        return response
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['mode'] = self.mode
+        stats['immutable'] = self.immutable
+        return stats
+
+upload_server = UploadServer()
@@ -0,0 +1,274 @@
+"""
+Armazenamento dos uploads (imagens de post e fotos de perfil), endereçado pelo conteúdo.
+
+O parser multipart do werkzeug grava cada arquivo direto em um temporário em
+uploads/.tmp (UploadRequest), em blocos, calculando o SHA-256 e o tamanho enquanto
+os dados chegam; passando de UPLOAD_MAX_BYTES a leitura é interrompida com 413
+(e requisições com Content-Length acima de MAX_CONTENT_LENGTH nem começam a ser
+lidas). O tipo é identificado pelos bytes iniciais (JPEG, PNG, GIF, WebP), não
+pela extensão do nome enviado.
+
+O arquivo final é uploads/<ab>/<sha256>.<ext>, criado por rename do temporário
+(sem cópia); se o conteúdo já existe, o temporário é descartado e o arquivo
+reaproveitado. Cada arquivo tem um registro em upload_blobs com a contagem de
+referências, mantida pelos DAOs de post e usuário na mesma transação das escritas.
+
+A coleta de lixo (collect_garbage, pelo agendador ou `python manage.py gc-uploads`)
+apaga os arquivos e variantes sem referências há mais de UPLOAD_GC_GRACE_SECONDS,
+fora das requisições. O prazo cobre o intervalo entre gravar o arquivo e o commit
+do post/usuário que o referencia; uploads nunca referenciados também são coletados.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from flask import Request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+logger = logging.getLogger(__name__)
+
+TMP_DIR = '.tmp'
+CHUNK_SIZE = 64 * 1024
+# Folga de MAX_CONTENT_LENGTH para os campos de texto do formulário
+FORM_OVERHEAD = 1024 * 1024
+
+StoredUpload = namedtuple('StoredUpload', 'path sha256 size content_type created')
+
+class UploadRejected(Exception):
+    """Arquivo recusado: vazio ou de um tipo de imagem não suportado."""
+
+def sniff_image_type(header):
+    """(extensão, content type) a partir dos bytes iniciais do arquivo, ou None."""
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'jpg', 'image/jpeg'
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png', 'image/png'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif', 'image/gif'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'webp', 'image/webp'
+    return None
+
+class UploadSpool:
+    """Temporário de um arquivo enviado: calcula SHA-256 e tamanho enquanto é escrito."""
+
+    def __init__(self, directory, max_bytes):
+        fd, self.name = tempfile.mkstemp(dir=directory, suffix='.part')
+        self._file = os.fdopen(fd, 'w+b')
+        self._hash = hashlib.sha256()
+        self._persisted = False
+        self.size = 0
+        self.max_bytes = max_bytes
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_bytes and self.size > self.max_bytes:
+            self.close()
+            raise RequestEntityTooLarge()
+        self._hash.update(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def persist(self, path):
+        """Move o temporário para `path` (rename no mesmo sistema de arquivos)."""
+        self._file.flush()
+        os.chmod(self.name, 0o644)
+        os.replace(self.name, path)
+        self._persisted = True
+
+    def close(self):
+        self._file.close()
+        if not self._persisted:
+            try:
+                os.remove(self.name)
+            except FileNotFoundError:
+                pass
+
+    def __getattr__(self, name):
+        # read, readline, seek, tell... do arquivo subjacente
+        return getattr(self._file, name)
+
+class UploadRequest(Request):
+    """Request que grava os arquivos do multipart em UploadSpool, no diretório de uploads."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return upload_storage.spool()
+
+class UploadStorage:
+    def __init__(self):
+        self.root = None
+        self.tmp_dir = None
+        self.max_bytes = 10 * 1024 * 1024
+        self.grace_seconds = 3600
+        self.batch_size = 500
+        self._lock = threading.Lock()
+        self._stats = {
+            'stored': 0,
+            'deduplicated': 0,
+            'rejected': 0,
+            'bytes_stored': 0,
+            'bytes_deduplicated': 0,
+            'collected': 0,
+        }
+
+    def init_app(self, app):
+        self.root = os.path.join(app.root_path, 'uploads')
+        self.tmp_dir = os.path.join(self.root, TMP_DIR)
+        self.max_bytes = app.config.get('UPLOAD_MAX_BYTES', 10 * 1024 * 1024)
+        self.grace_seconds = app.config.get('UPLOAD_GC_GRACE_SECONDS', 3600)
+        self.batch_size = app.config.get('UPLOAD_GC_BATCH_SIZE', 500)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        app.request_class = UploadRequest
+        if app.config.get('MAX_CONTENT_LENGTH') is None and self.max_bytes:
+            app.config['MAX_CONTENT_LENGTH'] = self.max_bytes + FORM_OVERHEAD
+
+    def spool(self):
+        return UploadSpool(self.tmp_dir, self.max_bytes)
+
+    def save(self, file_storage):
+        """
+        Grava o arquivo enviado (FileStorage) e retorna StoredUpload. O caminho
+        (uploads/<ab>/<sha256>.<ext>) ainda não tem referências: o post/usuário que
+        o usa soma a sua ao ser gravado. Levanta UploadRejected para tipos não suportados.
+        """
+        from DAO import upload_dao
+
+        stream = file_storage.stream
+        if not isinstance(stream, UploadSpool):
+            # Arquivo que não veio do parser multipart: copia em blocos para um temporário
+            spool = self.spool()
+            try:
+                shutil.copyfileobj(stream, spool, CHUNK_SIZE)
+            except Exception:
+                spool.close()
+                raise
+            stream = spool
+
+        try:
+            stream.seek(0)
+            kind = sniff_image_type(stream.read(16))
+            if not stream.size or kind is None:
+                with self._lock:
+                    self._stats['rejected'] += 1
+                raise UploadRejected('Unsupported image type')
+
+            ext, content_type = kind
+            digest = stream.hexdigest()
+            path = f'uploads/{digest[:2]}/{digest}.{ext}'
+            # Registrado antes de olhar o disco: um blob sem referências tem o prazo da
+            # coleta renovado e não é apagado enquanto esta requisição o usa
+            upload_dao.register_blob(path, digest, stream.size, content_type)
+
+            target = os.path.join(self.root, digest[:2], f'{digest}.{ext}')
+            created = not os.path.exists(target)
+            if created:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                stream.persist(target)
+        finally:
+            stream.close()
+
+        with self._lock:
+            if created:
+                self._stats['stored'] += 1
+                self._stats['bytes_stored'] += stream.size
+            else:
+                self._stats['deduplicated'] += 1
+                self._stats['bytes_deduplicated'] += stream.size
+        return StoredUpload(path, digest, stream.size, content_type, created)
+
+    def _remove(self, path):
+        """Apaga um arquivo do diretório de uploads (caminho relativo ao app)."""
+        full = os.path.realpath(os.path.join(os.path.dirname(self.root), path))
+        if not full.startswith(os.path.realpath(self.root) + os.sep):
+            logger.warning('Caminho fora de uploads ignorado na coleta: %s', path)
+            return False
+        try:
+            os.remove(full)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _sweep_tmp(self, max_age):
+        """Apaga temporários esquecidos (processo encerrado no meio de um upload)."""
+        removed = 0
+        cutoff = time.time() - max_age
+        for entry in os.scandir(self.tmp_dir):
+            if entry.name.endswith('.part') and entry.stat().st_mtime < cutoff:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+        return removed
+
+    def collect_garbage(self, grace_seconds=None):
+        """
+        Apaga os uploads sem referências há mais de grace_seconds, com suas variantes.
+        Retorna o relatório {collected, files_removed, tmp_removed, elapsed_ms}.
+        """
+        from DAO import upload_dao
+        from extensions import after_commit
+        from services.image_pipeline import variant_paths
+        from services.unit_of_work import unit_of_work
+
+        if grace_seconds is None:
+            grace_seconds = self.grace_seconds
+        started = time.perf_counter()
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+
+        collected = 0
+        removed = []
+
+        def remove_files(path):
+            removed.append(sum(self._remove(p) for p in [path, *variant_paths(path)]))
+
+        while True:
+            blob_ids = [blob.id for blob in upload_dao.get_garbage_blobs(cutoff, self.batch_size)]
+            # Um commit por lote; os arquivos só são apagados depois dele
+            with unit_of_work():
+                for blob_id in blob_ids:
+                    # Condicional: o blob pode ter voltado a ser usado desde a consulta
+                    path = upload_dao.delete_blob(blob_id, cutoff)
+                    if path is None:
+                        continue
+                    collected += 1
+                    after_commit(lambda path=path: remove_files(path))
+            if len(blob_ids) < self.batch_size:
+                break
+        files = sum(removed)
+
+        report = {
+            'collected': collected,
+            'files_removed': files,
+            'tmp_removed': self._sweep_tmp(grace_seconds),
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        }
+        with self._lock:
+            self._stats['collected'] += collected
+        if collected or report['tmp_removed']:
+            logger.info('Coleta de uploads: %s', report)
+        return report
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+upload_storage = UploadStorage()
+
+def collect_garbage():
+    return upload_storage.collect_garbage()
+
+def start_scheduler(app):
+    """Agenda a coleta de lixo dos uploads, se o agendador estiver habilitado."""
+    from services import scheduler
+
+    scheduler.schedule(app, 'upload-gc', app.config['UPLOAD_GC_INTERVAL_SECONDS'], collect_garbage)
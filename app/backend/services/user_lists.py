@@ -0,0 +1,40 @@
+"""
+Listas de usuários (quem curtiu, seguidores, seguindo).
+
+As linhas já vêm do DAO com a projeção compacta (id, username, name, profile_picture),
+em uma única consulta com join. Quando há um usuário logado, cada item ganha
+`viewer_follows`, resolvido para a página inteira pelo grafo de follows em memória.
+"""
+from flask import request, jsonify
+from DAO.pagination import parse_limit, wants_cursor
+from middleware.jwt_util import optional_user_id
+from models.user import user_summary
+from services import follow_graph
+
+def serialize_users(rows, viewer_id=None):
+    """Serializa as linhas como user_summary, com `viewer_follows` se viewer_id for dado."""
+    users = [user_summary(row) for row in rows]
+    if viewer_id is not None:
+        followed = follow_graph.ensure_loaded().following_among(viewer_id, [user['id'] for user in users])
+        for user in users:
+            user['viewer_follows'] = user['id'] in followed
+    return users
+
+def user_list_response(get_page, owner_id, legacy=None):
+    """
+    Resposta de uma rota de lista de usuários, a partir de get_page(owner_id, cursor, limit).
+    Com `cursor`/`limit` responde {users, next_cursor}; sem eles, a lista completa,
+    opcionalmente embrulhada por legacy(users) no formato antigo da rota.
+    """
+    viewer_id = optional_user_id()
+    if wants_cursor(request.args):
+        try:
+            limit = parse_limit(request.args.get('limit'))
+            rows, next_cursor = get_page(owner_id, request.args.get('cursor'), limit)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor or limit'}), 400
+        return jsonify({'users': serialize_users(rows, viewer_id), 'next_cursor': next_cursor}), 200
+
+    rows, _ = get_page(owner_id)
+    users = serialize_users(rows, viewer_id)
+    return jsonify(legacy(users) if legacy else users), 200
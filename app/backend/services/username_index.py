@@ -0,0 +1,134 @@
+"""
+Índice em memória de usernames para autocomplete de menções.
+
+Mantém, por processo, um array ordenado de usernames normalizados (minúsculos)
+e busca por prefixo com bisect, sem tocar no banco. Os resultados são ordenados
+por número de seguidores. O índice é carregado na inicialização (ou no primeiro
+uso) e atualizado pelos DAOs via after_commit em create/update/delete de usuário
+e em follow/unfollow.
+"""
+import heapq
+import logging
+import threading
+from bisect import bisect_left, insort
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+IndexedUser = namedtuple('IndexedUser', 'id username name profile_picture followers_count')
+
+def normalize(username):
+    return (username or '').strip().lower()
+
+def entry_of(user):
+    """Cópia dos campos indexados de um User, segura para usar depois do commit."""
+    return IndexedUser(user.id, user.username, user.name, user.profile_picture, user.followers_count or 0)
+
+class UsernameIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        # (username normalizado, user_id), ordenados. O id entra na chave porque usernames
+        # são únicos diferenciando maiúsculas: "bob" e "Bob" são usuários distintos
+        self._keys = []
+        self._entries = {}    # user_id -> resumo do usuário
+        self.loaded = False
+
+    def load(self, users):
+        """Recarrega o índice a partir de objetos/linhas com id, username, name, profile_picture e followers_count."""
+        with self._lock:
+            self._entries = {}
+            for user in users:
+                self._put(user)
+            self._keys = sorted(self._key_of(entry) for entry in self._entries.values())
+            self.loaded = True
+
+    @staticmethod
+    def _key_of(entry):
+        return (normalize(entry['username']), entry['id'])
+
+    def _put(self, user):
+        entry = self._entries[user.id] = {
+            'id': user.id,
+            'username': user.username,
+            'name': user.name,
+            'profile_picture': user.profile_picture,
+            'followers_count': user.followers_count or 0,
+        }
+        return self._key_of(entry)
+
+    def upsert(self, user):
+        with self._lock:
+            self._drop(user.id)
+            insort(self._keys, self._put(user))
+
+    def remove(self, user_id):
+        with self._lock:
+            self._drop(user_id)
+
+    def _drop(self, user_id):
+        entry = self._entries.pop(user_id, None)
+        if entry is None:
+            return
+        key = self._key_of(entry)
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            del self._keys[i]
+
+    def _range(self, low, high):
+        """Entradas cujo username normalizado está em [low, high)."""
+        start = bisect_left(self._keys, (low,))
+        end = bisect_left(self._keys, (high,), start)
+        return [self._entries[user_id] for _, user_id in self._keys[start:end]]
+
+    def add_followers(self, user_id, delta):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry['followers_count'] = max(0, entry['followers_count'] + delta)
+
+    def search(self, prefix, limit=10):
+        """Até `limit` usuários cujo username começa com `prefix`, por número de seguidores."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            candidates = self._range(prefix, prefix + '\uffff')
+        best = heapq.nlargest(limit, candidates, key=lambda e: (e['followers_count'], -len(e['username'])))
+        return [dict(entry) for entry in best]
+
+    def get_many(self, usernames):
+        """
+        Resolve uma lista de usernames (sem diferenciar maiúsculas) para os resumos existentes;
+        variações de caixa de um mesmo nome ("bob", "Bob") trazem todos os usuários.
+        """
+        with self._lock:
+            found = {}
+            for username in usernames:
+                key = normalize(username)
+                if key:
+                    found.update((entry['id'], entry) for entry in self._range(key, key + '\x00'))
+            return [dict(entry) for entry in found.values()]
+
+username_index = UsernameIndex()
+
+def ensure_loaded():
+    """Carrega o índice a partir do banco se ainda não foi carregado neste processo."""
+    if username_index.loaded:
+        return username_index
+    from models.user import User
+    from extensions import db
+
+    rows = db.session.query(
+        User.id, User.username, User.name, User.profile_picture, User.followers_count
+    ).all()
+    username_index.load(rows)
+    logger.info('Índice de usernames carregado com %d usuários', len(rows))
+    return username_index
+
+def warm_up(app):
+    """Carrega o índice na inicialização; se o banco ainda não estiver migrado, adia para o primeiro uso."""
+    with app.app_context():
+        try:
+            ensure_loaded()
+        except Exception as exc:
+            logger.warning('Índice de usernames não carregado na inicialização: %s', exc)
@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_migrate import upgrade
+from app import create_app
+from extensions import db
+from services import username_index
+
+@pytest.fixture
+def app(tmp_path):
+    """App com um banco SQLite temporário já migrado, sem threads de fundo."""
+    db_path = str(tmp_path / 'app.sqlite')
+    app = create_app({
+        'TESTING': True,
+        'DB_PATH': db_path,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
+        'SCHEDULER_ENABLED': False,
+        'NOTIFICATIONS_ASYNC': False,
+        'IMAGE_VARIANTS_ENABLED': False,
+        'PASSWORD_POOL_WORKERS': 0,
+        'PASSWORD_BCRYPT_ROUNDS': 4,
+    })
+    with app.app_context():
+        upgrade(directory=os.path.join(app.root_path, 'migrations'))
+        # O índice de usernames é por processo: recarrega a partir do banco deste teste
+        username_index.username_index.loaded = False
+        username_index.ensure_loaded()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+        reader = app.extensions.get('db_reader')
+        if reader is not None:
+            reader.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def signup(client):
+    """Cria um usuário e retorna (id, cabeçalhos com o token)."""
+    def signup(username):
+        response = client.post('/api/users', json={
+            'name': username, 'username': username,
+            'email': f'{username}@example.com', 'password': 'senha-teste',
+        })
+        assert response.status_code == 201, response.get_json()
+        response = client.post('/api/login', json={'email': f'{username}@example.com', 'password': 'senha-teste'})
+        body = response.get_json()
+        return body['user']['id'], {'Authorization': f"Bearer {body['token']}"}
+    return signup
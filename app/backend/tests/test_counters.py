@@ -0,0 +1,36 @@
+from extensions import db
+from models.post import Post
+from services.counter_service import find_counter_drift, repair_counters
+
+def _create_post(client, headers, content='post'):
+    return client.post('/api/posts', data={'content': content}, headers=headers,
+                       content_type='multipart/form-data').get_json()
+
+def test_counter_updates_are_not_edits(app, client, signup):
+    _, author = signup('author')
+    _, reader = signup('reader')
+    post = _create_post(client, author)
+
+    assert client.post(f"/api/posts/{post['id']}/like", headers=reader).status_code == 201
+    comment = client.post(f"/api/comments/{post['id']}", json={'content': 'oi'}, headers=reader).get_json()
+    assert client.delete(f"/api/posts/{post['id']}/like", headers=reader).status_code == 200
+    client.delete(f"/api/comments/{comment['id']}", headers=reader)
+
+    body = client.get(f"/api/posts/{post['id']}").get_json()
+    assert body['likes_count'] == 0
+    assert body['updated_at'] is None
+
+def test_repair_fixes_drift_without_touching_updated_at(app, client, signup):
+    _, author = signup('author')
+    _, reader = signup('reader')
+    post = _create_post(client, author)
+    client.post(f"/api/posts/{post['id']}/like", headers=reader)
+
+    with app.app_context():
+        Post.query.filter(Post.id == post['id']).update({Post.likes_count: 7, Post.updated_at: Post.updated_at})
+        db.session.commit()
+        assert [d['column'] for d in find_counter_drift()] == ['likes_count']
+        assert repair_counters() == 1
+        assert find_counter_drift() == []
+        stored = db.session.get(Post, post['id'])
+        assert (stored.likes_count, stored.updated_at) == (1, None)
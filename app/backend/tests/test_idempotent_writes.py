@@ -0,0 +1,61 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from models.follow import Follow
+from models.like import Like
+from models.notification import Notification
+from services.counter_service import find_counter_drift
+
+def _create_post(client, headers):
+    return client.post('/api/posts', data={'content': 'post'}, headers=headers,
+                       content_type='multipart/form-data').get_json()
+
+def test_repeated_like_and_unlike_keep_one_row_and_the_counter(app, client, signup):
+    author_id, author = signup('author')
+    _, reader = signup('reader')
+    post = _create_post(client, author)
+    url = f"/api/posts/{post['id']}/like"
+
+    first, second = client.post(url, headers=reader), client.post(url, headers=reader)
+    assert (first.status_code, second.status_code) == (201, 200)
+    assert second.get_json() == {'liked': True, 'likes_count': 1}
+
+    for _ in range(2):
+        response = client.delete(url, headers=reader)
+        assert response.status_code == 200
+        assert response.get_json() == {'liked': False, 'likes_count': 0}
+
+    with app.app_context():
+        assert Like.query.count() == 0
+        assert Notification.query.filter_by(user_id=author_id, type='like').count() == 1
+        assert find_counter_drift() == []
+
+def test_concurrent_likes_from_one_user_count_once(app, signup):
+    _, author = signup('author')
+    _, reader = signup('reader')
+    post = _create_post(app.test_client(), author)
+
+    def like(_):
+        return app.test_client().post(f"/api/posts/{post['id']}/like", headers=reader).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = sorted(pool.map(like, range(8)))
+    assert statuses == [200] * 7 + [201]
+
+    with app.app_context():
+        assert Like.query.count() == 1
+        assert find_counter_drift() == []
+
+def test_repeated_follow_and_unfollow(app, client, signup):
+    followed_id, _ = signup('followed')
+    _, follower = signup('follower')
+
+    for _ in range(2):
+        response = client.post(f'/api/follow/{followed_id}', headers=follower)
+        assert response.get_json() == {'following': True, 'followers_count': 1}
+    for _ in range(2):
+        response = client.delete(f'/api/unfollow/{followed_id}', headers=follower)
+        assert response.get_json() == {'following': False, 'followers_count': 0}
+
+    with app.app_context():
+        assert Follow.query.count() == 0
+        assert find_counter_drift() == []
@@ -0,0 +1,11 @@
+import os
+
+from flask_migrate import check
+
+def test_schema_matches_models_after_upgrade(app):
+    # Sem filtro para as tabelas FTS5, o autogenerate apagaria a busca (drop_table)
+    with app.app_context():
+        try:
+            check(directory=os.path.join(app.root_path, 'migrations'))
+        except SystemExit as exit:
+            raise AssertionError('flask db check encontrou diferenças entre models e banco') from exit
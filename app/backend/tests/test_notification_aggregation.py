@@ -0,0 +1,33 @@
+from models.notification import Notification
+
+def _like_notification(app, user_id):
+    with app.app_context():
+        return Notification.query.filter_by(user_id=user_id, type='like').one()
+
+def test_repeat_actor_outside_recent_window_is_not_counted_twice(app, client, signup):
+    author_id, author = signup('author')
+    post = client.post('/api/posts', data={'content': 'post'}, headers=author,
+                       content_type='multipart/form-data').get_json()
+    likers = [signup(f'liker{i}')[1] for i in range(4)]
+    for headers in likers:
+        assert client.post(f"/api/posts/{post['id']}/like", headers=headers).status_code == 201
+
+    # O primeiro já saiu da lista de recentes (NOTIFICATION_RECENT_ACTORS = 3)
+    assert client.delete(f"/api/posts/{post['id']}/like", headers=likers[0]).status_code == 200
+    assert client.post(f"/api/posts/{post['id']}/like", headers=likers[0]).status_code == 201
+
+    notification = _like_notification(app, author_id)
+    assert notification.actor_count == 4
+    assert client.get(f"/api/posts/{post['id']}").get_json()['likes_count'] == 4
+
+def test_new_actors_are_counted(app, client, signup):
+    author_id, author = signup('author')
+    post = client.post('/api/posts', data={'content': 'post'}, headers=author,
+                       content_type='multipart/form-data').get_json()
+    for i in range(5):
+        _, headers = signup(f'liker{i}')
+        client.post(f"/api/posts/{post['id']}/like", headers=headers)
+
+    notification = _like_notification(app, author_id)
+    assert notification.actor_count == 5
+    assert len(notification.recent_actor_ids) == 3
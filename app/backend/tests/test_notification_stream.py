@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from extensions import db
+from models.notification import NotificationStreamTicket
+
+def _open_stream(client, query='', headers=None):
+    response = client.get(f'/api/notifications/stream{query}', headers=headers, buffered=False)
+    status = response.status_code
+    response.close()
+    return status
+
+def test_stream_ticket_is_single_use(client, signup):
+    _, headers = signup('reader')
+    ticket = client.post('/api/notifications/stream/ticket', headers=headers).get_json()['ticket']
+
+    assert _open_stream(client, f'?ticket={ticket}') == 200
+    assert _open_stream(client, f'?ticket={ticket}') == 401
+
+def test_stream_rejects_jwt_in_query_string(client, signup):
+    _, headers = signup('reader')
+    token = headers['Authorization'].split(' ')[1]
+
+    assert _open_stream(client, f'?token={token}') == 401
+    assert _open_stream(client, headers=headers) == 200
+
+def test_expired_stream_ticket_is_rejected(app, client, signup):
+    _, headers = signup('reader')
+    ticket = client.post('/api/notifications/stream/ticket', headers=headers).get_json()['ticket']
+    with app.app_context():
+        NotificationStreamTicket.query.update({'expires_at': datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+
+    assert _open_stream(client, f'?ticket={ticket}') == 401
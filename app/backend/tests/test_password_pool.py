@@ -0,0 +1,44 @@
+import os
+import threading
+import time
+
+import pytest
+
+from services.password_service import PasswordHasher, PasswordHasherBusy
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher()
+    hasher.rounds = 4
+    hasher.workers = 1
+    hasher.queue_max = 0
+    hasher._slots = threading.BoundedSemaphore(1)
+    yield hasher
+    hasher.shutdown()
+
+def _wait_idle(hasher, seconds=10):
+    deadline = time.monotonic() + seconds
+    while hasher.metrics()['in_flight'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert hasher.metrics()['in_flight'] == 0
+
+def test_timed_out_job_keeps_its_slot_until_it_leaves_the_pool(hasher):
+    hasher.rounds = 12
+    hasher.timeout = 0.01
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash_password('senha')
+    # O bcrypt ainda roda no pool: a vaga não voltou, a próxima chamada é rejeitada
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash_password('senha')
+    assert hasher.metrics()['rejected'] == 1
+
+    _wait_idle(hasher)
+    hasher.rounds = 4
+    hasher.timeout = 5
+    assert hasher.verify('senha', hasher.hash_password('senha'))
+
+def test_broken_pool_is_recreated_without_hashing_inline(hasher):
+    with pytest.raises(PasswordHasherBusy):
+        hasher._run(os._exit, 1)
+    _wait_idle(hasher)
+    assert hasher.verify('senha', hasher.hash_password('senha'))
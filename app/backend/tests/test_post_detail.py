@@ -0,0 +1,49 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from extensions import db
+
+@contextmanager
+def count_queries(app):
+    counter = {'n': 0}
+
+    def count(*args):
+        counter['n'] += 1
+
+    with app.app_context():
+        engines = [db.engine, *[app.extensions[k] for k in ('db_reader',) if k in app.extensions]]
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', count)
+    try:
+        yield counter
+    finally:
+        for engine in engines:
+            event.remove(engine, 'before_cursor_execute', count)
+
+def _post_with_comments(client, author, reader, comments):
+    post = client.post('/api/posts', data={'content': 'post'}, headers=author,
+                       content_type='multipart/form-data').get_json()
+    for i in range(comments):
+        parent = client.post(f"/api/comments/{post['id']}", json={'content': f'c{i}'}, headers=reader).get_json()
+        client.post(f"/api/comments/{post['id']}", json={'content': 'r', 'parent_id': parent['id']}, headers=author)
+    return post
+
+def test_single_post_uses_a_fixed_number_of_queries(app, client, signup):
+    _, author = signup('author')
+    _, reader = signup('reader')
+    small = _post_with_comments(client, author, reader, 1)
+    large = _post_with_comments(client, author, reader, 8)
+    client.post(f"/api/posts/{large['id']}/like", headers=reader)
+
+    counts = []
+    for post in (small, large):
+        with count_queries(app) as queries:
+            body = client.get(f"/api/posts/{post['id']}", headers=reader).get_json()
+        counts.append(queries['n'])
+    assert counts[0] == counts[1]
+
+    assert 'comments' not in body
+    assert len(body['comments_preview']) == app.config.get('COMMENTS_PREVIEW_SIZE', 3)
+    assert body['comments_count'] == 16
+    assert body['liked_by_user'] is True
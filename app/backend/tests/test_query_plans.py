@@ -0,0 +1,10 @@
+from services import query_plan_check
+
+def test_dao_queries_use_indexes_and_are_all_exercised(app):
+    problems = query_plan_check.check_app(app)
+
+    scans = [p for p in problems if p.startswith('[scan]')]
+    uncovered = [p for p in problems if p.startswith('[sem cenário]')]
+    assert scans == [], '\n'.join(scans)
+    assert uncovered == [], '\n'.join(uncovered)
+    assert problems == []
@@ -0,0 +1,13 @@
+from extensions import db
+from models.post import Post
+from services.ranking_service import refresh_hot_scores
+
+def test_refresh_hot_scores_does_not_mark_posts_as_edited(app, client, signup):
+    _, author = signup('author')
+    post = client.post('/api/posts', data={'content': 'post'}, headers=author,
+                       content_type='multipart/form-data').get_json()
+
+    with app.app_context():
+        assert refresh_hot_scores() == 1
+        assert refresh_hot_scores(full=True) == 1
+        assert db.session.get(Post, post['id']).updated_at is None
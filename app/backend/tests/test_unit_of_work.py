@@ -0,0 +1,58 @@
+import io
+import os
+
+import pytest
+
+from DAO import post_dao, upload_dao
+from extensions import db
+from models.post import Post
+from models.upload import UploadBlob
+from models.user import User
+from services.unit_of_work import unit_of_work
+from services.upload_storage import upload_storage
+
+PNG = b'\x89PNG\r\n\x1a\n' + b'\x00' * 64
+
+@pytest.fixture
+def uploads(tmp_path, monkeypatch):
+    """Diretório de uploads temporário (o padrão é app/backend/uploads)."""
+    root = tmp_path / 'uploads'
+    (root / 'tmp').mkdir(parents=True)
+    monkeypatch.setattr(upload_storage, 'root', str(root))
+    monkeypatch.setattr(upload_storage, 'tmp_dir', str(root / 'tmp'))
+    return root
+
+def test_exception_rolls_back_every_write_of_the_unit(app, signup):
+    user_id, _ = signup('author')
+    with app.app_context():
+        with pytest.raises(RuntimeError):
+            with unit_of_work():
+                post_dao.create_post({'user_id': user_id, 'content': 'rascunho'})
+                # Registrar um upload não confirma o que a unidade já gravou
+                upload_dao.register_blob('uploads/ab/abc.png', 'abc', 1, 'image/png')
+                raise RuntimeError('falha depois das escritas')
+
+        assert Post.query.count() == 0
+        assert db.session.get(User, user_id).posts_count == 0
+        # O arquivo pode já estar no disco: o blob volta a ser registrado, sem referências
+        blob = UploadBlob.query.filter_by(path='uploads/ab/abc.png').one()
+        assert blob.refcount == 0
+
+def test_rejected_request_keeps_no_post_and_leaves_the_image_collectable(app, client, signup, uploads):
+    user_id, headers = signup('author')
+    response = client.post('/api/posts', headers=headers, content_type='multipart/form-data',
+                           data={'content': 'oi', 'reply_id': '999', 'image': (io.BytesIO(PNG), 'a.png')})
+    assert response.status_code == 400
+
+    with app.app_context():
+        assert Post.query.count() == 0
+        assert db.session.get(User, user_id).posts_count == 0
+        blob = UploadBlob.query.one()
+        assert blob.refcount == 0
+        stored = os.path.join(os.path.dirname(upload_storage.root), blob.path)
+        assert os.path.exists(stored)
+
+        report = upload_storage.collect_garbage(grace_seconds=-1)
+        assert (report['collected'], report['files_removed']) == (1, 1)
+        assert not os.path.exists(stored)
+        assert UploadBlob.query.count() == 0
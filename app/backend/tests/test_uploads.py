@@ -0,0 +1,9 @@
+import io
+
+def test_profile_picture_rejection_reports_the_reason(client, signup):
+    user_id, headers = signup('reader')
+    response = client.put(f'/api/users/{user_id}/profile', headers=headers,
+                          data={'profile_picture': (io.BytesIO(b'not an image'), 'avatar.png')},
+                          content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Unsupported image type'
@@ -0,0 +1,14 @@
+def test_case_variant_usernames_survive_delete(client, signup):
+    lower_id, lower = signup('bob')
+    upper_id, _ = signup('Bob')
+
+    found = client.get('/api/users/autocomplete?prefix=bo').get_json()
+    assert sorted(user['id'] for user in found) == sorted([lower_id, upper_id])
+
+    assert client.delete(f'/api/users/{lower_id}', headers=lower).status_code == 200
+
+    response = client.get('/api/users/autocomplete?prefix=bo')
+    assert response.status_code == 200
+    assert [user['id'] for user in response.get_json()] == [upper_id]
+    found = client.post('/api/users/by_usernames', json={'usernames': ['bob']}).get_json()
+    assert [user['username'] for user in found] == ['Bob']
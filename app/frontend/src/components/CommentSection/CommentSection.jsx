@@ -1,13 +1,26 @@
-import React, { useState, useContext } from "react";
+import React, { useState, useContext, useEffect, useCallback } from "react";
 import { Link } from "react-router-dom";
 import { AuthContext } from "../../context/AuthContext";
 import { useFeed } from "../../context/FeedContext";
 import { Trash } from "lucide-react";
+import { avatarPath } from "../../utils/images";
 import "./CommentSection.css";
 
 const API_URL = import.meta.env.VITE_API_URL || "http://localhost:5000";
 
 /* Helpers */
+function appendReplies(nodes, parentId, replies, moreReplies) {
+  return nodes.map((n) => {
+    if (n.id === parentId) {
+      return { ...n, replies: [...(n.replies || []), ...replies], more_replies: moreReplies };
+    }
+    if (n.replies?.length) {
+      return { ...n, replies: appendReplies(n.replies, parentId, replies, moreReplies) };
+    }
+    return n;
+  });
+}
+
 function renderMentions(text) {
   if (!text) return text;
   const parts = text.split(/(@\w+)/g);
@@ -30,6 +43,50 @@ export default function CommentSection({ post }) {
   const [replyContent, setReplyContent] = useState("");
   const [mentionSuggestions, setMentionSuggestions] = useState([]);
   const [showSuggestions, setShowSuggestions] = useState(false);
+  // No feed os posts trazem só comments_preview; a árvore vem de /api/posts/<id>/comments
+  const [thread, setThread] = useState(post.comments ?? null);
+  const [nextCursor, setNextCursor] = useState(null);
+
+  const loadThread = useCallback(async (cursor = null) => {
+    const params = new URLSearchParams();
+    if (cursor) params.set("cursor", cursor);
+    try {
+      const res = await fetch(`${API_URL}/api/posts/${post.id}/comments?${params}`);
+      if (!res.ok) throw new Error("Erro ao carregar comentários");
+      const data = await res.json();
+      setThread((prev) => (cursor ? [...(prev || []), ...data.comments] : data.comments));
+      setNextCursor(data.next_cursor);
+    } catch {
+      if (!cursor) setThread([]);
+    }
+  }, [post.id]);
+
+  useEffect(() => {
+    if (post.comments) setThread(post.comments);
+    else loadThread();
+  }, [post.comments, loadThread]);
+
+  const refreshComments = async () => {
+    await fetchPosts();
+    if (!post.comments) await loadThread();
+  };
+
+  const loadMoreReplies = async (stub) => {
+    const params = new URLSearchParams({ parent_id: stub.parent_id });
+    if (stub.cursor) params.set("cursor", stub.cursor);
+    try {
+      const res = await fetch(`${API_URL}/api/posts/${post.id}/comments?${params}`);
+      if (!res.ok) throw new Error("Erro ao carregar respostas");
+      const data = await res.json();
+      const remaining = stub.count - data.comments.length;
+      const more = data.next_cursor && remaining > 0
+        ? { count: remaining, parent_id: stub.parent_id, cursor: data.next_cursor }
+        : null;
+      setThread((prev) => appendReplies(prev || [], stub.parent_id, data.comments, more));
+    } catch (err) {
+      alert(err.message);
+    }
+  };
 
   const handleSubmit = async () => {
     if (!comment.trim()) return;
@@ -44,7 +101,7 @@ export default function CommentSection({ post }) {
       });
       if (!res.ok) throw new Error("Erro ao comentar");
       setComment("");
-      await fetchPosts();
+      await refreshComments();
     } catch (err) {
       alert(err.message);
     }
@@ -67,7 +124,7 @@ export default function CommentSection({ post }) {
       if (!res.ok) throw new Error("Erro ao responder");
       setReplyContent("");
       setReplyingTo(null);
-      await fetchPosts();
+      await refreshComments();
     } catch (err) {
       alert(err.message);
     }
@@ -81,7 +138,7 @@ export default function CommentSection({ post }) {
         headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
       });
       if (!res.ok) throw new Error("Erro ao excluir");
-      await fetchPosts();
+      await refreshComments();
     } catch (err) {
       alert(err.message);
     }
@@ -152,7 +209,7 @@ export default function CommentSection({ post }) {
 
   const renderComment = (c, depth = 0) => {
     const author = c.author || { id: c.user_id, username: c.username || "user", name: "Usuário", profile_picture: null };
-    const profileImage = author.profile_picture ? `${API_URL}/${author.profile_picture}` : "/default-avatar.png";
+    const profileImage = author.profile_picture ? `${API_URL}/${avatarPath(author, "64")}` : "/default-avatar.png";
 
     return (
       <div key={c.id} className="comment" data-depth={Math.min(depth, 4)}>
@@ -248,18 +305,32 @@ export default function CommentSection({ post }) {
         )}
 
         {c.replies?.length > 0 && c.replies.map((reply) => renderComment(reply, depth + 1))}
+
+        {c.more_replies && (
+          <button className="reply-btn" onClick={() => loadMoreReplies(c.more_replies)}>
+            Ver mais {c.more_replies.count} {c.more_replies.count === 1 ? "resposta" : "respostas"}
+          </button>
+        )}
       </div>
     );
   };
 
   return (
     <div className="comments-section" aria-live="polite">
-      {post.comments?.length > 0 ? (
-        post.comments.map((c) => renderComment(c))
+      {thread === null ? (
+        <p className="no-comments">Carregando comentários...</p>
+      ) : thread.length > 0 ? (
+        thread.map((c) => renderComment(c))
       ) : (
         <p className="no-comments">Nenhum comentário ainda.</p>
       )}
 
+      {nextCursor && (
+        <button className="reply-btn" onClick={() => loadThread(nextCursor)}>
+          Ver mais comentários
+        </button>
+      )}
+
       <div className="comment-input-section" style={{ position: "relative" }}>
         <textarea
           className="comment-input"
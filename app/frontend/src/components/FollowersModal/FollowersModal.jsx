@@ -2,9 +2,10 @@ import React, { useEffect, useRef } from "react";
 import { Link } from "react-router-dom";
 import { X } from "lucide-react";
 import { motion, AnimatePresence } from "framer-motion";
+import { avatarPath } from "../../utils/images";
 import "./FollowersModal.css";
 
-function FollowersModal({ followers = [], onClose, title = "Seguidores" }) {
+function FollowersModal({ followers = [], total, onLoadMore = null, onClose, title = "Seguidores" }) {
   const overlayRef = useRef(null);
   const panelRef = useRef(null);
 
@@ -51,7 +52,7 @@ function FollowersModal({ followers = [], onClose, title = "Seguidores" }) {
           <div className="fm-modal-header">
             <div className="fm-title-wrap">
               <h3 className="fm-title">{title}</h3>
-              <span className="fm-subcount">{followers.length}</span>
+              <span className="fm-subcount">{total ?? followers.length}</span>
             </div>
             <button className="fm-close-btn" onClick={onClose} aria-label="Fechar">
               <X size={18} />
@@ -69,7 +70,7 @@ function FollowersModal({ followers = [], onClose, title = "Seguidores" }) {
                       <img
                         src={
                           f.profile_picture
-                            ? `http://localhost:5000/${f.profile_picture}`
+                            ? `http://localhost:5000/${avatarPath(f, "64")}`
                             : "/default-avatar.png"
                         }
                         alt={f.name || f.username}
@@ -91,6 +92,11 @@ function FollowersModal({ followers = [], onClose, title = "Seguidores" }) {
                 ))}
               </ul>
             )}
+            {onLoadMore && (
+              <button className="fm-load-more" onClick={onLoadMore}>
+                Carregar mais
+              </button>
+            )}
           </div>
         </motion.div>
       </div>
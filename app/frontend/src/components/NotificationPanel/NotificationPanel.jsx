@@ -8,6 +8,7 @@ function NotificationPanel({ onClose }) {
   const {
     notifications,
     markAsRead,
+    markAllAsRead,
     fetchNotifications,
   } = useContext(NotificationContext);
 
@@ -67,6 +68,11 @@ function NotificationPanel({ onClose }) {
         </div>
 
         <div className="header-actions">
+          {notifications.some((n) => !n.read) && (
+            <button className="clear-all-btn" onClick={markAllAsRead} title="Marcar todas como lidas">
+              Marcar todas como lidas
+            </button>
+          )}
           {notifications.length > 0 && (
             <button className="clear-all-btn" onClick={clearAll} title="Limpar todas as notificações">
               Limpar todas
@@ -87,16 +93,16 @@ function NotificationPanel({ onClose }) {
               <div className="notification-main">
                 <div className="notification-avatar">
                   {/* small neutral avatar/initial */}
-                  {n.user?.username ? (
-                    <div className="avatar-initial">{n.user.username.slice(0, 1).toUpperCase()}</div>
+                  {n.actor?.username ? (
+                    <div className="avatar-initial">{n.actor.username.slice(0, 1).toUpperCase()}</div>
                   ) : (
                     <div className="avatar-icon">🔔</div>
                   )}
                 </div>
 
                 <div className="notification-body">
-                  {n.user?.username ? (
-                    <Link to={`/user/${n.user.username}`} className="notification-link" onClick={onClose}>
+                  {n.actor?.username ? (
+                    <Link to={`/user/${n.actor.username}`} className="notification-link" onClick={onClose}>
                       <span className="notification-message">{n.message}</span>
                     </Link>
                   ) : (
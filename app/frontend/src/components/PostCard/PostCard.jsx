@@ -8,6 +8,7 @@ import { Prism as SyntaxHighlighter } from "react-syntax-highlighter";
 import vsDark from "react-syntax-highlighter/dist/esm/styles/prism/vs-dark";
 import "./PostCard.css";
 import { Heart, MessageSquareText, Trash } from "lucide-react";
+import { avatarPath, postImagePath } from "../../utils/images";
 
 const API_URL = import.meta.env.VITE_API_URL || "http://localhost:5000";
 
@@ -21,6 +22,7 @@ function PostCard({ post, compact = false }) {
   const [likedByUser, setLikedByUser] = useState(Boolean(post.liked_by_user));
   const [likesCount, setLikesCount] = useState(post.likes_count || 0);
   const [likers, setLikers] = useState([]);
+  const [likersCursor, setLikersCursor] = useState(null);
   const [showLikers, setShowLikers] = useState(false);
   const menuRef = useRef();
 
@@ -33,7 +35,7 @@ function PostCard({ post, compact = false }) {
   };
 
   const profileImage = author.profile_picture
-    ? `${API_URL}/${author.profile_picture}`
+    ? `${API_URL}/${avatarPath(author)}`
     : "/default-profile.png";
 
   const commentsCount = post.comments_count ?? (post.comments ? post.comments.length : 0);
@@ -61,40 +63,48 @@ function PostCard({ post, compact = false }) {
         headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
       });
       if (!res.ok) throw new Error("Erro ao curtir/descurtir");
+      const data = await res.json();
       setLikeAnimating(true);
       setTimeout(() => setLikeAnimating(false), 500);
-      setLikedByUser(!likedByUser);
-      setLikesCount((prev) => (likedByUser ? Math.max(0, prev - 1) : prev + 1));
+      setLikedByUser(data.liked);
+      setLikesCount(data.likes_count);
       setShowLikers(false);
     } catch (err) {
       alert(err.message || "Erro ao curtir/descurtir");
     }
   };
 
-  const handleToggleLikers = async (e) => {
-    e?.stopPropagation?.();
-    if (showLikers) {
-      setShowLikers(false);
-      return;
-    }
+  const fetchLikers = async (cursor = null) => {
     const token = localStorage.getItem("token");
     if (!token) {
       alert("Você precisa estar logado para ver quem curtiu.");
       return;
     }
     try {
-      const res = await fetch(`${API_URL}/api/likes/post/${post.id}`, {
+      const params = new URLSearchParams({ limit: 20 });
+      if (cursor) params.set("cursor", cursor);
+      const res = await fetch(`${API_URL}/api/likes/post/${post.id}?${params}`, {
         headers: { Authorization: `Bearer ${token}` },
       });
       if (!res.ok) throw new Error("Erro ao buscar curtidas");
       const data = await res.json();
-      setLikers(data || []);
+      setLikers((prev) => (cursor ? [...prev, ...data.users] : data.users));
+      setLikersCursor(data.next_cursor);
       setShowLikers(true);
     } catch (err) {
       alert(err.message || "Erro ao buscar curtidas");
     }
   };
 
+  const handleToggleLikers = async (e) => {
+    e?.stopPropagation?.();
+    if (showLikers) {
+      setShowLikers(false);
+      return;
+    }
+    await fetchLikers();
+  };
+
   const renderDescription = () => {
     const maxLength = 100;
     const desc = post.description?.trim() || "";
@@ -167,7 +177,7 @@ function PostCard({ post, compact = false }) {
         <div className="compact-media">
           {post.image_url ? (
             <img
-              src={`${API_URL}/${post.image_url}`}
+              src={`${API_URL}/${postImagePath(post)}`}
               alt={post.description || "Post image"}
               className="post-card-image compact-image"
             />
@@ -300,7 +310,7 @@ function PostCard({ post, compact = false }) {
 
         {post.image_url && (
           <div className="post-card-image-wrapper">
-            <img src={`${API_URL}/${post.image_url}`} alt="Post" className="post-card-image" />
+            <img src={`${API_URL}/${postImagePath(post)}`} alt="Post" className="post-card-image" />
           </div>
         )}
       </Link>
@@ -341,11 +351,16 @@ function PostCard({ post, compact = false }) {
           <ul>
             {likers.map((u) => (
               <li key={u.id}>
-                <img src={`${API_URL}/${u.profile_picture || "default-profile.png"}`} alt={u.name} />
+                <img src={`${API_URL}/${avatarPath(u, "64") || "default-profile.png"}`} alt={u.name} />
                 <Link to={`/user/${u.username}`}>{u.name}</Link>
               </li>
             ))}
           </ul>
+          {likersCursor && (
+            <button className="likers-btn" onClick={() => fetchLikers(likersCursor)}>
+              Ver mais
+            </button>
+          )}
         </div>
       )}
 
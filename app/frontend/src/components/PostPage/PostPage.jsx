@@ -8,6 +8,7 @@ import timezone from "dayjs/plugin/timezone";
 import BackButton from "../BackButton/BackButton";
 import { Prism as SyntaxHighlighter } from "react-syntax-highlighter";
 import vsDark from "react-syntax-highlighter/dist/esm/styles/prism/vs-dark";
+import { avatarPath, postImagePath } from "../../utils/images";
 import "./PostPage.css";
 
 dayjs.extend(utc);
@@ -51,7 +52,7 @@ function PostPage() {
   };
 
   const profileImage = author.profile_picture
-    ? `${API_URL}/${author.profile_picture}`
+    ? `${API_URL}/${avatarPath(author)}`
     : "/default-profile.png";
 
   const formattedDate = dayjs
@@ -112,7 +113,7 @@ function PostPage() {
         {post.image_url && (
           <div className="post-image-wrapper">
             <img
-              src={`${API_URL}/${post.image_url}`}
+              src={`${API_URL}/${postImagePath(post, "full")}`}
               alt="Post"
               className="post-image"
             />
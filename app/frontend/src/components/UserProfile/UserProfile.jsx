@@ -10,6 +10,7 @@ import { AuthContext } from "../../context/AuthContext";
 import { Pencil } from "lucide-react";
 import FollowersModal from "../../components/FollowersModal/FollowersModal";
 import BackButton from "../BackButton/BackButton";
+import { postImagePath } from "../../utils/images";
 import "./UserProfile.css";
 
 const API_URL = import.meta.env.VITE_API_URL || "http://localhost:5000";
@@ -70,8 +71,10 @@ function UserProfile() {
 
   const [showFollowersModal, setShowFollowersModal] = useState(false);
   const [followerList, setFollowerList] = useState([]);
+  const [followersCursor, setFollowersCursor] = useState(null);
   const [showFollowingModal, setShowFollowingModal] = useState(false);
   const [followingList, setFollowingList] = useState([]);
+  const [followingCursor, setFollowingCursor] = useState(null);
 
   const textareaRef = useRef(null);
   const fileInputRef = useRef(null);
@@ -122,25 +125,20 @@ function UserProfile() {
         setProfile(data);
         setBio(data.bio || "");
         setPreview(
-          data.profile_picture ? `${API_URL}/${data.profile_picture}?t=${Date.now()}` : null
+          data.profile_picture ? `${API_URL}/${data.profile_picture}` : null
         );
         setIsFollowing(Boolean(data.is_following));
         setNotFound(false);
 
-        // fetch posts and follower count in parallel
-        const postsPromise = fetch(`${API_URL}/api/posts/user/${data.id}`, {
-          signal: controller.signal,
-        }).then((r) => r.ok ? r.json() : []);
+        // follower count comes with the profile (denormalized counter)
+        setFollowers(data.followers_count ?? 0);
 
-        const followersPromise = fetch(`${API_URL}/api/users/${data.id}/followers`, {
+        const postsData = await fetch(`${API_URL}/api/posts/user/${data.id}`, {
           signal: controller.signal,
-        }).then((r) => r.ok ? r.json() : { count: 0 });
-
-        const [postsData, followersData] = await Promise.all([postsPromise, followersPromise]);
+        }).then((r) => r.ok ? r.json() : []);
         if (!componentMountedRef.current) return;
 
         setPosts(Array.isArray(postsData) ? postsData : postsData.posts ?? []);
-        setFollowers(followersData.count ?? 0);
       } catch (err) {
         if (err.name === "AbortError") return;
         console.error("fetchProfile error:", err);
@@ -273,8 +271,9 @@ function UserProfile() {
         headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
       });
       if (!res.ok) throw new Error("Erro ao atualizar follow");
-      setIsFollowing((f) => !f);
-      setFollowers((prev) => (isFollowing ? Math.max(0, prev - 1) : prev + 1));
+      const data = await res.json();
+      setIsFollowing(data.following);
+      setFollowers(data.followers_count);
     } catch (err) {
       console.error("follow error:", err);
       alert("Erro ao atualizar follow");
@@ -335,7 +334,7 @@ function UserProfile() {
         setEditing(false);
         setPicture(null);
         setPreview(
-          data.profile_picture ? `${API_URL}/${data.profile_picture}?t=${Date.now()}` : null
+          data.profile_picture ? `${API_URL}/${data.profile_picture}` : null
         );
         //もし the logged user updated their own profile -> refresh auth context
         if (data.id === user.id) login(data, localStorage.getItem("token"));
@@ -348,13 +347,25 @@ function UserProfile() {
     }
   };
 
-  const handleFollowersClick = async () => {
+  const USER_LIST_PAGE_SIZE = 50;
+
+  const fetchUserList = async (path, cursor) => {
+    const params = new URLSearchParams({ limit: USER_LIST_PAGE_SIZE });
+    if (cursor) params.set("cursor", cursor);
+    const token = localStorage.getItem("token");
+    const res = await fetch(`${API_URL}/api/users/${profile.id}/${path}?${params}`, {
+      headers: token ? { Authorization: `Bearer ${token}` } : {},
+    });
+    if (!res.ok) throw new Error();
+    return res.json();
+  };
+
+  const handleFollowersClick = async (loadMore = false) => {
     if (!profile) return;
     try {
-      const res = await fetch(`${API_URL}/api/users/${profile.id}/followers`);
-      if (!res.ok) throw new Error();
-      const data = await res.json();
-      setFollowerList(data.followers || []);
+      const data = await fetchUserList("followers", loadMore ? followersCursor : null);
+      setFollowerList((prev) => (loadMore ? [...prev, ...data.users] : data.users));
+      setFollowersCursor(data.next_cursor);
       setShowFollowersModal(true);
     } catch (err) {
       console.error("fetch followers error:", err);
@@ -362,13 +373,12 @@ function UserProfile() {
     }
   };
 
-  const handleFollowingClick = async () => {
+  const handleFollowingClick = async (loadMore = false) => {
     if (!profile) return;
     try {
-      const res = await fetch(`${API_URL}/api/users/${profile.id}/following`);
-      if (!res.ok) throw new Error();
-      const data = await res.json();
-      setFollowingList(data || []);
+      const data = await fetchUserList("following", loadMore ? followingCursor : null);
+      setFollowingList((prev) => (loadMore ? [...prev, ...data.users] : data.users));
+      setFollowingCursor(data.next_cursor);
       setShowFollowingModal(true);
     } catch (err) {
       console.error("fetch following error:", err);
@@ -462,7 +472,7 @@ function UserProfile() {
           <div className="profile-follow-stats" aria-label="Estatísticas de seguidor">
             <span
               className="profile-followers clickable"
-              onClick={handleFollowersClick}
+              onClick={() => handleFollowersClick()}
               role="button"
               tabIndex={0}
               aria-label={`${followers} ${followers === 1 ? "seguidor" : "seguidores"}`}
@@ -471,7 +481,7 @@ function UserProfile() {
             </span>
             <span
               className="profile-followers clickable"
-              onClick={handleFollowingClick}
+              onClick={() => handleFollowingClick()}
               role="button"
               tabIndex={0}
               aria-label={`${profile.following_count ?? 0} seguindo`}
@@ -558,7 +568,7 @@ function UserProfile() {
                   {post.image_url ? (
                     <>
                       <img
-                        src={`${API_URL}/${post.image_url}`}
+                        src={`${API_URL}/${postImagePath(post)}`}
                         alt={post.description || "Publicação"}
                         className="profile-post-grid-image"
                         loading="lazy"
@@ -583,6 +593,8 @@ function UserProfile() {
       {showFollowersModal && (
         <FollowersModal
           followers={followerList}
+          total={followers}
+          onLoadMore={followersCursor ? () => handleFollowersClick(true) : null}
           onClose={() => setShowFollowersModal(false)}
           title="Seguidores"
         />
@@ -590,6 +602,8 @@ function UserProfile() {
       {showFollowingModal && (
         <FollowersModal
           followers={followingList}
+          total={profile.following_count ?? followingList.length}
+          onLoadMore={followingCursor ? () => handleFollowingClick(true) : null}
           onClose={() => setShowFollowingModal(false)}
           title="Seguindo"
         />
@@ -27,9 +27,12 @@ export function NotificationProvider({ children }) {
     setLoading(true);
     try {
       console.log("fetchNotifications token:", localStorage.getItem("token")); // debug temporário
-      const data = await apiFetch("/api/notifications", { method: "GET" }, { onUnauthorized: handleUnauthorized });
+      const [data, counts] = await Promise.all([
+        apiFetch("/api/notifications", { method: "GET" }, { onUnauthorized: handleUnauthorized }),
+        apiFetch("/api/notifications/unread_count", { method: "GET" }, { onUnauthorized: handleUnauthorized }),
+      ]);
       setNotifications(Array.isArray(data) ? data : []);
-      setUnreadCount((Array.isArray(data) ? data : []).filter((n) => !n.read).length);
+      setUnreadCount(counts?.unread_count ?? 0);
     } catch (err) {
       console.error("Erro ao buscar notificações", err);
       if (err.status === 401) {
@@ -50,6 +53,23 @@ export function NotificationProvider({ children }) {
     }
   }, [handleUnauthorized]);
 
+  const markAllAsRead = useCallback(async () => {
+    // marca tudo até a notificação mais recente que está na tela, em uma requisição
+    const upToId = notifications.reduce((max, n) => Math.max(max, n.id), 0);
+    if (!upToId) return;
+    try {
+      const data = await apiFetch("/api/notifications/read", {
+        method: "PUT",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ up_to_id: upToId }),
+      }, { onUnauthorized: handleUnauthorized });
+      setNotifications((prev) => prev.map(n => n.id <= upToId ? { ...n, read: true } : n));
+      setUnreadCount(data.unread_count);
+    } catch (err) {
+      console.error("Erro ao marcar notificações como lidas", err);
+    }
+  }, [notifications, handleUnauthorized]);
+
   const deleteNotification = useCallback(async (id) => {
     try {
       await apiFetch(`/api/notifications/${id}`, { method: "DELETE" }, { onUnauthorized: handleUnauthorized });
@@ -73,13 +93,66 @@ export function NotificationProvider({ children }) {
   useEffect(() => {
     // busca inicial quando AuthProvider já carregou
     if (!authLoading) fetchNotifications();
+    if (authLoading || !user) return;
+
+    // sem EventSource: volta a atualizar a cada 30s
+    if (typeof EventSource === "undefined") {
+      const interval = setInterval(fetchNotifications, 30000);
+      return () => clearInterval(interval);
+    }
+
+    // stream SSE: recebe só as notificações novas/atualizadas e a contagem de não lidas.
+    // O EventSource não envia cabeçalhos e o JWT não vai na URL: cada conexão usa um
+    // ticket de uso único. Por isso a reconexão é feita aqui, com um ticket novo e o id
+    // do último evento (o servidor reenvia o que faltou).
+    const API_URL = import.meta.env.VITE_API_URL || "http://localhost:5000";
+    let source = null;
+    let retryTimer = null;
+    let lastEventId = "";
+    let closed = false;
+
+    const connect = async () => {
+      let ticket;
+      try {
+        ({ ticket } = await apiFetch("/api/notifications/stream/ticket", { method: "POST" },
+          { onUnauthorized: handleUnauthorized }));
+      } catch (err) {
+        if (err.status !== 401 && !closed) retryTimer = setTimeout(connect, 5000);
+        return;
+      }
+      if (closed) return;
+
+      const params = new URLSearchParams({ ticket });
+      if (lastEventId) params.set("last_event_id", lastEventId);
+      source = new EventSource(`${API_URL}/api/notifications/stream?${params}`);
+
+      source.addEventListener("notification", (e) => {
+        const { notification, unread_count } = JSON.parse(e.data);
+        lastEventId = e.lastEventId || lastEventId;
+        // notificações agregadas chegam de novo quando recebem atores: substitui pelo id
+        setNotifications((prev) => [notification, ...prev.filter((n) => n.id !== notification.id)]);
+        setUnreadCount(unread_count);
+      });
+      source.addEventListener("unread", (e) => {
+        setUnreadCount(JSON.parse(e.data).unread_count);
+      });
+      source.addEventListener("resync", () => {
+        fetchNotifications();
+      });
+      source.onerror = () => {
+        // o ticket já foi usado: a reconexão automática do EventSource falharia
+        source.close();
+        if (!closed) retryTimer = setTimeout(connect, 5000);
+      };
+    };
+    connect();
 
-    // atualizar a cada 30s somente se o usuário estiver logado
-    const interval = setInterval(() => {
-      if (!authLoading && user) fetchNotifications();
-    }, 30000);
-    return () => clearInterval(interval);
-  }, [authLoading, user, fetchNotifications]);
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      source?.close();
+    };
+  }, [authLoading, user, fetchNotifications, handleUnauthorized]);
 
   return (
     <NotificationContext.Provider value={{
@@ -87,6 +160,7 @@ export function NotificationProvider({ children }) {
       unreadCount,
       fetchNotifications,
       markAsRead,
+      markAllAsRead,
       deleteNotification,
       clearAll,
       loading
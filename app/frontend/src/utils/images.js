@@ -0,0 +1,10 @@
+// Versões redimensionadas geradas pelo backend (services/image_pipeline).
+// Enquanto a variante não existe (processamento pendente, GIF animado), usa o original.
+
+export function postImagePath(post, size = "feed") {
+  return post.image_variants?.[size] || post.image_url;
+}
+
+export function avatarPath(user, size = "128") {
+  return user.profile_picture_variants?.[size] || user.profile_picture;
+}